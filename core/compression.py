@@ -0,0 +1,125 @@
+"""
+Compression of large API responses.
+
+Responses of at least `RESPONSE_COMPRESSION['MIN_SIZE']` bytes are sent
+brotli- or gzip-compressed to clients that accept it, preferring
+brotli. `CompressionMiddleware` compresses any response on the fly;
+views serving cacheable bodies pass a `compressed` callback to
+`compress_response()` that returns a stored variant, so such bodies are
+compressed once per version instead of once per request.
+
+Compression ratio (original / compressed size) and the CPU time spent
+compressing are recorded in `core.metrics` per encoding. `brotli` is
+optional; without it only gzip is offered.
+"""
+
+
+import gzip
+import time
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from core.metrics import metrics
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSION_DEFAULTS = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+
+def compression_settings():
+    """
+    Return the compression settings, filled in with defaults.
+    """
+    return {**COMPRESSION_DEFAULTS, **getattr(settings, 'RESPONSE_COMPRESSION', {})}
+
+
+def available_encodings():
+    """
+    Return the supported content codings, most preferred first.
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding):
+    """
+    Return the preferred supported coding allowed by an Accept-Encoding
+    header, or None.
+    """
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in available_encodings():
+        if accepted.get(encoding, accepted.get('*', 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding):
+    """
+    Return `body` compressed with `encoding` and record ratio and CPU time.
+    """
+    config = compression_settings()
+    started = time.thread_time()
+    if encoding == 'br':
+        compressed = brotli.compress(body, quality=config['BROTLI_QUALITY'])
+    else:
+        compressed = gzip.compress(body, compresslevel=config['GZIP_LEVEL'], mtime=0)
+    metrics.observe(f'compression.{encoding}.cpu_seconds', time.thread_time() - started)
+    metrics.observe(f'compression.{encoding}.ratio', len(body) / max(len(compressed), 1))
+    return compressed
+
+
+def compress_response(request, response, compressed=None):
+    """
+    Compress the body of `response` in place if it is large enough and
+    the client accepts a supported coding.
+
+    `compressed(encoding)`, if given, returns a stored compressed
+    variant of the body, or None to compress it now.
+    """
+    if response.streaming or response.has_header('Content-Encoding'):
+        return response
+    body = response.content
+    if len(body) < compression_settings()['MIN_SIZE']:
+        return response
+
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoding is None:
+        return response
+
+    stored = compressed(encoding) if compressed else None
+    if stored is None:
+        stored = compress(body, encoding)
+    else:
+        metrics.increment(f'compression.{encoding}.precompressed_responses')
+    if len(stored) >= len(body):
+        return response
+
+    response.content = stored
+    response['Content-Length'] = str(len(stored))
+    response['Content-Encoding'] = encoding
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    metrics.increment(f'compression.{encoding}.responses')
+    metrics.increment(f'compression.{encoding}.bytes_in', len(body))
+    metrics.increment(f'compression.{encoding}.bytes_out', len(stored))
+    return response
@@ -0,0 +1,106 @@
+"""
+Database helpers shared by the KanMind apps.
+
+This module provides:
+- The SQLite pragmas applied to every connection in production.
+- A decorator that retries writes failing with "database is locked".
+- A throwaway test database for benchmarks.
+"""
+
+
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+
+LOCK_RETRY_DEFAULTS = {
+    'ATTEMPTS': 5,
+    'BASE_DELAY': 0.05,
+    'MAX_DELAY': 1.0,
+}
+
+
+def sqlite_init_command(pragmas=None):
+    """
+    Return an `init_command` string that applies the given pragmas.
+
+    Django runs every statement of `OPTIONS['init_command']` on each new
+    SQLite connection.
+    """
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+    return ' '.join(f"PRAGMA {name}={value};" for name, value in pragmas.items())
+
+
+def is_locked_error(exc):
+    """
+    Return True if the exception is SQLite's "database is locked" error.
+    """
+    return isinstance(exc, OperationalError) and 'locked' in str(exc).lower()
+
+
+def lock_retry_settings():
+    """
+    Return the retry settings, merged over the defaults.
+    """
+    return {**LOCK_RETRY_DEFAULTS, **getattr(settings, 'DB_LOCK_RETRY', {})}
+
+
+def retry_on_locked(func=None, *, using=DEFAULT_DB_ALIAS):
+    """
+    Run the decorated function in a transaction and retry it while the
+    database is locked.
+
+    Delays grow exponentially with jitter, bounded by `MAX_DELAY`. When
+    called inside an outer transaction the function runs once, since
+    only the outermost block can be safely retried.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if connections[using].in_atomic_block:
+                return func(*args, **kwargs)
+
+            options = lock_retry_settings()
+            for attempt in range(options['ATTEMPTS']):
+                try:
+                    with transaction.atomic(using=using):
+                        return func(*args, **kwargs)
+                except OperationalError as exc:
+                    if not is_locked_error(exc) or attempt + 1 == options['ATTEMPTS']:
+                        raise
+                delay = min(options['BASE_DELAY'] * 2 ** attempt, options['MAX_DELAY'])
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+@contextmanager
+def throwaway_database(using=DEFAULT_DB_ALIAS):
+    """
+    Run the block against a freshly migrated test database.
+
+    The database is destroyed afterwards, so benchmarks and other
+    tooling never touch application data.
+    """
+    connection = connections[using]
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
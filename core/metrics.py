@@ -0,0 +1,86 @@
+"""
+In-process metrics for the KanMind apps.
+
+A small registry of named counters, gauges and distributions, kept per
+process and read through `snapshot()` or the admin-only
+`GET /api/metrics/` endpoint. Recording is a dictionary update under a
+lock, cheap enough for request hot paths.
+
+- Counters only grow: `increment('compression.gzip.responses')`.
+- Gauges hold the latest value: `set_gauge('shedding.writes.limit', 8)`.
+- Distributions keep count, sum, min and max of observed values:
+  `observe('compression.gzip.cpu_seconds', 0.0012)`.
+"""
+
+
+import threading
+
+
+class Metrics:
+    """
+    Thread-safe registry of counters, gauges and distributions.
+    """
+
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.distributions = {}
+
+    def increment(self, name, value=1):
+        """
+        Add `value` to a counter.
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        """
+        Set a gauge to `value`.
+        """
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe(self, name, value):
+        """
+        Record one observation of a distribution.
+        """
+        with self.lock:
+            stats = self.distributions.get(name)
+            if stats is None:
+                self.distributions[name] = [1, value, value, value]
+            else:
+                stats[0] += 1
+                stats[1] += value
+                if value < stats[2]:
+                    stats[2] = value
+                if value > stats[3]:
+                    stats[3] = value
+
+    def snapshot(self):
+        """
+        Return a copy of every metric, distributions with their mean.
+        """
+        with self.lock:
+            distributions = {
+                name: {'count': count, 'sum': total, 'min': low, 'max': high, 'mean': total / count}
+                for name, (count, total, low, high) in self.distributions.items()
+            }
+            return {
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'distributions': distributions,
+            }
+
+    def reset(self):
+        """
+        Forget every metric.
+        """
+        with self.lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.distributions.clear()
+
+
+metrics = Metrics()
@@ -0,0 +1,108 @@
+"""
+Middleware for the core project.
+
+PrimaryPinningMiddleware scopes the replica router's primary pinning to
+a single request and carries it over to the client's next requests for
+a short time after a write, so replication lag never hides a client's
+own changes.
+
+CompressionMiddleware compresses large responses; see `core.compression`.
+
+LoadSheddingMiddleware rejects requests of overloaded endpoint classes;
+see `core.shedding`.
+"""
+
+
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+
+from core.compression import compress_response
+from core.routers import pin_to_primary, unpin
+from core.shedding import LoadShedder, load_shedding_settings
+
+
+PIN_COOKIE = 'kanmind_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class PrimaryPinningMiddleware:
+    """
+    Reset read routing per request and pin writing clients to the primary.
+
+    Unsafe requests read from the primary from the start, so their
+    permission checks and validation never see stale replica data.
+    """
+
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES:
+            pin_to_primary()
+        else:
+            unpin()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            unpin()
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_PIN_SECONDS', 5),
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compress responses above the size threshold with brotli or gzip.
+
+    Responses a view has already compressed, e.g. from a stored
+    variant, are passed through unchanged.
+    """
+
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return compress_response(request, self.get_response(request))
+
+
+class LoadSheddingMiddleware:
+    """
+    Shed requests of overloaded endpoint classes with a 503.
+
+    Placed early in the stack, so shed requests cost almost nothing.
+    Disabled with `LOAD_SHEDDING['ENABLED'] = False`.
+    """
+
+
+    def __init__(self, get_response):
+        config = load_shedding_settings()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.shedder = LoadShedder(config)
+
+    def __call__(self, request):
+        load, protected = self.shedder.classify(request)
+        if not load.enter(protected):
+            response = JsonResponse(
+                {"error": "The server is overloaded, please retry later."}, status=503)
+            response['Retry-After'] = str(self.shedder.retry_after)
+            return response
+
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            load.leave(time.perf_counter() - started)
@@ -0,0 +1,84 @@
+"""
+Faster response renderers for the REST API.
+
+This module provides:
+- FastJSONRenderer: Renders JSON with `orjson`, producing the same
+  bytes as DRF's JSONRenderer for everything the API returns.
+- MessagePackRenderer: Renders the same data as compact MessagePack
+  for clients sending `Accept: application/msgpack`.
+
+Values that neither library encodes natively (dates, times, decimals,
+lazy strings, querysets) are converted by DRF's own JSONEncoder, so
+both formats carry exactly the values the JSON renderer would emit.
+Without `orjson` installed, the JSON renderer falls back to the
+standard library.
+"""
+
+
+import msgpack
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+encode_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by `orjson`.
+
+    `orjson` always writes compact UTF-8, so ASCII-only or indented
+    output, as used by the browsable API, and values `orjson` rejects,
+    such as integers beyond 64 bits, go through the standard
+    JSONRenderer.
+    """
+
+
+    options = 0
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON, returning a bytestring.
+        """
+        if data is None:
+            return b''
+        if orjson is None or self.ensure_ascii or not self.compact or \
+                self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=encode_default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escape U+2028 and U+2029 like JSONRenderer, so the output stays
+        # a strict JavaScript subset.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer which serializes to MessagePack.
+    """
+
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into MessagePack, returning a bytestring.
+        """
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
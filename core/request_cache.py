@@ -0,0 +1,54 @@
+"""
+Request-scoped cache for lookups repeated within one HTTP request.
+
+Batch requests run many API calls in one HTTP request, and these calls
+tend to check the same things: the board of a task, the members of a
+board. Code doing such lookups wraps them in `cached()`. Inside a
+`request_cache()` block the result is computed once and shared;
+outside of one, `cached()` simply calls the function.
+
+Cached values are only safe to reuse while nothing changes them, so
+callers run `clear_request_cache()` after every write.
+"""
+
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_request_cache = ContextVar('request_cache', default=None)
+
+
+@contextmanager
+def request_cache():
+    """
+    Share the results of `cached()` inside the block.
+    """
+    token = _request_cache.set({})
+    try:
+        yield
+    finally:
+        _request_cache.reset(token)
+
+
+def cached(key, compute):
+    """
+    Return the cached value for `key`, calling `compute()` to fill it.
+
+    Exceptions raised by `compute()` are not cached.
+    """
+    store = _request_cache.get()
+    if store is None:
+        return compute()
+    if key not in store:
+        store[key] = compute()
+    return store[key]
+
+
+def clear_request_cache():
+    """
+    Drop every value cached for the current request.
+    """
+    store = _request_cache.get()
+    if store is not None:
+        store.clear()
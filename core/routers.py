@@ -0,0 +1,84 @@
+"""
+Database routers for the core project.
+
+ReplicaRouter sends reads of the routed apps to read replicas and every
+write to the primary. Once a request writes, its remaining reads are
+pinned to the primary so that clients always read their own writes.
+"""
+
+
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+
+
+def pin_to_primary():
+    """
+    Route all further reads of the current request to the primary.
+    """
+    _pinned_to_primary.set(True)
+
+
+def unpin():
+    """
+    Allow reads of the current request to go to the replicas again.
+    """
+    _pinned_to_primary.set(False)
+
+
+def is_pinned():
+    """
+    Return True if reads of the current request go to the primary.
+    """
+    return _pinned_to_primary.get()
+
+
+class ReplicaRouter:
+    """
+    Route reads to replicas and writes to the primary database.
+
+    Replicas are listed in `settings.DATABASE_REPLICAS`; only models of
+    the apps in `settings.REPLICA_ROUTED_APPS` are read from them.
+    """
+
+
+    def replicas(self):
+        """
+        Return the configured replica aliases.
+        """
+        return getattr(settings, 'DATABASE_REPLICAS', [])
+
+    def db_for_read(self, model, **hints):
+        """
+        Return a random replica for routed apps unless the request is pinned.
+        """
+        replicas = self.replicas()
+        routed_apps = getattr(settings, 'REPLICA_ROUTED_APPS', [])
+        if not replicas or is_pinned() or model._meta.app_label not in routed_apps:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        """
+        Send every write to the primary and pin the current request to it.
+        """
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """
+        Allow relations between objects stored on the primary or a replica.
+        """
+        databases = {DEFAULT_DB_ALIAS, *self.replicas()}
+        return obj1._state.db in databases and obj2._state.db in databases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """
+        Only migrate the primary; replicas receive their schema by replication.
+        """
+        return db == DEFAULT_DB_ALIAS
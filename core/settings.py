@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -40,11 +42,15 @@ INSTALLED_APPS = [
     'rest_framework',
     'kanban_app',
     'user_auth_app',
+    'jobs_app',
+    'idempotency_app',
     'rest_framework.authtoken'
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.LoadSheddingMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +76,10 @@ CORS_ALLOWED_ORIGINS = [
 
 ]
 
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+
+CORS_EXPOSE_HEADERS = ['Idempotent-Replayed']
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -101,6 +111,19 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -143,11 +166,164 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# JSON is rendered and parsed with orjson; MessagePack is offered to
+# clients sending `Accept: application/msgpack`.
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
-    ]
-}
\ No newline at end of file
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'core.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'core.throttling.SlidingWindowThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'boards': '300/min',
+        'tasks': '600/min',
+        'comments': '600/min',
+        'search': '120/min',
+        'users': '120/min',
+        'batch': '60/min',
+    },
+}
+
+# Requests are limited per user and endpoint group (a view's
+# `throttle_scope`, see DEFAULT_THROTTLE_RATES above) with in-process
+# counters. SHARED also enforces the limits across processes through the
+# CACHE, syncing each counter at most every SYNC_SECONDS. Counters of
+# clients that stopped sending requests are dropped every SWEEP_SECONDS.
+
+THROTTLING = {
+    'SHARED': False,
+    'SYNC_SECONDS': 1.0,
+    'CACHE': 'default',
+    'SWEEP_SECONDS': 60.0,
+}
+
+# Password hashing runs in a pool of this many threads, which bounds the
+# CPU a burst of logins or registrations can take from other requests.
+
+PASSWORD_HASHING_WORKERS = 2
+
+# Bulk provisioning hashes on a process pool of this size; None uses
+# every CPU.
+
+PASSWORD_HASHING_PROCESSES = None
+
+# Serve login and registration with the async views. Only useful when
+# running under ASGI (core.asgi), where awaiting the hashing pool frees
+# the event loop for other requests.
+
+AUTH_VIEWS_ASYNC = False
+
+# Deleted boards are hidden at once and purged in batches of BATCH_SIZE
+# rows, pausing PAUSE seconds between batches. IN_BACKGROUND starts the
+# purge in a thread after the deletion, USE_JOB_QUEUE enqueues it as a
+# background job instead; otherwise run `purge_boards`.
+
+BOARD_PURGE = {
+    'BATCH_SIZE': 500,
+    'PAUSE': 0.0,
+    'IN_BACKGROUND': True,
+    'USE_JOB_QUEUE': False,
+}
+
+# Tasks done for more than AFTER_DAYS days are moved to the archive
+# tables by `archive_tasks`, BATCH_SIZE tasks per transaction.
+
+TASK_ARCHIVE = {
+    'AFTER_DAYS': 90,
+    'BATCH_SIZE': 500,
+}
+
+# Background jobs run in `run_jobs` workers. Failed jobs are retried up
+# to MAX_ATTEMPTS times, waiting BACKOFF_BASE ** attempt seconds (at most
+# BACKOFF_MAX). A running job is leased for LEASE_SECONDS, renewed by its
+# worker every third of that; a job whose lease expires is claimed again
+# as another attempt.
+
+JOBS = {
+    'WORKERS': 2,
+    'POLL_SECONDS': 1.0,
+    'MAX_ATTEMPTS': 3,
+    'BACKOFF_BASE': 2.0,
+    'BACKOFF_MAX': 300.0,
+    'LEASE_SECONDS': 600,
+}
+
+# Responses of at least MIN_SIZE bytes are sent brotli- or gzip-compressed
+# to clients accepting it. Board documents store their compressed variants.
+
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+}
+
+# Warm the request hot paths (URL resolver, models, renderers, database
+# connections) when the WSGI or ASGI application is loaded. Connections
+# are closed again afterwards, so pre-fork workers never share them.
+
+WARM_UP_AT_BOOT = False
+
+# Requests are sorted into reads, writes and auth. Each class admits up
+# to an adaptive limit of concurrent requests, shrinking towards
+# MIN_IN_FLIGHT while its average latency exceeds TARGET_LATENCY seconds
+# and growing back to MAX_IN_FLIGHT otherwise; excess requests get a 503
+# with Retry-After. PROTECTED requests are only limited by MAX_IN_FLIGHT.
+
+LOAD_SHEDDING = {
+    'ENABLED': True,
+    'CLASSES': {
+        'reads': {'MAX_IN_FLIGHT': 32, 'MIN_IN_FLIGHT': 4, 'TARGET_LATENCY': 0.5},
+        'writes': {'MAX_IN_FLIGHT': 16, 'MIN_IN_FLIGHT': 4, 'TARGET_LATENCY': 0.5},
+        'auth': {'MAX_IN_FLIGHT': 8, 'MIN_IN_FLIGHT': 2, 'TARGET_LATENCY': 1.0},
+    },
+    'PROTECTED': [('POST', r'^/api/login/$'), ('PATCH', r'^/api/tasks/\d+/$')],
+    'RETRY_AFTER': 1,
+}
+
+# Writes sent with an `Idempotency-Key` header are stored for TTL_SECONDS
+# and replayed for retries. Duplicates of a running request wait up to
+# WAIT_SECONDS for it; pending keys older than PENDING_TIMEOUT seconds
+# are taken over. Keys are stored on the database the request writes to,
+# the board's shard with BOARD_SHARDS, in the same transaction as the
+# write. Run `clear_idempotency_keys` to delete expired keys.
+
+IDEMPOTENCY = {
+    'TTL_SECONDS': 86400,
+    'WAIT_SECONDS': 10.0,
+    'POLL_SECONDS': 0.05,
+    'PENDING_TIMEOUT': 60,
+}
+
+# Task assignments and comments are recorded in an outbox in the same
+# transaction as the change. `dispatch_outbox` delivers them in batches
+# of BATCH_SIZE to the SINKS (dotted class paths mapped to their keyword
+# arguments). A failed batch is retried message by message; failing
+# messages are retried with exponential backoff (BACKOFF_BASE ** attempts
+# seconds, at most BACKOFF_MAX) up to MAX_ATTEMPTS times.
+
+OUTBOX = {
+    'SINKS': {
+        'kanban_app.outbox.LogSink': {},
+    },
+    'BATCH_SIZE': 100,
+    'POLL_SECONDS': 1.0,
+    'MAX_ATTEMPTS': 10,
+    'BACKOFF_BASE': 2.0,
+    'BACKOFF_MAX': 300.0,
+}
@@ -0,0 +1,54 @@
+"""
+API-only worker profile for the core project.
+
+Extends the production database profile for workers that only serve
+token-authenticated API traffic:
+- No admin, sessions, messages or static files apps.
+- Only the CORS, load shedding, compression, security and common
+  middleware; DRF authenticates requests itself and token requests
+  need no CSRF check.
+- No browsable API renderer, which needs templates and static files.
+- `core.urls_api`, which leaves out the admin and the browsable API
+  login views.
+- Hot paths are warmed when the WSGI or ASGI application is loaded.
+
+Select it with DJANGO_SETTINGS_MODULE=core.settings_api. Admin and
+management traffic keeps using the full profile.
+"""
+
+from core.settings_production import *  # noqa: F401,F403
+from core.settings_production import REST_FRAMEWORK
+
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'rest_framework',
+    'rest_framework.authtoken',
+    'kanban_app',
+    'user_auth_app',
+    'jobs_app',
+    'idempotency_app',
+]
+
+MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.LoadSheddingMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'core.urls_api'
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        renderer for renderer in REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']
+        if renderer != 'rest_framework.renderers.BrowsableAPIRenderer'
+    ],
+}
+
+WARM_UP_AT_BOOT = True
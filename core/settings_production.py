@@ -0,0 +1,39 @@
+"""
+Production database profile for the core project.
+
+Extends the default settings with a tuned SQLite configuration:
+- WAL journaling and tuned pragmas on every connection.
+- Immediate write transactions with a busy timeout.
+- Persistent connections with health checks.
+- Retries with backoff for writes that still hit a locked database.
+
+Select it with DJANGO_SETTINGS_MODULE=core.settings_production.
+"""
+
+from core.db import sqlite_init_command
+from core.settings import *  # noqa: F401,F403
+from core.settings import BASE_DIR
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': sqlite_init_command(),
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+DB_LOCK_RETRY = {
+    'ATTEMPTS': 5,
+    'BASE_DELAY': 0.05,
+    'MAX_DELAY': 1.0,
+}
@@ -0,0 +1,45 @@
+"""
+Read-replica profile for the core project.
+
+Extends the production database profile with a read replica. Reads of
+the Kanban and user models go to the replica, writes go to the primary.
+
+Locally the replica is a second SQLite file; refresh it from the
+primary with `python manage.py sync_replicas`. The replica only reads,
+so its transactions are deferred and never wait for the primary's write
+lock. In tests it mirrors the primary's test database and shares its
+connection; see `core.test_runner`.
+
+Select it with DJANGO_SETTINGS_MODULE=core.settings_replica.
+"""
+
+from core.settings_production import *  # noqa: F401,F403
+from core.settings_production import BASE_DIR, DATABASES, MIDDLEWARE
+
+
+DATABASES = {
+    **DATABASES,
+    'replica': {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'OPTIONS': {
+            **DATABASES['default']['OPTIONS'],
+            'transaction_mode': 'DEFERRED',
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+DATABASE_REPLICAS = ['replica']
+
+REPLICA_ROUTED_APPS = ['kanban_app', 'auth']
+
+REPLICA_PIN_SECONDS = 5
+
+MIDDLEWARE = ['core.middleware.PrimaryPinningMiddleware', *MIDDLEWARE]
+
+TEST_RUNNER = 'core.test_runner.MirrorSharingTestRunner'
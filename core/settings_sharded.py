@@ -0,0 +1,37 @@
+"""
+Sharded profile for the core project.
+
+Extends the production database profile with two extra SQLite
+databases. Boards, with their tasks and comments, are spread across
+the default database and the shards by board ID; see
+`kanban_app.sharding`.
+
+Select it with DJANGO_SETTINGS_MODULE=core.settings_sharded, then
+migrate every database:
+
+    python manage.py migrate
+    python manage.py migrate --database shard1
+    python manage.py migrate --database shard2
+"""
+
+from core.settings_production import *  # noqa: F401,F403
+from core.settings_production import BASE_DIR, DATABASES
+
+
+DATABASES = {
+    **DATABASES,
+    **{
+        alias: {
+            **DATABASES['default'],
+            'NAME': BASE_DIR / f'db_{alias}.sqlite3',
+            'TEST': {
+                'NAME': BASE_DIR / f'test_db_{alias}.sqlite3',
+            },
+        }
+        for alias in ['shard1', 'shard2']
+    },
+}
+
+DATABASE_ROUTERS = ['kanban_app.sharding.ShardRouter']
+
+BOARD_SHARDS = ['default', 'shard1', 'shard2']
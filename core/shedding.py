@@ -0,0 +1,158 @@
+"""
+Adaptive load shedding per endpoint class.
+
+Requests are sorted into three endpoint classes: `auth` (login and
+registration), `writes` (unsafe methods) and `reads`. Every class keeps
+its number of in-flight requests, a moving average of their latency
+and a concurrency limit that adapts to it:
+- While the average latency stays below `TARGET_LATENCY`, the limit
+  grows by about one request per limit's worth of completions, up to
+  `MAX_IN_FLIGHT`.
+- Once it exceeds the target, every completion shrinks the limit by
+  `DECREASE`, down to `MIN_IN_FLIGHT`.
+
+A request arriving while its class is at its limit is shed with a 503
+and a `Retry-After` header instead of queueing behind slow work.
+Protected requests, cheap ones like login and task PATCH, ignore the
+adaptive limit and are only shed at `MAX_IN_FLIGHT`.
+
+Limits, in-flight counts, latencies and whether a class is shedding
+are published as `core.metrics` gauges named `shedding.<class>.*`;
+shed requests are counted in `shedding.<class>.shed`.
+"""
+
+
+import re
+import threading
+
+from django.conf import settings
+
+from core.metrics import metrics
+
+
+LOAD_SHEDDING_DEFAULTS = {
+    'ENABLED': True,
+    'CLASSES': {
+        'reads': {'MAX_IN_FLIGHT': 32, 'MIN_IN_FLIGHT': 4, 'TARGET_LATENCY': 0.5},
+        'writes': {'MAX_IN_FLIGHT': 16, 'MIN_IN_FLIGHT': 4, 'TARGET_LATENCY': 0.5},
+        'auth': {'MAX_IN_FLIGHT': 8, 'MIN_IN_FLIGHT': 2, 'TARGET_LATENCY': 1.0},
+    },
+    'AUTH_PATHS': [r'^/api/login/$', r'^/api/registration/$'],
+    'PROTECTED': [('POST', r'^/api/login/$'), ('PATCH', r'^/api/tasks/\d+/$')],
+    'LATENCY_WEIGHT': 0.2,
+    'DECREASE': 0.9,
+    'RETRY_AFTER': 1,
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def load_shedding_settings():
+    """
+    Return the load shedding settings, filled in with defaults.
+    """
+    return {**LOAD_SHEDDING_DEFAULTS, **getattr(settings, 'LOAD_SHEDDING', {})}
+
+
+class EndpointLoad:
+    """
+    In-flight requests, latency and adaptive limit of one endpoint class.
+    """
+
+
+    def __init__(self, name, max_in_flight, min_in_flight, target_latency,
+                 latency_weight=0.2, decrease=0.9):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min_in_flight
+        self.target_latency = target_latency
+        self.latency_weight = latency_weight
+        self.decrease = decrease
+        self.limit = float(max_in_flight)
+        self.in_flight = 0
+        self.latency = 0.0
+        self.lock = threading.Lock()
+        self.publish()
+
+    def enter(self, protected=False):
+        """
+        Admit a request and return True, or return False to shed it.
+        """
+        with self.lock:
+            limit = self.max_in_flight if protected else self.limit
+            if self.in_flight >= limit:
+                admitted = False
+            else:
+                self.in_flight += 1
+                admitted = True
+        if not admitted:
+            metrics.increment(f'shedding.{self.name}.shed')
+        self.publish()
+        return admitted
+
+    def leave(self, seconds):
+        """
+        Record the completion of an admitted request and adapt the limit.
+        """
+        with self.lock:
+            self.in_flight -= 1
+            self.latency += self.latency_weight * (seconds - self.latency)
+            if self.latency > self.target_latency:
+                self.limit = max(self.min_in_flight, self.limit * self.decrease)
+            else:
+                self.limit = min(self.max_in_flight, self.limit + 1 / self.limit)
+        self.publish()
+
+    def is_shedding(self):
+        """
+        Return True if unprotected requests of this class are being shed.
+        """
+        return self.in_flight >= self.limit
+
+    def publish(self):
+        """
+        Publish the current state as gauges.
+        """
+        prefix = f'shedding.{self.name}'
+        metrics.set_gauge(f'{prefix}.limit', round(self.limit, 2))
+        metrics.set_gauge(f'{prefix}.in_flight', self.in_flight)
+        metrics.set_gauge(f'{prefix}.latency', self.latency)
+        metrics.set_gauge(f'{prefix}.shedding', int(self.is_shedding()))
+
+
+class LoadShedder:
+    """
+    Sort requests into endpoint classes and track the load of each.
+    """
+
+
+    def __init__(self, config):
+        self.retry_after = config['RETRY_AFTER']
+        self.auth_paths = [re.compile(pattern) for pattern in config['AUTH_PATHS']]
+        self.protected = [(method, re.compile(pattern)) for method, pattern in config['PROTECTED']]
+        self.classes = {
+            name: EndpointLoad(
+                name,
+                limits['MAX_IN_FLIGHT'],
+                limits['MIN_IN_FLIGHT'],
+                limits['TARGET_LATENCY'],
+                latency_weight=config['LATENCY_WEIGHT'],
+                decrease=config['DECREASE']
+            )
+            for name, limits in config['CLASSES'].items()
+        }
+
+    def classify(self, request):
+        """
+        Return the endpoint class of a request and whether it is protected.
+        """
+        path = request.path_info
+        protected = any(
+            request.method == method and pattern.match(path) for method, pattern in self.protected)
+        if any(pattern.match(path) for pattern in self.auth_paths):
+            name = 'auth'
+        elif request.method in SAFE_METHODS:
+            name = 'reads'
+        else:
+            name = 'writes'
+        return self.classes[name], protected
@@ -0,0 +1,33 @@
+"""
+Test runner for the database profiles with read replicas.
+
+Django points a test mirror at the database it mirrors, but through a
+separate connection. Inside a TestCase every test runs in an
+uncommitted transaction, so reads routed to the replica would not see
+the rows the test just wrote. This runner hands the mirror the primary's
+connection instead, so replica reads behave like reads of a replica
+without lag. Queries keep the alias they were routed to, so routing
+stays observable through `instance._state.db`.
+"""
+
+
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+
+class MirrorSharingTestRunner(DiscoverRunner):
+    """
+    Run the tests with every test mirror sharing its primary's connection.
+    """
+
+
+    def setup_databases(self, **kwargs):
+        """
+        Create the test databases, then share connections with the mirrors.
+        """
+        old_config = super().setup_databases(**kwargs)
+        for alias in connections:
+            mirror = connections[alias].settings_dict['TEST']['MIRROR']
+            if mirror:
+                connections[alias] = connections[mirror]
+        return old_config
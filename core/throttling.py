@@ -0,0 +1,242 @@
+"""
+Per-token rate limiting with an in-process sliding window store.
+
+`SlidingWindowThrottle` limits every client per endpoint group. A
+client is the user of the auth token (each user has one token), or the
+IP address of anonymous requests. Views name their group with
+`throttle_scope`, whose rate comes from
+`REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']`, e.g. `'boards': '300/min'`,
+or set a `throttle_rate` of their own. Views without either are not
+limited.
+
+Requests are counted in fixed windows of the rate's duration. The
+sliding window estimate weights the previous window's count by how much
+of it still overlaps the last `duration` seconds, which smooths out
+bursts at window boundaries without keeping a timestamp per request.
+
+Counters live in a dictionary in the process (`WindowStore`), and the
+check takes no lock, so it costs a dictionary lookup and some
+arithmetic (see `bench_throttles`). Counters whose windows no longer
+count are swept out at most once per `SWEEP_SECONDS`, so the dictionary
+only holds clients seen during the last two windows.
+With `THROTTLING['SHARED']`, every process pushes its counts to the
+Django cache at most once per `SYNC_SECONDS` per client and group and
+reads back the other processes' counts; limits are then enforced
+across processes, overshooting by at most what they accept between
+syncs.
+"""
+
+
+import threading
+from functools import lru_cache
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+THROTTLING_DEFAULTS = {
+    'SHARED': False,
+    'SYNC_SECONDS': 1.0,
+    'CACHE': 'default',
+    'SWEEP_SECONDS': 60.0,
+}
+
+WINDOW, CURRENT, PREVIOUS, REMOTE, PUSHED, SYNCED_AT, DURATION = range(7)
+
+
+def throttling_settings():
+    """
+    Return the throttling settings, filled in with defaults.
+    """
+    return {**THROTTLING_DEFAULTS, **getattr(settings, 'THROTTLING', {})}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """
+    Return the number of requests and the duration of a rate like '300/min'.
+    """
+    num, period = rate.split('/')
+    return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+class WindowStore:
+    """
+    Sliding window request counters by key, optionally shared through a cache.
+
+    Each entry is a list of the current window number, the requests this
+    process counted in it, the total of the previous window, the
+    requests other processes counted in the current window, how many of
+    this process's requests were pushed to the cache, and when, and the
+    window duration.
+    """
+
+
+    def __init__(self, cache=None, sync_seconds=1.0, sweep_seconds=60.0):
+        self.cache = cache
+        self.sync_seconds = sync_seconds
+        self.sweep_seconds = sweep_seconds
+        self.swept_at = 0.0
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def hit(self, key, limit, duration, now=None):
+        """
+        Count a request for `key` and return None, or return the seconds
+        to wait if `limit` requests per `duration` seconds are used up.
+
+        Counting takes no lock: concurrent requests may occasionally lose
+        an increment, letting a client exceed its limit by a request.
+        Rolling over to a new window and syncing with the cache are done
+        by one thread at a time.
+        """
+        if now is None:
+            now = time()
+        window = now // duration
+        entry = self.entries.get(key)
+        if entry is None or entry[WINDOW] != window or (
+                self.cache is not None and now - entry[SYNCED_AT] >= self.sync_seconds):
+            entry = self.refresh(key, window, duration, now)
+
+        elapsed = now - window * duration
+        current = entry[CURRENT] + entry[REMOTE]
+        if entry[PREVIOUS] * (1 - elapsed / duration) + current < limit:
+            entry[CURRENT] += 1
+            return None
+        if current >= limit:
+            return duration - elapsed
+        return max(duration * (1 - (limit - current) / entry[PREVIOUS]) - elapsed, 0.0)
+
+    def refresh(self, key, window, duration, now):
+        """
+        Create, roll over or sync the entry of `key` and return it.
+        """
+        with self.lock:
+            if now - self.swept_at >= self.sweep_seconds:
+                self.sweep(now)
+            entry = self.entries.get(key)
+            if entry is None:
+                entry = self.entries[key] = [window, 0, 0, 0, 0, 0.0, duration]
+            if entry[WINDOW] != window:
+                self.roll(key, entry, window, duration, now)
+            elif self.cache is not None and now - entry[SYNCED_AT] >= self.sync_seconds:
+                self.sync(key, entry, duration, now)
+            return entry
+
+    def sweep(self, now):
+        """
+        Drop the entries whose counts no longer weigh in on any request.
+
+        An entry still counts in the window after its own, as the
+        previous window of the estimate. Called with the lock held.
+        """
+        for key, entry in list(self.entries.items()):
+            if (entry[WINDOW] + 2) * entry[DURATION] <= now:
+                del self.entries[key]
+        self.swept_at = now
+
+    def roll(self, key, entry, window, duration, now):
+        """
+        Move an entry on to a new window.
+        """
+        total = entry[CURRENT] + entry[REMOTE]
+        if self.cache is not None:
+            total = self.push(key, entry, duration)
+        entry[PREVIOUS] = total if window == entry[WINDOW] + 1 else 0
+        entry[WINDOW] = window
+        entry[CURRENT] = entry[REMOTE] = entry[PUSHED] = 0
+        entry[SYNCED_AT] = now
+
+    def sync(self, key, entry, duration, now):
+        """
+        Push this process's new requests and read the other processes' count.
+        """
+        entry[REMOTE] = self.push(key, entry, duration) - entry[CURRENT]
+        entry[SYNCED_AT] = now
+
+    def push(self, key, entry, duration):
+        """
+        Add unpushed requests to the shared count of the entry's window and
+        return the window's total over all processes.
+        """
+        cache_key = f'throttle:{key}:{int(entry[WINDOW])}'
+        delta = entry[CURRENT] - entry[PUSHED]
+        self.cache.add(cache_key, 0, timeout=int(duration * 2) + 1)
+        try:
+            total = self.cache.incr(cache_key, delta) if delta else self.cache.get(cache_key, 0)
+        except ValueError:
+            total = entry[CURRENT] + entry[REMOTE]
+        entry[PUSHED] = entry[CURRENT]
+        return total
+
+    def clear(self):
+        """
+        Forget every counter of this process.
+        """
+        with self.lock:
+            self.entries.clear()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def window_store():
+    """
+    Return the process's counter store, created from the settings on first use.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                config = throttling_settings()
+                cache = caches[config['CACHE']] if config['SHARED'] else None
+                _store = WindowStore(cache, config['SYNC_SECONDS'], config['SWEEP_SECONDS'])
+    return _store
+
+
+def reset_window_store():
+    """
+    Drop the counter store, so the next request creates it from the settings again.
+    """
+    global _store
+    _store = None
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Limit each client to the rate of the view's endpoint group.
+    """
+
+
+    def get_cache_key(self, request, view, scope):
+        """
+        Return the key counting this client's requests to the group.
+        """
+        if request.user and request.user.is_authenticated:
+            return f'{scope}:user:{request.user.pk}'
+        return f'{scope}:ip:{self.get_ident(request)}'
+
+    def allow_request(self, request, view):
+        """
+        Return True if the client has requests left in the view's group.
+        """
+        scope = getattr(view, 'throttle_scope', None)
+        rate = getattr(view, 'throttle_rate', None)
+        if rate is None and scope is not None:
+            rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+        if rate is None:
+            return True
+        limit, duration = parse_rate(rate)
+        self.wait_seconds = window_store().hit(
+            self.get_cache_key(request, view, scope or view.__class__.__name__), limit, duration)
+        return self.wait_seconds is None
+
+    def wait(self):
+        """
+        Return the seconds until the next request would be allowed.
+        """
+        return self.wait_seconds
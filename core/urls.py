@@ -16,10 +16,13 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from core.views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('kanban_app.api.urls')),
     path('api/', include('user_auth_app.api.urls')),
+    path('api/', include('jobs_app.api.urls')),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
     path('api-auth/', include('rest_framework.urls')),
 ]
\ No newline at end of file
@@ -0,0 +1,15 @@
+"""
+URL configuration for API-only workers.
+
+Serves the same API routes as `core.urls`, without the admin site and
+the browsable API login views. Used by `core.settings_api`.
+"""
+from django.urls import path, include
+from core.views import MetricsView
+
+urlpatterns = [
+    path('api/', include('kanban_app.api.urls')),
+    path('api/', include('user_auth_app.api.urls')),
+    path('api/', include('jobs_app.api.urls')),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
+]
@@ -0,0 +1,25 @@
+"""
+API views of the core project.
+"""
+
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.metrics import metrics
+
+
+class MetricsView(APIView):
+    """
+    Report the in-process metrics of the serving process to admins.
+    """
+
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """
+        Return every counter, gauge and distribution.
+        """
+        return Response(metrics.snapshot())
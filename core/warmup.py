@@ -0,0 +1,120 @@
+"""
+Boot-time warm-up of the request hot paths.
+
+A fresh worker pays for lazy initialisation on its first requests:
+building the URL resolver, importing views, serializers and renderers,
+resolving model relations and compiling ORM queries, opening database
+connections and loading the password hasher. `warm_up()` does this
+work at boot instead, before the worker accepts traffic. The WSGI and
+ASGI entry points call it when `WARM_UP_AT_BOOT` is set.
+
+Pre-fork servers load the application in the master process and fork
+the workers from it, and a forked worker must not share the master's
+database connections. Warm-up at boot therefore closes every
+connection it opened; workers reconnect on their first query.
+
+Every step is cheap and side-effect free; none of them writes to the
+database.
+"""
+
+
+import logging
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+
+def warm_urls():
+    """
+    Build the URL resolver, which imports every view module.
+    """
+    from django.urls import get_resolver
+
+    resolver = get_resolver()
+    resolver.url_patterns
+    resolver.reverse_dict
+
+
+def warm_models():
+    """
+    Resolve the fields and relations of every model and compile the
+    queries of the busiest endpoints.
+    """
+    for model in apps.get_models():
+        model._meta.get_fields()
+
+    from kanban_app.api.rows import task_rows
+    from kanban_app.models import Board, Task
+
+    str(task_rows(Task.objects.filter(board_id=0)).query)
+    str(Board.objects.filter(members=0).query)
+
+
+def warm_rendering():
+    """
+    Load the configured renderers and parsers and render a sample payload.
+    """
+    from rest_framework.settings import api_settings
+
+    for parser_class in api_settings.DEFAULT_PARSER_CLASSES:
+        parser_class()
+    for renderer_class in api_settings.DEFAULT_RENDERER_CLASSES:
+        renderer = renderer_class()
+        if renderer.format in ('json', 'msgpack'):
+            renderer.render({'id': 1, 'tasks': [{'due_date': '2025-01-01'}]})
+
+
+def warm_databases():
+    """
+    Open a connection to every database, which loads the database
+    drivers and checks the connection settings.
+    """
+    for alias in connections:
+        connections[alias].ensure_connection()
+
+
+def warm_hashers():
+    """
+    Load the password hashers.
+    """
+    from django.contrib.auth.hashers import get_hashers
+
+    get_hashers()
+
+
+WARM_UP_STEPS = [warm_urls, warm_models, warm_rendering, warm_databases, warm_hashers]
+
+
+def warm_up(steps=None):
+    """
+    Run the warm-up steps and return the seconds each took, by name.
+
+    A failing step is logged and skipped, so warm-up never prevents a
+    worker from starting.
+    """
+    timings = {}
+    for step in steps or WARM_UP_STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", step.__name__)
+        timings[step.__name__] = time.perf_counter() - started
+    return timings
+
+
+def warm_up_at_boot():
+    """
+    Run `warm_up()` if the `WARM_UP_AT_BOOT` setting is enabled, then
+    close the database connections it opened.
+    """
+    if getattr(settings, 'WARM_UP_AT_BOOT', False):
+        try:
+            warm_up()
+        finally:
+            connections.close_all()
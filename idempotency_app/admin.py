@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from idempotency_app.models import IdempotencyKey
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ['id', 'key', 'scope', 'status', 'status_code', 'created_at', 'expires_at']
+    list_filter = ['status']
+    search_fields = ['key', 'scope']
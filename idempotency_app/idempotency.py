@@ -0,0 +1,282 @@
+"""
+Idempotent handling of retried write requests.
+
+Clients on flaky networks retry writes whose response they never
+received. Sending the same `Idempotency-Key` header with every attempt
+makes the write happen once:
+
+- The first request claims the key by inserting a pending
+  IdempotencyKey row, committed before the view runs.
+- The view runs in a transaction that also stores its successful
+  response on the row. Failed attempts release the key, so they can
+  be retried.
+- Retries of a completed request get the stored response replayed,
+  marked with an `Idempotent-Replayed: true` header, without running
+  the view again.
+- A duplicate arriving while the first attempt is still running waits
+  for it and then replays its response. It gets a 409 if the first
+  attempt takes longer than `WAIT_SECONDS`.
+- Reusing a key for a different payload is rejected with a 422.
+
+Keys are scoped to the requesting user (or anonymous), method and
+path, and expire after `TTL_SECONDS`. They are stored on the database
+the view writes to, given by `IdempotentMixin.idempotency_database`,
+so the response is committed together with the write; with sharded
+boards that is the shard of the request's board. Pending keys older than
+`PENDING_TIMEOUT` seconds belong to crashed attempts and are taken over.
+
+Payloads are fingerprinted with an HMAC keyed by `SECRET_KEY`, so a
+stored fingerprint cannot be used to check a guessed password. Views
+whose responses carry secrets, like auth tokens, store a reduced
+response and rebuild the full one on replay; see
+`IdempotentMixin.stored_data` and `IdempotentMixin.replayed_data`.
+"""
+
+
+import json
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.db import retry_on_locked
+from idempotency_app.models import IdempotencyKey
+
+
+IDEMPOTENCY_DEFAULTS = {
+    'TTL_SECONDS': 86400,
+    'WAIT_SECONDS': 10.0,
+    'POLL_SECONDS': 0.05,
+    'PENDING_TIMEOUT': 60,
+}
+
+HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def idempotency_settings():
+    """
+    Return the idempotency settings, filled in with defaults.
+    """
+    return {**IDEMPOTENCY_DEFAULTS, **getattr(settings, 'IDEMPOTENCY', {})}
+
+
+def request_scope(request):
+    """
+    Return the scope of a request's key: its user, method and path.
+    """
+    user_id = getattr(request.user, 'id', None)
+    return f"{user_id or 'anonymous'} {request.method} {request.path}"
+
+
+def request_fingerprint(request):
+    """
+    Return a keyed hash of the request payload.
+
+    Parsed data is hashed rather than the raw body, which the parsers
+    have already consumed; form data is hashed with all of its values.
+    The HMAC is keyed with `SECRET_KEY`, so fingerprints of payloads
+    holding passwords cannot be checked against guesses.
+    """
+    data = request.data
+    if hasattr(data, 'lists'):
+        data = dict(data.lists())
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return salted_hmac('idempotency_app.fingerprint', payload, algorithm='sha256').hexdigest()
+
+
+def claim(scope, key, fingerprint, using=DEFAULT_DB_ALIAS):
+    """
+    Claim a key for a new attempt on the given database.
+
+    Returns the key's row and whether this call created it. Expired
+    rows and abandoned pending rows are replaced.
+    """
+    config = idempotency_settings()
+    keys = IdempotencyKey.objects.using(using)
+
+    @retry_on_locked(using=using)
+    def insert():
+        now = timezone.now()
+        keys.filter(scope=scope, key=key).filter(
+            Q(expires_at__lte=now) |
+            Q(status=IdempotencyKey.Status.PENDING,
+              created_at__lte=now - timedelta(seconds=config['PENDING_TIMEOUT']))
+        ).delete()
+        return keys.get_or_create(
+            scope=scope, key=key,
+            defaults={
+                'fingerprint': fingerprint,
+                'expires_at': now + timedelta(seconds=config['TTL_SECONDS']),
+            }
+        )
+
+    return insert()
+
+
+def wait_for(record):
+    """
+    Wait until a pending key completes or is released.
+
+    Waiters in the process running the first attempt are woken by it
+    directly; others poll the table. Returns the completed row, None if
+    the attempt failed and released the key, or the still pending row
+    after `WAIT_SECONDS`.
+    """
+    config = idempotency_settings()
+    deadline = time.monotonic() + config['WAIT_SECONDS']
+    while time.monotonic() < deadline:
+        event = _in_flight.get((record.scope, record.key))
+        if event is not None:
+            event.wait(config['POLL_SECONDS'])
+        else:
+            time.sleep(config['POLL_SECONDS'])
+        current = IdempotencyKey.objects.using(record._state.db).filter(pk=record.pk).first()
+        if current is None or current.status == IdempotencyKey.Status.DONE:
+            return current
+    return record
+
+
+def replay(record, data):
+    """
+    Return the response of a completed key with the given data.
+    """
+    return Response(
+        data,
+        status=record.status_code,
+        headers={**record.response_headers, REPLAYED_HEADER: 'true'}
+    )
+
+
+def execute(record, handler, stored_data):
+    """
+    Run the first attempt of a request and store its response if it succeeds.
+
+    `handler` is called without arguments and `stored_data` returns the
+    data to store for its response. The response is stored in the
+    transaction of the write itself, on the database holding the key,
+    so a write is never committed without its response.
+    """
+    event = threading.Event()
+    with _in_flight_lock:
+        _in_flight[(record.scope, record.key)] = event
+    using = record._state.db
+    keys = IdempotencyKey.objects.using(using).filter(pk=record.pk)
+
+    @retry_on_locked(using=using)
+    def run():
+        response = handler()
+        if status.is_success(response.status_code):
+            keys.update(
+                status=IdempotencyKey.Status.DONE,
+                status_code=response.status_code,
+                response_data=stored_data(response),
+                response_headers={
+                    name: value for name, value in response.items() if name.lower() == 'location'
+                }
+            )
+        else:
+            keys.delete()
+        return response
+
+    try:
+        return run()
+    except Exception:
+        keys.delete()
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop((record.scope, record.key), None)
+        event.set()
+
+
+class IdempotentMixin:
+    """
+    Honour the `Idempotency-Key` header on a view's write handlers.
+
+    Views wrap a handler with `self.idempotent(handler, request, ...)`.
+    Only requests whose method is in `idempotent_methods` are affected;
+    requests without the header run as usual.
+    """
+
+
+    idempotent_methods = ('POST',)
+
+    def idempotency_database(self):
+        """
+        Return the database the view writes to, which stores its keys.
+        """
+        return router.db_for_write(IdempotencyKey)
+
+    def stored_data(self, response):
+        """
+        Return the data of a successful response to store for replays.
+        """
+        return response.data
+
+    def replayed_data(self, data):
+        """
+        Return the response data to replay from the stored data.
+        """
+        return data
+
+    def idempotent(self, handler, request, *args, **kwargs):
+        """
+        Run `handler` once per idempotency key and replay its response for retries.
+        """
+        key = request.headers.get(HEADER)
+        if key is None or request.method not in self.idempotent_methods:
+            return handler(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {"error": f"{HEADER} must be between 1 and {MAX_KEY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        scope = request_scope(request)
+        fingerprint = request_fingerprint(request)
+        using = self.idempotency_database()
+        while True:
+            record, created = claim(scope, key, fingerprint, using)
+            if created:
+                return execute(record, lambda: handler(request, *args, **kwargs), self.stored_data)
+            if record.fingerprint != fingerprint:
+                return Response(
+                    {"error": f"{HEADER} was already used for a different request."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            if record.status == IdempotencyKey.Status.PENDING:
+                record = wait_for(record)
+                if record is None:
+                    continue
+                if record.status == IdempotencyKey.Status.PENDING:
+                    return Response(
+                        {"error": f"A request with this {HEADER} is still in progress."},
+                        status=status.HTTP_409_CONFLICT
+                    )
+            return replay(record, self.replayed_data(record.response_data))
+
+
+def clear_expired():
+    """
+    Delete expired keys on every database storing them and return how
+    many were deleted.
+    """
+    now = timezone.now()
+    deleted = 0
+    for alias in connections:
+        if router.allow_migrate_model(alias, IdempotencyKey):
+            count, _ = IdempotencyKey.objects.using(alias).filter(expires_at__lte=now).delete()
+            deleted += count
+    return deleted
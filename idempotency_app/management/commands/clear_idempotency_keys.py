@@ -0,0 +1,30 @@
+"""
+Delete expired idempotency keys.
+
+Expired keys are replaced when a client reuses them, but keys that are
+never reused stay in the table until this command deletes them. Run it
+periodically, e.g. from cron.
+
+Usage:
+    python manage.py clear_idempotency_keys
+"""
+
+
+from django.core.management.base import BaseCommand
+
+from idempotency_app.idempotency import clear_expired
+
+
+class Command(BaseCommand):
+    """
+    Delete idempotency keys past their expiry.
+    """
+
+
+    help = "Delete expired idempotency keys."
+
+    def handle(self, *args, **options):
+        """
+        Delete the expired keys and report how many were deleted.
+        """
+        self.stdout.write(f"Deleted {clear_expired()} expired idempotency keys.")
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def discard_registration_keys(apps, schema_editor):
+    """
+    Drop stored registrations, whose responses hold auth tokens and
+    whose fingerprints were unkeyed hashes of the password.
+    """
+    IdempotencyKey = apps.get_model('idempotency_app', 'IdempotencyKey')
+    IdempotencyKey.objects.using(schema_editor.connection.alias) \
+        .filter(scope__endswith=' POST /api/registration/').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('idempotency_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(discard_registration_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+"""
+Database models for idempotent API requests.
+
+- IdempotencyKey: The outcome of a request sent with an
+  `Idempotency-Key` header, replayed for retries of that request.
+"""
+
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class IdempotencyKey(models.Model):
+    """
+    A client-chosen key for one write request and its stored response.
+
+    Keys are unique per scope (requesting user, method and path). The
+    row is created as pending before the request runs, so concurrent
+    duplicates can wait for it, and completed with the response once
+    the write has succeeded. It expires after the configured TTL.
+    """
+
+
+    class Status(models.TextChoices):
+        """
+        Enumeration for request states.
+        """
+        PENDING = 'pending', 'Pending'
+        DONE = 'done', 'Done'
+
+    scope = models.CharField(max_length=255)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_data = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    response_headers = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'key'], name='idempotency_key_unique'),
+        ]
+
+    def __str__(self):
+        return f"IdempotencyKey: {self.key} ({self.status})"
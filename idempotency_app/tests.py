@@ -0,0 +1,239 @@
+"""
+Tests for idempotent API requests.
+"""
+
+
+import hashlib
+import json
+import threading
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from idempotency_app.idempotency import REPLAYED_HEADER
+from idempotency_app.models import IdempotencyKey
+from kanban_app.models import Board, Comment, Task
+from kanban_app.sharding import is_sharded, shard_for_board
+
+
+class IdempotencyKeyTest(TestCase):
+    """
+    Writes sent with an Idempotency-Key run once and are replayed for retries.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="Retry User", email="retry@example.com")
+        self.board = Board.objects.create(title="Retries", owner=self.user)
+        self.board.members.add(self.user)
+        self.task = Task.objects.create(
+            board=self.board, title="Task", description="", due_date=date(2025, 1, 1))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_task(self, key, title="Retried"):
+        return self.client.post('/api/tasks/', {
+            'board': self.board.id, 'title': title, 'description': "Retry", 'status': 'to-do',
+            'priority': 'high', 'due_date': '2025-02-01'
+        }, format='json', headers={'Idempotency-Key': key})
+
+    def test_retry_replays_response_without_creating_twice(self):
+        first = self.create_task('create-1')
+        second = self.create_task('create-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual((second.status_code, second.json()), (201, first.json()))
+        self.assertEqual(second[REPLAYED_HEADER], 'true')
+        self.assertNotIn(REPLAYED_HEADER, first)
+        self.assertEqual(Task.objects.filter(title="Retried").count(), 1)
+
+    def test_keys_are_scoped_to_the_user(self):
+        other = User.objects.create_user(username="Other User", email="other@example.com")
+        self.board.members.add(other)
+        self.create_task('shared-key')
+        self.client.force_authenticate(other)
+        response = self.create_task('shared-key')
+        self.assertNotIn(REPLAYED_HEADER, response)
+        self.assertEqual(Task.objects.filter(title="Retried").count(), 2)
+
+    def test_reused_key_with_different_payload_is_rejected(self):
+        self.create_task('create-2')
+        response = self.create_task('create-2', title="Something else")
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(Task.objects.filter(title="Something else").exists())
+
+    def test_failed_request_releases_the_key(self):
+        response = self.client.post(
+            f'/api/tasks/{self.task.id}/comments/', {}, format='json',
+            headers={'Idempotency-Key': 'comment-1'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_requests_without_key_are_not_recorded(self):
+        self.client.post(f'/api/tasks/{self.task.id}/comments/', {'content': "Hi"}, format='json')
+        self.client.post(f'/api/tasks/{self.task.id}/comments/', {'content': "Hi"}, format='json')
+        self.assertEqual(Comment.objects.filter(task=self.task).count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_invalid_key_is_rejected(self):
+        self.assertEqual(self.create_task('').status_code, 400)
+        self.assertEqual(self.create_task('k' * 256).status_code, 400)
+
+    def test_comment_retry_is_replayed(self):
+        for _ in range(2):
+            response = self.client.post(
+                f'/api/tasks/{self.task.id}/comments/', {'content': "Once"}, format='json',
+                headers={'Idempotency-Key': 'comment-2'})
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(Comment.objects.filter(task=self.task).count(), 1)
+
+    def test_patch_retry_is_replayed(self):
+        response = self.client.patch(
+            f'/api/tasks/{self.task.id}/', {'title': "Patched"}, format='json',
+            headers={'Idempotency-Key': 'patch-1'})
+        Task.objects.filter(pk=self.task.pk).update(title="Changed since")
+        retry = self.client.patch(
+            f'/api/tasks/{self.task.id}/', {'title': "Patched"}, format='json',
+            headers={'Idempotency-Key': 'patch-1'})
+        self.assertEqual(retry.json(), response.json())
+        self.assertEqual(retry[REPLAYED_HEADER], 'true')
+        self.assertEqual(Task.objects.get(pk=self.task.pk).title, "Changed since")
+
+    def test_registration_retry_is_replayed(self):
+        client = APIClient()
+        body = {
+            'fullname': 'New User', 'email': 'new@example.com',
+            'password': 'pw-one', 'repeated_password': 'pw-one'
+        }
+        first = client.post('/api/registration/', body, format='json', headers={'Idempotency-Key': 'signup'})
+        second = client.post('/api/registration/', body, format='json', headers={'Idempotency-Key': 'signup'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(User.objects.filter(email='new@example.com').count(), 1)
+
+        record = IdempotencyKey.objects.get(key='signup')
+        self.assertEqual(record.response_data, {'user_id': first.json()['user_id']})
+        self.assertNotIn(first.json()['token'], str(record.response_data))
+        self.assertNotEqual(record.fingerprint,
+                            hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest())
+        with override_settings(SECRET_KEY='another-secret-key-for-fingerprints-0123456789'):
+            third = client.post('/api/registration/', body, format='json', headers={'Idempotency-Key': 'signup'})
+        self.assertEqual(third.status_code, 422)
+
+    def test_duplicate_waits_for_running_request(self):
+        first = self.create_task('running')
+        record = IdempotencyKey.objects.get(key='running')
+        IdempotencyKey.objects.filter(pk=record.pk).update(
+            status=IdempotencyKey.Status.PENDING, response_data=None)
+
+        def finish(seconds):
+            IdempotencyKey.objects.filter(pk=record.pk).update(
+                status=IdempotencyKey.Status.DONE, response_data=first.json())
+
+        with mock.patch('idempotency_app.idempotency.time.sleep', side_effect=finish) as sleep:
+            response = self.create_task('running')
+        sleep.assert_called_once()
+        self.assertEqual(response.json(), first.json())
+        self.assertEqual(Task.objects.filter(title="Retried").count(), 1)
+
+    @override_settings(IDEMPOTENCY={'WAIT_SECONDS': 0.0})
+    def test_duplicate_of_slow_request_gets_conflict(self):
+        self.create_task('slow')
+        IdempotencyKey.objects.filter(key='slow').update(status=IdempotencyKey.Status.PENDING)
+        self.assertEqual(self.create_task('slow').status_code, 409)
+
+    def test_abandoned_and_expired_keys_are_taken_over(self):
+        self.create_task('stale')
+        IdempotencyKey.objects.filter(key='stale').update(
+            status=IdempotencyKey.Status.PENDING, created_at=timezone.now() - timedelta(hours=1))
+        self.assertNotIn(REPLAYED_HEADER, self.create_task('stale'))
+
+        IdempotencyKey.objects.filter(key='stale').update(expires_at=timezone.now())
+        self.assertNotIn(REPLAYED_HEADER, self.create_task('stale'))
+        self.assertEqual(Task.objects.filter(title="Retried").count(), 3)
+
+    def test_keys_are_stored_on_the_shard_of_the_write(self):
+        if not is_sharded():
+            self.skipTest("Requires BOARD_SHARDS, e.g. core.settings_sharded.")
+        shard = DEFAULT_DB_ALIAS
+        while shard == DEFAULT_DB_ALIAS:
+            response = self.client.post('/api/boards/', {'title': "Sharded", 'members': [self.user.id]})
+            board_id = response.json()['id']
+            shard = shard_for_board(board_id)
+
+        for _ in range(2):
+            response = self.client.post('/api/tasks/', {
+                'board': board_id, 'title': "On shard", 'description': "Retry", 'status': 'to-do',
+                'priority': 'high', 'due_date': '2025-02-01'
+            }, format='json', headers={'Idempotency-Key': 'sharded'})
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.using(shard).filter(title="On shard").count(), 1)
+        self.assertTrue(IdempotencyKey.objects.using(shard).filter(key='sharded').exists())
+        self.assertFalse(IdempotencyKey.objects.using(DEFAULT_DB_ALIAS).filter(key='sharded').exists())
+
+        IdempotencyKey.objects.using(shard).update(expires_at=timezone.now())
+        call_command('clear_idempotency_keys', stdout=StringIO())
+        self.assertFalse(IdempotencyKey.objects.using(shard).exists())
+
+    def test_clear_command_deletes_expired_keys(self):
+        self.create_task('old')
+        self.create_task('new')
+        IdempotencyKey.objects.filter(key='old').update(expires_at=timezone.now())
+        out = StringIO()
+        call_command('clear_idempotency_keys', stdout=out)
+        self.assertIn("Deleted 1", out.getvalue())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['new'])
+
+
+class ConcurrentIdempotencyTest(TransactionTestCase):
+    """
+    Concurrent duplicates of a request are coalesced into one write.
+
+    Needs a file-based SQLite database, e.g. core.settings_production.
+    """
+
+
+    databases = '__all__'
+    threads = 6
+
+    def setUp(self):
+        if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+            self.skipTest("Requires a file-based SQLite database, e.g. core.settings_production.")
+        self.user = User.objects.create_user(username="Racer", email="racer@example.com")
+        self.board = Board.objects.create(title="Race", owner=self.user)
+        self.board.members.add(self.user)
+        self.task = Task.objects.create(
+            board=self.board, title="Task", description="", due_date=date(2025, 1, 1))
+
+    def test_concurrent_duplicates_write_once(self):
+        responses = []
+        barrier = threading.Barrier(self.threads)
+
+        def worker():
+            client = APIClient()
+            client.force_authenticate(self.user)
+            barrier.wait()
+            try:
+                responses.append(client.post(
+                    f'/api/tasks/{self.task.id}/comments/', {'content': "Once"}, format='json',
+                    headers={'Idempotency-Key': 'race'}))
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual([response.status_code for response in responses], [201] * self.threads)
+        self.assertEqual(len({response.json()['id'] for response in responses}), 1)
+        self.assertEqual(Comment.objects.filter(task=self.task).count(), 1)
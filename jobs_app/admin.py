@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from jobs_app.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'priority', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'name']
+    search_fields = ['key']
@@ -0,0 +1,60 @@
+"""
+Serializers for the background job API.
+
+This module provides serializers for:
+- Reporting the state and outcome of a job.
+- Validating requests to enqueue a job.
+"""
+
+
+from rest_framework import serializers
+
+from jobs_app.models import Job
+from jobs_app.queue import registered_jobs
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the state and outcome of a job.
+    """
+
+
+    class Meta:
+        model = Job
+        fields = [
+            'id',
+            'name',
+            'key',
+            'payload',
+            'priority',
+            'status',
+            'attempts',
+            'max_attempts',
+            'run_after',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'result',
+            'error'
+        ]
+        read_only_fields = fields
+
+
+class EnqueueJobSerializer(serializers.Serializer):
+    """
+    Serializer for a request to enqueue a job.
+    """
+
+
+    name = serializers.CharField()
+    payload = serializers.DictField(required=False, default=dict)
+    key = serializers.CharField(required=False, allow_null=True, default=None, max_length=255)
+    priority = serializers.IntegerField(required=False, default=0, min_value=-100, max_value=100)
+
+    def validate_name(self, value):
+        """
+        Ensure a handler is registered under the name.
+        """
+        if value not in registered_jobs():
+            raise serializers.ValidationError('Unknown job')
+        return value
@@ -0,0 +1,88 @@
+"""
+API views for the background job queue.
+
+This module provides:
+- JobListCreateView: Lists the user's jobs and lets admins enqueue jobs.
+- JobDetailView: Reports the state of one job for polling.
+"""
+
+
+from rest_framework import generics, status
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from jobs_app.models import Job
+from jobs_app.queue import enqueue
+from kanban_app.api.pagination import KeysetPagination
+from .serializers import JobSerializer, EnqueueJobSerializer
+
+
+def visible_jobs(user):
+    """
+    Return the jobs a user may see: all for staff, their own otherwise.
+    """
+    if user.is_staff:
+        return Job.objects.all()
+    return Job.objects.filter(created_by=user)
+
+
+class JobListCreateView(APIView):
+    """
+    API view for listing jobs and enqueueing new ones.
+    """
+
+
+    def get_permissions(self):
+        """
+        Allow any authenticated user to list, and only admins to enqueue.
+        """
+        if self.request.method == 'POST':
+            return [IsAdminUser()]
+        return [IsAuthenticated()]
+
+    def get(self, request):
+        """
+        Handle GET request to list visible jobs, newest first, with cursor pagination.
+        """
+        jobs = visible_jobs(request.user)
+        if 'status' in request.query_params:
+            jobs = jobs.filter(status=request.query_params['status'])
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(jobs, request, self, ordering=['-id'])
+        return paginator.get_paginated_response(JobSerializer(page, many=True).data)
+
+    def post(self, request):
+        """
+        Handle POST request to enqueue a job.
+
+        Returns 201 with the new job, or 200 with the existing job if
+        one with the same key was enqueued before.
+        """
+        serializer = EnqueueJobSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        job, created = enqueue(
+            data['name'], data['payload'],
+            key=data['key'], priority=data['priority'], user=request.user
+        )
+        return Response(
+            JobSerializer(job).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    """
+    API view for polling the state of a job.
+    """
+
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        """
+        Return the jobs visible to the requesting user.
+        """
+        return visible_jobs(self.request.user)
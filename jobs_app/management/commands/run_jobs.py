@@ -0,0 +1,76 @@
+"""
+Run background job workers.
+
+Usage:
+    python manage.py run_jobs                    # JOBS['WORKERS'] threads
+    python manage.py run_jobs --workers 4 --processes
+    python manage.py run_jobs --once             # drain the queue and exit
+
+Threads suit jobs that mostly wait on the database; processes suit
+CPU-bound jobs such as password hashing. Stop with Ctrl+C; running jobs
+are finished first.
+"""
+
+
+import multiprocessing
+import threading
+
+from django.core.management.base import BaseCommand
+
+from jobs_app.queue import job_settings, registered_jobs
+from jobs_app.process import work_in_process
+from jobs_app.worker import work
+
+
+class Command(BaseCommand):
+    """
+    Start a pool of job workers.
+    """
+
+
+    help = "Run background job workers in threads or processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Number of workers (default JOBS['WORKERS']).")
+        parser.add_argument('--processes', action='store_true',
+                            help="Run each worker in its own process instead of a thread.")
+        parser.add_argument('--poll', type=float, default=None,
+                            help="Seconds to wait when the queue is empty.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        """
+        Start the workers and wait for them to stop.
+        """
+        count = options['workers'] or job_settings()['WORKERS']
+        kind = 'processes' if options['processes'] else 'threads'
+        self.stdout.write(
+            f"Starting {count} worker {kind} for: {', '.join(registered_jobs()) or 'no handlers'}")
+
+        if options['processes']:
+            context = multiprocessing.get_context('spawn')
+            stop = context.Event()
+            workers = [
+                context.Process(target=work_in_process, args=(index, stop, options['poll'], options['once']))
+                for index in range(count)
+            ]
+        else:
+            stop = threading.Event()
+            workers = [
+                threading.Thread(target=work, args=(index, stop, options['poll'], options['once']))
+                for index in range(count)
+            ]
+
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping workers after their current jobs...")
+            stop.set()
+            for worker in workers:
+                worker.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-19 10:49
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def lease_running_jobs(apps, schema_editor):
+    """
+    Give running jobs the lease they had when leases ran from `started_at`.
+    """
+    Job = apps.get_model('jobs_app', 'Job')
+    lease = timedelta(seconds=getattr(settings, 'JOBS', {}).get('LEASE_SECONDS', 600))
+    jobs = Job.objects.using(schema_editor.connection.alias).filter(status='running', started_at__isnull=False)
+    for job in jobs:
+        job.lease_expires_at = job.started_at + lease
+        job.save(update_fields=['lease_expires_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(lease_running_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+"""
+Entry point of worker processes started by `run_jobs --processes`.
+
+Spawned processes import the target's module before Django is set up,
+so this module must not import models at module level.
+"""
+
+
+def work_in_process(index, stop, poll=None, once=False):
+    """
+    Set up Django in the new process and run a worker loop.
+    """
+    import django
+    django.setup()
+
+    from jobs_app.worker import work
+    work(index, stop, poll, once)
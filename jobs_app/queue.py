@@ -0,0 +1,221 @@
+"""
+Enqueueing, claiming and running background jobs.
+
+Handlers are plain functions registered under a name with `register`.
+Their keyword arguments come from the job's JSON payload and their
+return value is stored as the job's result; a result that is not
+JSON-serializable fails the run.
+
+Jobs live in the database, so any process can enqueue them and any
+worker process can run them; no outside broker is needed. A worker
+claims a job with a conditional UPDATE, so two workers never run the
+same job. Failed jobs are retried with exponential backoff until
+`max_attempts` is reached.
+
+A claimed job is leased to its worker for `LEASE_SECONDS`, and the
+worker renews the lease while the job runs. Jobs left running by a
+crashed worker are claimed again once their lease has expired; that
+counts as another attempt, so a job that keeps killing its worker fails
+after `max_attempts` like any other.
+"""
+
+
+import json
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from core.db import retry_on_locked
+from jobs_app.models import Job
+
+
+JOB_DEFAULTS = {
+    'WORKERS': 2,
+    'POLL_SECONDS': 1.0,
+    'MAX_ATTEMPTS': 3,
+    'BACKOFF_BASE': 2.0,
+    'BACKOFF_MAX': 300.0,
+    'LEASE_SECONDS': 600,
+}
+
+_handlers = {}
+
+
+def job_settings():
+    """
+    Return the job queue settings, filled in with defaults.
+    """
+    return {**JOB_DEFAULTS, **getattr(settings, 'JOBS', {})}
+
+
+def register(name):
+    """
+    Register the decorated function as the handler for jobs named `name`.
+    """
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def registered_jobs():
+    """
+    Return the names of all registered job handlers.
+    """
+    return sorted(_handlers)
+
+
+@retry_on_locked
+def enqueue(name, payload=None, *, key=None, priority=0, max_attempts=None, delay=0, user=None):
+    """
+    Queue a job and return (job, created).
+
+    With a `key`, an existing job with the same key is returned instead
+    of creating a new one, whatever its state.
+    """
+    if name not in _handlers:
+        raise LookupError(f"No job handler registered as {name!r}.")
+    values = {
+        'name': name,
+        'payload': payload or {},
+        'priority': priority,
+        'max_attempts': max_attempts or job_settings()['MAX_ATTEMPTS'],
+        'run_after': timezone.now() + timedelta(seconds=delay),
+        'created_by': user,
+    }
+    if key is None:
+        return Job.objects.create(**values), True
+    return Job.objects.get_or_create(key=key, defaults=values)
+
+
+def lease_end(now=None):
+    """
+    Return when a lease taken or renewed now expires.
+    """
+    return (now or timezone.now()) + timedelta(seconds=job_settings()['LEASE_SECONDS'])
+
+
+@retry_on_locked
+def claim(worker):
+    """
+    Mark the next runnable job as running by `worker` and return it, or None.
+
+    Running jobs whose lease has expired are runnable again, unless they
+    have used up their attempts; those are marked as failed instead.
+    """
+    now = timezone.now()
+    runnable = Job.objects.filter(
+        Q(status=Job.Status.QUEUED, run_after__lte=now) |
+        Q(status=Job.Status.RUNNING, lease_expires_at__lt=now)
+    ).order_by('-priority', 'run_after', 'id')
+    while True:
+        job = runnable.first()
+        if job is None:
+            return None
+        current = Job.objects.filter(id=job.id, status=job.status, attempts=job.attempts)
+        if job.status == Job.Status.RUNNING and job.attempts >= job.max_attempts:
+            current.update(
+                status=Job.Status.FAILED, finished_at=now, lease_expires_at=None,
+                error=f"The lease expired on attempt {job.attempts}; the worker running it stopped."
+            )
+            continue
+        claimed = current.update(
+            status=Job.Status.RUNNING, worker=worker, started_at=now,
+            lease_expires_at=lease_end(now), attempts=job.attempts + 1
+        )
+        if not claimed:
+            return None
+        job.refresh_from_db()
+        return job
+
+
+@retry_on_locked
+def renew_lease(job):
+    """
+    Extend the lease of a job the caller is running.
+
+    Returns False if the job is no longer this run's, e.g. because its
+    lease expired and another worker claimed it.
+    """
+    return bool(
+        Job.objects.filter(id=job.id, status=Job.Status.RUNNING, attempts=job.attempts)
+        .update(lease_expires_at=lease_end())
+    )
+
+
+def backoff(attempts):
+    """
+    Return the delay in seconds before retrying a job that failed `attempts` times.
+    """
+    options = job_settings()
+    delay = min(options['BACKOFF_BASE'] ** attempts, options['BACKOFF_MAX'])
+    return delay * random.uniform(0.5, 1.0)
+
+
+@retry_on_locked
+def finish(job, result=None, error=None):
+    """
+    Record the outcome of a job run and schedule a retry if it failed.
+    """
+    now = timezone.now()
+    if error is None:
+        job.status = Job.Status.SUCCEEDED
+        job.result = result
+        job.error = ''
+        job.finished_at = now
+    elif job.attempts < job.max_attempts:
+        job.status = Job.Status.QUEUED
+        job.error = error
+        job.run_after = now + timedelta(seconds=backoff(job.attempts))
+    else:
+        job.status = Job.Status.FAILED
+        job.error = error
+        job.finished_at = now
+    job.lease_expires_at = None
+    job.save(update_fields=['status', 'result', 'error', 'finished_at', 'run_after', 'lease_expires_at'])
+
+
+def run_job(job):
+    """
+    Call the job's handler and record the outcome.
+    """
+    try:
+        handler = _handlers[job.name]
+    except KeyError:
+        finish(job, error=f"No job handler registered as {job.name!r}.")
+        return job
+    try:
+        result = handler(**job.payload)
+        json.dumps(result)
+    except Exception:
+        finish(job, error=traceback.format_exc())
+    else:
+        finish(job, result=result)
+    return job
+
+
+def run_next(worker):
+    """
+    Claim and run one job. Returns False if no job was runnable.
+    """
+    job = claim(worker)
+    if job is None:
+        return False
+    run_job(job)
+    return True
+
+
+def run_pending(worker='inline'):
+    """
+    Run runnable jobs in the calling thread until none is left.
+
+    Returns the number of jobs run. Useful in tests and scripts.
+    """
+    count = 0
+    while run_next(worker):
+        count += 1
+    return count
@@ -0,0 +1,145 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jobs_app.models import Job
+from jobs_app.queue import claim, enqueue, register, renew_lease, run_pending
+from jobs_app.worker import lease_kept
+
+
+calls = []
+
+
+@register('test_record')
+def record(value):
+    calls.append(value)
+    return {'value': value}
+
+
+@register('test_fail')
+def fail():
+    raise RuntimeError("boom")
+
+
+@register('test_unserializable')
+def unserializable():
+    return object()
+
+
+class JobQueueTest(TestCase):
+    """
+    Jobs run by priority, are created once per key and retried with backoff.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        calls.clear()
+
+    def test_jobs_run_by_priority(self):
+        enqueue('test_record', {'value': 'low'}, priority=-1)
+        enqueue('test_record', {'value': 'high'}, priority=5)
+        enqueue('test_record', {'value': 'normal'})
+        self.assertEqual(run_pending(), 3)
+        self.assertEqual(calls, ['high', 'normal', 'low'])
+        self.assertEqual(
+            set(Job.objects.values_list('status', flat=True)), {Job.Status.SUCCEEDED})
+
+    def test_job_key_is_idempotent(self):
+        first, created = enqueue('test_record', {'value': 1}, key='once')
+        second, created_again = enqueue('test_record', {'value': 2}, key='once')
+        self.assertEqual((first.id, created, created_again), (second.id, True, False))
+        run_pending()
+        self.assertEqual(calls, [1])
+
+    def test_delayed_job_is_not_claimed_early(self):
+        enqueue('test_record', {'value': 1}, delay=60)
+        self.assertIsNone(claim('test'))
+
+    @override_settings(JOBS={'MAX_ATTEMPTS': 2, 'BACKOFF_BASE': 10.0})
+    def test_failed_job_is_retried_with_backoff_then_failed(self):
+        job, _ = enqueue('test_fail')
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=4))
+        self.assertIn("RuntimeError: boom", job.error)
+
+        later = timezone.now() + timedelta(seconds=11)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+
+    @override_settings(JOBS={'MAX_ATTEMPTS': 1})
+    def test_unserializable_result_fails_the_job(self):
+        job, _ = enqueue('test_unserializable')
+        enqueue('test_record', {'value': 'after'}, priority=-1)
+        self.assertEqual(run_pending(), 2)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (Job.Status.FAILED, None))
+        self.assertIn("not JSON serializable", job.error)
+        self.assertEqual(calls, ['after'])
+
+    @override_settings(JOBS={'MAX_ATTEMPTS': 2, 'LEASE_SECONDS': 60})
+    def test_expired_lease_is_claimed_again_until_attempts_run_out(self):
+        job, _ = enqueue('test_record', {'value': 1})
+        self.assertEqual(claim('crashed').attempts, 1)
+        self.assertIsNone(claim('other'))
+
+        later = timezone.now() + timedelta(seconds=61)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            reclaimed = claim('other')
+        self.assertEqual((reclaimed.id, reclaimed.worker, reclaimed.attempts), (job.id, 'other', 2))
+
+        with mock.patch('django.utils.timezone.now', return_value=later + timedelta(seconds=61)):
+            self.assertIsNone(claim('third'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+        self.assertIn("lease expired", job.error)
+
+    @override_settings(JOBS={'LEASE_SECONDS': 60})
+    def test_renewed_lease_keeps_a_long_job_from_being_claimed_again(self):
+        enqueue('test_record', {'value': 1})
+        job = claim('slow')
+        later = timezone.now() + timedelta(seconds=50)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertTrue(renew_lease(job))
+        with mock.patch('django.utils.timezone.now', return_value=later + timedelta(seconds=50)):
+            self.assertIsNone(claim('other'))
+
+    @override_settings(JOBS={'LEASE_SECONDS': 0.03})
+    def test_worker_renews_the_lease_while_the_job_runs(self):
+        enqueue('test_record', {'value': 1})
+        job = claim('slow')
+        with mock.patch('jobs_app.worker.renew_lease', return_value=True) as renew:
+            with lease_kept(job):
+                time.sleep(0.1)
+        self.assertGreaterEqual(renew.call_count, 2)
+        renew.assert_called_with(job)
+
+    def test_status_endpoints(self):
+        admin = User.objects.create_user(username="Admin", email="admin@example.com", is_staff=True)
+        other = User.objects.create_user(username="Other", email="other@example.com")
+        client = APIClient()
+        client.force_authenticate(admin)
+
+        body = {'name': 'test_record', 'payload': {'value': 7}, 'key': 'api'}
+        response = client.post('/api/jobs/', body, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(client.post('/api/jobs/', body, format='json').status_code, 200)
+        self.assertEqual(client.post('/api/jobs/', {'name': 'nope'}, format='json').status_code, 400)
+
+        run_pending()
+        job = client.get(f"/api/jobs/{response.json()['id']}/").json()
+        self.assertEqual((job['status'], job['result']), ('succeeded', {'value': 7}))
+
+        client.force_authenticate(other)
+        self.assertEqual(client.get(f"/api/jobs/{job['id']}/").status_code, 404)
+        self.assertEqual(client.post('/api/jobs/', body, format='json').status_code, 403)
@@ -0,0 +1,79 @@
+"""
+Worker loops for the background job queue.
+
+A worker repeatedly claims and runs jobs, sleeping for the poll
+interval whenever the queue is empty. While a job runs, a helper thread
+renews its lease every third of `LEASE_SECONDS`, so long jobs are not
+claimed by a second worker. `run_jobs` starts several workers, either
+as threads of one process or as separate processes; see
+`jobs_app.process` for the latter.
+"""
+
+
+import logging
+import os
+import socket
+import threading
+from contextlib import contextmanager
+
+from django.db import connections
+
+from jobs_app.queue import claim, job_settings, renew_lease, run_job
+
+
+logger = logging.getLogger(__name__)
+
+
+def worker_name(index):
+    """
+    Return a name identifying a worker in job records.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+@contextmanager
+def lease_kept(job):
+    """
+    Renew the job's lease in a helper thread while the block runs.
+    """
+    done = threading.Event()
+    interval = job_settings()['LEASE_SECONDS'] / 3
+
+    def renew():
+        try:
+            while not done.wait(interval):
+                try:
+                    if not renew_lease(job):
+                        return
+                except Exception:
+                    logger.exception("Renewing the lease of job %s failed", job.id)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=renew, name=f"job-{job.id}-lease", daemon=True)
+    thread.start()
+    try:
+        yield job
+    finally:
+        done.set()
+        thread.join()
+
+
+def work(index, stop, poll=None, once=False):
+    """
+    Run jobs until `stop` is set, or until the queue is empty with `once`.
+    """
+    poll = job_settings()['POLL_SECONDS'] if poll is None else poll
+    name = worker_name(index)
+    try:
+        while not stop.is_set():
+            job = claim(name)
+            if job is None:
+                if once:
+                    return
+                stop.wait(poll)
+                continue
+            with lease_kept(job):
+                run_job(job)
+    finally:
+        connections.close_all()
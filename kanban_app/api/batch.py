@@ -0,0 +1,177 @@
+"""
+In-process execution of the sub-requests of a batch request.
+
+`POST /api/batch/` carries many calls to the Kanban API in one HTTP
+request. Every sub-request is resolved against `kanban_app.api.urls`
+and dispatched straight to its view, skipping the middleware and the
+token lookup the batch request has already been through:
+- Sub-requests are authenticated as the user of the batch request.
+- They share a request-scoped cache (`core.request_cache`), so board
+  and membership checks repeated across them run once. The cache is
+  cleared after every write.
+- With `atomic`, all of them run in one transaction per database, which
+  is rolled back if any sub-request fails.
+- A sub-request raising an exception is logged and answered with a 500
+  of its own; the other sub-requests are unaffected.
+"""
+
+
+import logging
+from contextlib import ExitStack
+from io import BytesIO
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from core.db import is_locked_error, retry_on_locked
+from core.renderers import FastJSONRenderer
+from core.request_cache import clear_request_cache
+from kanban_app.documents import loads
+from kanban_app.sharding import shards
+
+
+PATH_PREFIX = '/api/'
+URLCONF = 'kanban_app.api.urls'
+INHERITED_HEADERS = ('HTTP_HOST', 'HTTP_AUTHORIZATION', 'HTTP_USER_AGENT')
+DROPPED_RESPONSE_HEADERS = ('content-type', 'content-length', 'vary')
+
+logger = logging.getLogger(__name__)
+
+
+class BatchFailed(Exception):
+    """
+    Raised to roll back an atomic batch after a sub-request failed.
+    """
+
+
+    def __init__(self, responses):
+        super().__init__(f"Sub-request {len(responses) - 1} failed.")
+        self.responses = responses
+
+
+def resolve_path(path):
+    """
+    Return the URL match and query string of a sub-request path.
+
+    Raises Resolver404 for paths outside the Kanban API.
+    """
+    path, _, query = path.partition('?')
+    if not path.startswith(PATH_PREFIX):
+        raise Resolver404({'path': path})
+    return resolve('/' + path[len(PATH_PREFIX):], urlconf=URLCONF), query
+
+
+def build_request(request, item, query):
+    """
+    Return a Django request for a sub-request, authenticated like `request`.
+    """
+    body = b''
+    if item.get('body') is not None and item['method'] not in SAFE_METHODS:
+        body = FastJSONRenderer().render(item['body'])
+    environ = {
+        key: value for key, value in request.META.items()
+        if not key.startswith('HTTP_') or key in INHERITED_HEADERS
+    }
+    for name, value in item.get('headers', {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    environ.update({
+        'REQUEST_METHOD': item['method'],
+        'SCRIPT_NAME': '',
+        'PATH_INFO': item['path'].partition('?')[0],
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'HTTP_ACCEPT': 'application/json',
+        'wsgi.input': BytesIO(body),
+    })
+    environ.pop('HTTP_ACCEPT_ENCODING', None)
+    sub_request = WSGIRequest(environ)
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def response_data(response):
+    """
+    Return the status, headers and body of a sub-request's response.
+    """
+    if isinstance(response, Response):
+        body = response.data
+    else:
+        body = loads(response.content) if response.content else None
+    return {
+        'status': response.status_code,
+        'headers': {
+            name: value for name, value in response.items()
+            if name.lower() not in DROPPED_RESPONSE_HEADERS
+        },
+        'body': body,
+    }
+
+
+def run_one(request, item):
+    """
+    Dispatch one sub-request and return its response data.
+
+    Exceptions raised by the view become a 500 for this sub-request.
+    Lock errors inside an atomic batch are raised, so the whole batch
+    is retried.
+    """
+    try:
+        match, query = resolve_path(item['path'])
+    except Resolver404:
+        return {'status': status.HTTP_404_NOT_FOUND, 'headers': {}, 'body': {'detail': "Not found."}}
+    if match.url_name == 'batch':
+        return {
+            'status': status.HTTP_400_BAD_REQUEST, 'headers': {},
+            'body': {'detail': "Batch requests cannot be nested."}
+        }
+    try:
+        response = match.func(build_request(request, item, query), *match.args, **match.kwargs)
+        return response_data(response)
+    except Exception as exc:
+        if is_locked_error(exc) and transaction.get_connection().in_atomic_block:
+            raise
+        logger.exception("Batch sub-request %s %s failed", item['method'], item['path'])
+        return {
+            'status': status.HTTP_500_INTERNAL_SERVER_ERROR, 'headers': {},
+            'body': {'detail': "A server error occurred."}
+        }
+
+
+def run_batch(request, items, atomic=False):
+    """
+    Run the sub-requests in order and return their responses.
+
+    In an atomic batch, the first failing sub-request stops the batch
+    and rolls it back by raising BatchFailed with the responses so far.
+    """
+    responses = []
+    for item in items:
+        result = run_one(request, item)
+        responses.append(result)
+        if item['method'] not in SAFE_METHODS:
+            clear_request_cache()
+        if atomic and not status.is_success(result['status']):
+            raise BatchFailed(responses)
+    return responses
+
+
+@retry_on_locked
+def run_atomic_batch(request, items):
+    """
+    Run the sub-requests in one transaction per database.
+
+    The batch is retried while the default database is locked. Its
+    own atomic blocks make it roll back even when it runs inside an
+    outer transaction.
+    """
+    clear_request_cache()
+    with ExitStack() as stack:
+        for alias in dict.fromkeys([DEFAULT_DB_ALIAS, *shards()]):
+            stack.enter_context(transaction.atomic(using=alias))
+        return run_batch(request, items, atomic=True)
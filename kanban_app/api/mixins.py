@@ -0,0 +1,63 @@
+"""
+Reusable view mixins for the Kanban application API.
+"""
+
+
+from rest_framework.permissions import SAFE_METHODS
+
+from kanban_app.sharding import activate_shard, active_database, ensure_writable, shard_for_board, \
+    use_shard
+
+
+class ShardRoutingMixin:
+    """
+    Activate the shard of the board a request works on.
+
+    The shard is activated before authentication and permission checks,
+    so every query of the request, including those made by permissions
+    and serializers, is routed to it. Views override `get_board_id()`,
+    or `get_shard()` for requests that do not work on a single board.
+
+    Unsafe requests to a board that is being moved between shards are
+    answered with a 503 once they passed the permission checks.
+    Idempotency keys of the request are stored on its shard, next to
+    the write they belong to.
+    """
+
+
+    def get_board_id(self):
+        """
+        Return the ID of the board the current request works on, or None.
+        """
+        return None
+
+    def get_shard(self):
+        """
+        Return the shard alias for the current request, or None.
+        """
+        if self.board_id is None:
+            return None
+        return shard_for_board(self.board_id)
+
+    def idempotency_database(self):
+        """
+        Return the shard storing the request's idempotency keys.
+        """
+        return active_database()
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Scope the activated shard to this request.
+        """
+        with use_shard(None):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        """
+        Activate the request's shard before the usual checks run.
+        """
+        self.board_id = self.get_board_id()
+        activate_shard(self.get_shard(), self.board_id)
+        super().initial(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS:
+            ensure_writable(self.board_id, active_database())
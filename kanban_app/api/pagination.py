@@ -0,0 +1,139 @@
+"""
+Pagination classes for the Kanban application API.
+
+KeysetPagination pages through a queryset ordered by several keys
+without OFFSET: the cursor stores the ordering values of the last row
+of a page, and the next page starts strictly after that row. Results
+stay stable while rows are inserted or deleted between requests.
+"""
+
+
+import base64
+import json
+from datetime import date
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only cursor pagination over a multi-key ordering.
+
+    The view passes the ordering as a list of annotated or concrete
+    field names, each optionally prefixed with '-'. The last key must
+    be unique, e.g. 'id', for the order to be total.
+    """
+
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 50
+    max_page_size = 200
+
+    def get_page_size(self, request):
+        """
+        Return the requested page size, bounded by `max_page_size`.
+        """
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request, ordering, date_fields=()):
+        """
+        Return the ordering values stored in the request's cursor, or None.
+
+        Raises NotFound unless the cursor holds one scalar per sort key
+        and valid ISO dates for the keys in `date_fields`.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            if not isinstance(values, list) or len(values) != len(ordering) or not all(
+                    isinstance(value, (str, int, float)) and not isinstance(value, bool)
+                    for value in values):
+                raise ValueError("Cursor does not match the ordering.")
+            return [
+                date.fromisoformat(value) if key.lstrip('-') in date_fields else value
+                for key, value in zip(ordering, values)
+            ]
+        except (ValueError, TypeError, UnicodeDecodeError):
+            raise NotFound("Invalid cursor.")
+
+    def encode_cursor(self, values):
+        """
+        Return an opaque cursor for the given ordering values.
+        """
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def position_filter(self, ordering, values):
+        """
+        Return a filter selecting rows that sort strictly after `values`.
+
+        Builds (a > a0) OR (a = a0 AND b > b0) OR ..., with the comparison
+        flipped for descending keys.
+        """
+        condition = Q()
+        equal = Q()
+        for key, value in zip(ordering, values):
+            field = key.lstrip('-')
+            lookup = 'lt' if key.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def row_values(self, obj, ordering):
+        """
+        Return the JSON-compatible ordering values of a row.
+        """
+        values = []
+        for key in ordering:
+            value = getattr(obj, key.lstrip('-'))
+            values.append(value.isoformat() if isinstance(value, date) else value)
+        return values
+
+    def paginate_queryset(self, queryset, request, view=None, ordering=('id',), date_fields=()):
+        """
+        Return the page of `queryset` following the request's cursor.
+        """
+        self.request = request
+        self.ordering = list(ordering)
+        page_size = self.get_page_size(request)
+
+        values = self.decode_cursor(request, self.ordering, date_fields)
+        queryset = queryset.order_by(*self.ordering)
+        if values is not None:
+            try:
+                queryset = queryset.filter(self.position_filter(self.ordering, values))
+            except (ValueError, TypeError):
+                raise NotFound("Invalid cursor.")
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        """
+        Return the URL of the next page, or None on the last page.
+        """
+        if not self.has_next:
+            return None
+        cursor = self.encode_cursor(self.row_values(self.page[-1], self.ordering))
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        """
+        Return the page wrapped with a link to the next page.
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'results': data
+        })
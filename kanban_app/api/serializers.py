@@ -15,12 +15,24 @@ Classes:
         nested task and member data.
     CommentSerializer: Serializer for comments, including author
         username formatting.
+    BoardTaskFilterSerializer: Validates filter and ordering parameters
+        for a board's task listing.
+    CalendarRangeSerializer: Validates the date range of the task
+        calendar.
+    BoardMembersSerializer: Resolves the users to add to or remove
+        from a board.
+    BatchSerializer: Validates the sub-requests of a batch request.
+    ArchivedTaskSerializer, ArchivedTaskDetailSerializer: Read-only
+        views of archived tasks, the latter with their comments.
 """
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.functions import Lower
 from user_auth_app.api.serializers import UserAccountSerializer
-from kanban_app.models import Board, Task, Comment
+from user_auth_app.email_lookup import normalize_email
+from kanban_app.models import Board, Task, Comment, ArchivedTask, ArchivedComment
 
 
 class BoardSerializer(serializers.ModelSerializer):
@@ -190,7 +202,8 @@ class TaskSerializer(serializers.ModelSerializer):
         """
         Customize the representation of the task.
 
-        Adds a `comments_count` field for non-PATCH requests and removes
+        Adds a `comments_count` field for non-PATCH requests, taken from
+        a `comments_total` annotation when the queryset provides one, and removes
         the `board` field in certain GET, PATCH, and PUT contexts.
         """
         rep = super().to_representation(instance)
@@ -209,7 +222,10 @@ class TaskSerializer(serializers.ModelSerializer):
             'due_date': rep.get('due_date'),
         }
         if request and request.method != 'PATCH':
-            ordered['comments_count'] = instance.comments.count()
+            comments_total = getattr(instance, 'comments_total', None)
+            if comments_total is None:
+                comments_total = instance.comments.count()
+            ordered['comments_count'] = comments_total
         
         if request and request.method == 'GET' and '/boards/' in path or request.method in ['PATCH', 'PUT']:
             ordered.pop('board', None)
@@ -320,4 +336,224 @@ class CommentSerializer(serializers.ModelSerializer):
             'author': rep.get('author'),
             'content': rep.get('content')
         }
-        return ordered
\ No newline at end of file
+        return ordered
+
+
+class BoardTaskFilterSerializer(serializers.Serializer):
+    """
+    Serializer for the query parameters of a board's task listing.
+
+    Validates the filters and turns the comma-separated `ordering`
+    parameter into a list of sort keys that always ends with the task
+    ID, so the order is total and cursors stay stable.
+    """
+
+
+    ORDERING_FIELDS = {
+        'priority': 'priority_rank',
+        'status': 'status_rank',
+        'due_date': 'due_date',
+        'id': 'id',
+    }
+
+    status = serializers.ChoiceField(choices=Task.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Task.Priority.choices, required=False)
+    assignee = serializers.IntegerField(required=False)
+    reviewer = serializers.IntegerField(required=False)
+    creator = serializers.IntegerField(required=False)
+    due_from = serializers.DateField(required=False)
+    due_to = serializers.DateField(required=False)
+    ordering = serializers.CharField(required=False, default='-priority,due_date,id')
+
+    def validate_ordering(self, value):
+        """
+        Return the sort keys for the requested ordering.
+        """
+        keys = []
+        for name in filter(None, (part.strip() for part in value.split(','))):
+            field = name.lstrip('-')
+            if field not in self.ORDERING_FIELDS:
+                raise serializers.ValidationError(f"Cannot order by '{field}'.")
+            keys.append(name.replace(field, self.ORDERING_FIELDS[field]))
+        if not any(key.lstrip('-') == 'id' for key in keys):
+            keys.append('id')
+        return keys
+
+    def validate(self, data):
+        """
+        Ensure the due-date range is not inverted.
+        """
+        due_from = data.get('due_from')
+        due_to = data.get('due_to')
+        if due_from and due_to and due_from > due_to:
+            raise serializers.ValidationError({"due_to": "due_to must not be before due_from."})
+        return data
+
+
+
+class CalendarRangeSerializer(serializers.Serializer):
+    """
+    Serializer for the `from` and `to` query parameters of the task calendar.
+
+    Ranges are inclusive and limited to `MAX_DAYS` days.
+    """
+
+
+    MAX_DAYS = 366
+
+    def get_fields(self):
+        """
+        Declare the fields here, since `from` is a reserved word in Python.
+        """
+        return {
+            'from': serializers.DateField(),
+            'to': serializers.DateField(),
+        }
+
+    def validate(self, data):
+        """
+        Ensure the range is ordered and not longer than `MAX_DAYS`.
+        """
+        if data['from'] > data['to']:
+            raise serializers.ValidationError({"to": "to must not be before from."})
+        if (data['to'] - data['from']).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(
+                {"to": f"The range must not exceed {self.MAX_DAYS} days."})
+        return data
+
+
+def is_user_id(reference):
+    """
+    Return True if a member reference is a user ID made of ASCII digits.
+    """
+    return reference.isascii() and reference.isdigit()
+
+
+class BoardMembersSerializer(serializers.Serializer):
+    """
+    Serializer for a membership change on a board.
+
+    `members` lists user IDs, emails, or a mix of both. All of them are
+    resolved to users in a single query.
+    """
+
+
+    members = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=500
+    )
+
+    def validate_members(self, value):
+        """
+        Return the referenced users, failing if any reference is unknown.
+        """
+        ids = {int(reference) for reference in value if is_user_id(reference)}
+        emails = {normalize_email(reference) for reference in value if not is_user_id(reference)}
+
+        users = User.objects.annotate(email_lower=Lower('email')) \
+            .filter(Q(id__in=ids) | Q(email_lower__in=emails)) \
+            .only('id', 'email', 'username').order_by('id')
+        by_id = {}
+        by_email = {}
+        for user in users:
+            by_id[user.id] = user
+            by_email.setdefault(user.email_lower, user)
+
+        resolved = {}
+        unknown = []
+        for reference in value:
+            if is_user_id(reference):
+                user = by_id.get(int(reference))
+            else:
+                user = by_email.get(normalize_email(reference))
+            if user is None:
+                unknown.append(reference)
+            else:
+                resolved[user.id] = user
+        if unknown:
+            raise serializers.ValidationError(f"Unknown users: {', '.join(unknown)}")
+        return list(resolved.values())
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """
+    Serializer for one sub-request of a batch request.
+
+    `path` is a Kanban API path such as `/api/tasks/1/comments/`,
+    optionally with a query string; `body` is sent as JSON.
+    """
+
+
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False, allow_null=True)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+
+
+class BatchSerializer(serializers.Serializer):
+    """
+    Serializer for a batch request of up to `MAX_REQUESTS` sub-requests.
+    """
+
+
+    MAX_REQUESTS = 50
+
+    requests = BatchRequestSerializer(many=True, allow_empty=False, max_length=MAX_REQUESTS)
+    atomic = serializers.BooleanField(default=False)
+
+
+class ArchivedCommentSerializer(serializers.ModelSerializer):
+    """
+    Serializer for archived comments, shaped like CommentSerializer output.
+    """
+
+
+    author = serializers.CharField(source='author.username', read_only=True)
+
+    class Meta:
+        model = ArchivedComment
+        fields = ['id', 'created_at', 'author', 'content']
+
+
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for archived tasks.
+
+    Expects a `comments_total` annotation for `comments_count`.
+    """
+
+
+    assignee = UserAccountSerializer(read_only=True)
+    reviewer = UserAccountSerializer(read_only=True)
+    comments_count = serializers.IntegerField(source='comments_total', read_only=True)
+
+    class Meta:
+        model = ArchivedTask
+        fields = [
+            'id',
+            'title',
+            'description',
+            'status',
+            'priority',
+            'assignee',
+            'reviewer',
+            'due_date',
+            'completed_at',
+            'archived_at',
+            'comments_count'
+        ]
+        read_only_fields = fields
+
+
+class ArchivedTaskDetailSerializer(ArchivedTaskSerializer):
+    """
+    Read-only serializer for one archived task including its comments.
+    """
+
+
+    comments = ArchivedCommentSerializer(many=True, read_only=True)
+
+    class Meta(ArchivedTaskSerializer.Meta):
+        fields = ArchivedTaskSerializer.Meta.fields + ['comments']
+        read_only_fields = fields
@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework import routers
 from .views import BoardViewSet, TaskCreateView, TaskDetailUpdateDestroyView, TaskGetDetailView, \
-CommentCreateListView, CommentDestroyView, EmailCheckView
+CommentCreateListView, CommentDestroyView, EmailCheckView, TaskSearchView, TaskCalendarView, \
+TaskOverdueView, BatchView
 
 router = routers.SimpleRouter()
 router.register(r'boards', BoardViewSet, basename='board')
@@ -12,7 +13,11 @@ urlpatterns = [
     path('tasks/<int:pk>/', TaskDetailUpdateDestroyView.as_view(), name='task-detail'),
     path('tasks/assigned-to-me/', TaskGetDetailView.as_view(), name='assigned-to-me'),
     path('tasks/reviewing/', TaskGetDetailView.as_view(), name='review'),
+    path('tasks/search/', TaskSearchView.as_view(), name='task-search'),
+    path('tasks/calendar/', TaskCalendarView.as_view(), name='task-calendar'),
+    path('tasks/overdue/', TaskOverdueView.as_view(), name='task-overdue'),
     path('tasks/<int:task_id>/comments/', CommentCreateListView.as_view(), name='review'),
     path('tasks/<int:task_id>/comments/<int:comment_id>/', CommentDestroyView.as_view(), name='review'),
-    path('email-check/', EmailCheckView.as_view(), name='email-check')
+    path('email-check/', EmailCheckView.as_view(), name='email-check'),
+    path('batch/', BatchView.as_view(), name='batch')
 ]
\ No newline at end of file
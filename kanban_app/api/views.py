@@ -2,34 +2,72 @@
 API views for managing boards, tasks, and comments in the Kanban application.
 
 This module contains Django REST Framework views for:
-- Board CRUD operations
+- Board CRUD operations, with board detail served from its stored document
+- Adding and removing board members incrementally
+- Reading and restoring a board's archived tasks
 - Task creation, retrieval, update, and deletion
+- Full-text task search
+- Calendar and overdue views of tasks grouped by due date
 - Listing and creating comments for tasks
 - Email-based user lookup
+- Batch requests running many of these calls in one round-trip
 
 Permissions are enforced to restrict access based on user roles
 and membership within boards.
 """
 
 
-from django.db.models import Q
+from django.db.models import Q, Case, When, Count, IntegerField
+from django.db.models.functions import JSONObject
+from django.http import HttpResponse
 from django.utils import timezone
-from django.contrib.auth.models import User
+from django.utils.cache import get_conditional_response
 from rest_framework import viewsets, status, generics, mixins
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import GenericAPIView, get_object_or_404
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from core.compression import compress_response
+from core.metrics import metrics
+from core.request_cache import request_cache
+from core.db import retry_on_locked
+from idempotency_app.idempotency import IdempotentMixin
+from kanban_app.archive import restore_task
+from kanban_app.outbox import record_comment, record_task_changes
+from kanban_app.documents import compressed_body, get_document, loads, refresh_head
+from kanban_app.expressions import JSONGroupArray
+from kanban_app.purge import soft_delete_board
+from kanban_app.search import search_tasks
+from kanban_app.sharding import active_database, fan_out, is_sharded, place_new_board, \
+    board_for_task, use_shard
 from user_auth_app.api.permissions import IsBoardMemberOrOwner, IsTaskBoardMember, \
-    IsTaskOwnerOrCreator, IsCommentBoardMember
-from kanban_app.models import Board, Task, Comment
-from user_auth_app.api.serializers import UserAccountSerializer
+    IsTaskOwnerOrCreator, IsCommentBoardMember, task_board_id
+from kanban_app.models import Board, Task, Comment, ArchivedTask
+from user_auth_app.api.serializers import EmailBatchSerializer, UserAccountSerializer
+from user_auth_app.email_lookup import lookup_emails, normalize_email
+from .batch import BatchFailed, run_atomic_batch, run_batch
+from .mixins import ShardRoutingMixin
+from .pagination import KeysetPagination
+from .rows import task_data, task_rows
 from .serializers import BoardSerializer, BoardDetailSerializer, \
-    TaskSerializer, CommentSerializer
+    TaskSerializer, CommentSerializer, BoardTaskFilterSerializer, CalendarRangeSerializer, \
+    BoardMembersSerializer, ArchivedTaskSerializer, ArchivedTaskDetailSerializer, BatchSerializer
 
 
-class BoardViewSet(viewsets.ModelViewSet):
+def rank_of(field, values):
+    """
+    Return an expression mapping a choice field to its position in `values`.
+    """
+    return Case(
+        *[When(**{field: value}, then=index) for index, value in enumerate(values)],
+        output_field=IntegerField()
+    )
+
+
+class BoardViewSet(ShardRoutingMixin, viewsets.ModelViewSet):
     """
     A viewset for managing Board objects.
 
@@ -39,12 +77,85 @@ class BoardViewSet(viewsets.ModelViewSet):
 
 
     permission_classes = [IsAuthenticated, IsBoardMemberOrOwner]
+    throttle_scope = 'boards'
+
+    def get_board_id(self):
+        """
+        Return the ID of the board addressed by the URL, if any.
+        """
+        return self.kwargs.get('pk')
+
+    def list(self, request, *args, **kwargs):
+        """
+        List the boards of every shard.
+        """
+        boards = fan_out(lambda: list(self.get_queryset()))
+        serializer = self.get_serializer(boards, many=True)
+        return Response(serializer.data)
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Return the board with its members and tasks.
+
+        The response is the board's materialized document, which holds
+        BoardDetailSerializer output rendered as compact JSON. JSON
+        requests get the stored bytes as they are, or their stored
+        compressed variant; other formats, or indented JSON, render the
+        decoded document.
+
+        The ETag names the board and document version, so a request
+        whose If-None-Match matches gets a 304 without a body.
+        """
+        document = get_document(self.get_object())
+        etag = f'"{document.board_id}-{document.version}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+        if request.accepted_renderer.format == 'json' and 'indent' not in request.accepted_media_type:
+            response = HttpResponse(bytes(document.body), content_type='application/json')
+            response['ETag'] = etag
+            return compress_response(
+                request, response, lambda encoding: compressed_body(document, encoding))
+        response = Response(loads(document.body))
+        response['ETag'] = etag
+        return response
+
+    @retry_on_locked
     def perform_create(self, serializer):
         """
         Save a new Board instance with the requesting user as the owner.
+
+        With sharding enabled the board gets its ID and shard from the
+        shard directory first.
+        """
+        if not is_sharded():
+            serializer.save(owner=self.request.user)
+            return
+        board_id, shard = place_new_board()
+        with use_shard(shard):
+            serializer.save(owner=self.request.user, id=board_id)
+
+    def perform_update(self, serializer):
+        """
+        Save the updated Board instance.
+        """
+        @retry_on_locked(using=active_database())
+        def update():
+            serializer.save()
+
+        update()
+
+    def perform_destroy(self, instance):
+        """
+        Soft-delete the board and leave its tasks and comments to the
+        background purge.
         """
-        serializer.save(owner=self.request.user)
+        @retry_on_locked(using=active_database())
+        def destroy():
+            soft_delete_board(instance)
+
+        destroy()
 
     def get_serializer_class(self):
         """
@@ -60,28 +171,184 @@ class BoardViewSet(viewsets.ModelViewSet):
         """
         return Board.objects.all().distinct()
 
+    @action(detail=True, methods=['get'])
+    def tasks(self, request, pk=None):
+        """
+        List the board's tasks with server-side filters and ordering.
+
+        Supports the filters status, priority, assignee, reviewer, creator
+        and a due_from/due_to range, an `ordering` over priority, status,
+        due_date and id, and cursor pagination.
+        """
+        board = self.get_object()
+        params = BoardTaskFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        tasks = Task.objects.filter(board=board).select_related('assignee', 'reviewer').annotate(
+            priority_rank=rank_of('priority', Task.Priority.values),
+            status_rank=rank_of('status', Task.Status.values),
+            comments_total=Count('comments')
+        )
+        for field in ['status', 'priority']:
+            if field in filters:
+                tasks = tasks.filter(**{field: filters[field]})
+        for field in ['assignee', 'reviewer', 'creator']:
+            if field in filters:
+                tasks = tasks.filter(**{f'{field}_id': filters[field]})
+        if 'due_from' in filters:
+            tasks = tasks.filter(due_date__gte=filters['due_from'])
+        if 'due_to' in filters:
+            tasks = tasks.filter(due_date__lte=filters['due_to'])
+
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(
+            tasks, request, self, ordering=filters['ordering'], date_fields=['due_date'])
+        serializer = TaskSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['post', 'delete'])
+    def members(self, request, pk=None):
+        """
+        Add (POST) or remove (DELETE) the given board members.
 
-class TaskCreateView(generics.CreateAPIView):
+        Only the difference to the current member set is written, with
+        one bulk insert or delete, and only the users that were actually
+        added or removed are returned. The cost depends on the size of
+        the request, not on the size of the board.
+        """
+        board = self.get_object()
+        serializer = BoardMembersSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        users = serializer.validated_data['members']
+
+        if request.method == 'DELETE' and any(user.id == board.owner_id for user in users):
+            return Response(
+                {"members": ["The board owner cannot be removed."]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        changed = self.change_members(board, users, add=request.method == 'POST')
+        key = 'added' if request.method == 'POST' else 'removed'
+        return Response({key: UserAccountSerializer(changed, many=True).data})
+
+    def archived_tasks(self, board):
+        """
+        Return the board's archived tasks with their users and comment counts.
+        """
+        return ArchivedTask.objects.filter(board=board) \
+            .select_related('assignee', 'reviewer').annotate(comments_total=Count('comments'))
+
+    @action(detail=True, methods=['get'])
+    def archive(self, request, pk=None):
+        """
+        List the board's archived tasks, newest first, with cursor pagination.
+        """
+        board = self.get_object()
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(self.archived_tasks(board), request, self, ordering=['-id'])
+        serializer = ArchivedTaskSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path=r'archive/(?P<task_id>\d+)')
+    def archived_task(self, request, pk=None, task_id=None):
+        """
+        Return one archived task with its comments.
+        """
+        board = self.get_object()
+        task = get_object_or_404(
+            self.archived_tasks(board).prefetch_related('comments__author'), id=task_id)
+        return Response(ArchivedTaskDetailSerializer(task).data)
+
+    @action(detail=True, methods=['post'], url_path=r'archive/(?P<task_id>\d+)/restore')
+    def restore(self, request, pk=None, task_id=None):
+        """
+        Move an archived task and its comments back onto the board.
+        """
+        board = self.get_object()
+        archived = get_object_or_404(ArchivedTask, board=board, id=task_id)
+        task = restore_task(archived)
+        task = Task.objects.annotate(comments_total=Count('comments')).get(id=task.id)
+        serializer = TaskSerializer(task, context=self.get_serializer_context())
+        return Response(serializer.data)
+
+    @retry_on_locked
+    def change_members(self, board, users, add):
+        """
+        Apply a membership diff and return the users it changed.
+
+        The bulk writes send no signals, so the board document is
+        refreshed here.
+        """
+        Membership = Board.members.through
+        current = set(
+            Membership.objects.filter(board_id=board.id, user_id__in=[user.id for user in users])
+            .values_list('user_id', flat=True)
+        )
+        if add:
+            changed = [user for user in users if user.id not in current]
+            Membership.objects.bulk_create(
+                [Membership(board_id=board.id, user_id=user.id) for user in changed],
+                ignore_conflicts=True
+            )
+        else:
+            changed = [user for user in users if user.id in current]
+            Membership.objects.filter(
+                board_id=board.id, user_id__in=[user.id for user in changed]).delete()
+        if changed:
+            refresh_head(board.id, board._state.db)
+        return changed
+
+
+class TaskCreateView(ShardRoutingMixin, IdempotentMixin, generics.CreateAPIView):
     """
     Create a new Task object.
 
     Only authenticated users who are members of the related board
-    can create a task.
+    can create a task. Retries sent with the same `Idempotency-Key`
+    create the task once.
     """
 
 
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    throttle_scope = 'tasks'
     permission_classes = [IsAuthenticated, IsTaskBoardMember]
 
+    def get_board_id(self):
+        """
+        Return the ID of the board given in the request body.
+
+        Bodies that are not JSON objects name no board; the serializer
+        rejects them.
+        """
+        if not isinstance(self.request.data, dict):
+            return None
+        return self.request.data.get('board')
+
+    def post(self, request, *args, **kwargs):
+        """
+        Create the task, once per idempotency key.
+        """
+        return self.idempotent(super().post, request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """
         Save a new Task instance with the requesting user as the creator.
+
+        Its assignment notifications are recorded in the same transaction.
         """
-        serializer.save(creator=self.request.user)
+        @retry_on_locked(using=active_database())
+        def create():
+            task = serializer.save(creator=self.request.user)
+            record_task_changes(task, self.request.user)
+
+        create()
 
 
 class TaskDetailUpdateDestroyView(
+    ShardRoutingMixin,
+    IdempotentMixin,
     mixins.UpdateModelMixin,
     mixins.DestroyModelMixin,
     GenericAPIView
@@ -92,11 +359,15 @@ class TaskDetailUpdateDestroyView(
     Permissions vary depending on the HTTP method:
     - DELETE: Requires the user to be the task owner or creator.
     - PATCH/PUT: Requires the user to be a member of the task's board.
+
+    PATCH requests honour the `Idempotency-Key` header.
     """
 
 
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    throttle_scope = 'tasks'
+    idempotent_methods = ('PATCH',)
 
     def get_permissions(self):
         """
@@ -106,11 +377,44 @@ class TaskDetailUpdateDestroyView(
             return [IsAuthenticated(), IsTaskOwnerOrCreator(),]
         return [IsAuthenticated(), IsTaskBoardMember()]
 
+    def get_board_id(self):
+        """
+        Return the board of the task addressed by the URL.
+        """
+        return board_for_task(self.kwargs.get('pk'))
+
+    def perform_update(self, serializer):
+        """
+        Save the updated Task instance.
+
+        Notifications for a changed assignee or reviewer are recorded
+        in the same transaction.
+        """
+        previous_assignee_id = serializer.instance.assignee_id
+        previous_reviewer_id = serializer.instance.reviewer_id
+
+        @retry_on_locked(using=active_database())
+        def update():
+            task = serializer.save()
+            record_task_changes(task, self.request.user, previous_assignee_id, previous_reviewer_id)
+
+        update()
+
+    def perform_destroy(self, instance):
+        """
+        Delete the Task instance together with its comments.
+        """
+        @retry_on_locked(using=active_database())
+        def destroy():
+            instance.delete()
+
+        destroy()
+
     def patch(self, request, *args, **kwargs):
         """
-        Partially update the task.
+        Partially update the task, once per idempotency key.
         """
-        return self.partial_update(request, *args, **kwargs)
+        return self.idempotent(self.partial_update, request, *args, **kwargs)
 
     def delete(self, request, *args, **kwargs):
         """
@@ -130,56 +434,206 @@ class TaskGetDetailView(APIView):
 
 
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'tasks'
 
     def get(self, request):
         """
         Handle GET request to retrieve relevant tasks for the user.
+
+        Tasks are built from `.values()` rows in the shape of
+        TaskSerializer output.
         """
         if "assigned-to-me" in request.path:
-            tasks = Task.objects.filter(
-                assignee=request.user, board__members=request.user)
+            lookup = {'assignee': request.user}
         else:
-            tasks = Task.objects.filter(
-                reviewer=request.user, board__members=request.user)
-        serializer = TaskSerializer(
-            tasks, many=True, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+            lookup = {'reviewer': request.user}
+        rows = fan_out(lambda: list(
+            task_rows(Task.objects.filter(board__members=request.user, **lookup))))
+        return Response(task_data(rows), status=status.HTTP_200_OK)
     
 
-class CommentCreateListView(generics.ListCreateAPIView):
+def tasks_by_day(user, **lookup):
+    """
+    Return the user's tasks matching `lookup`, grouped by due date.
+
+    Each shard answers with a single grouped query; days are returned
+    in ascending order, each with its task count and compact task data.
+    """
+    def grouped():
+        return Task.objects.filter(board__members=user, **lookup) \
+            .values('due_date') \
+            .annotate(
+                count=Count('id'),
+                tasks=JSONGroupArray(JSONObject(
+                    id='id',
+                    board='board_id',
+                    title='title',
+                    status='status',
+                    priority='priority',
+                    assignee_id='assignee_id',
+                    reviewer_id='reviewer_id',
+                ))
+            ).order_by('due_date')
+
+    days = {}
+    for row in fan_out(lambda: list(grouped())):
+        day = days.setdefault(row['due_date'], {'date': row['due_date'], 'count': 0, 'tasks': []})
+        day['count'] += row['count']
+        day['tasks'].extend(row['tasks'])
+    for day in days.values():
+        day['tasks'].sort(key=lambda task: task['id'])
+    return [days[due_date] for due_date in sorted(days)]
+
+
+class TaskCalendarView(APIView):
+    """
+    Retrieve the requesting user's tasks due within a date range.
+
+    Tasks are grouped by due date, as needed for a calendar view.
+    """
+
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'tasks'
+
+    def get(self, request):
+        """
+        Handle GET request for tasks due between `from` and `to`.
+        """
+        params = CalendarRangeSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        days = tasks_by_day(
+            request.user,
+            due_date__range=(params.validated_data['from'], params.validated_data['to'])
+        )
+        return Response(days, status=status.HTTP_200_OK)
+
+
+class TaskOverdueView(APIView):
+    """
+    Retrieve the requesting user's unfinished tasks whose due date has passed.
+
+    Tasks are grouped by due date, oldest first.
+    """
+
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'tasks'
+
+    def get(self, request):
+        """
+        Handle GET request for overdue tasks.
+        """
+        days = tasks_by_day(
+            request.user,
+            due_date__lt=timezone.localdate(),
+            status__in=[choice for choice in Task.Status.values if choice != Task.Status.DONE]
+        )
+        return Response(days, status=status.HTTP_200_OK)
+
+
+class TaskSearchView(APIView):
+    """
+    Full-text search over the tasks of the requesting user's boards.
+
+    Matches task titles, descriptions and comments, ranked by relevance
+    and paginated with `page` and `page_size` query parameters.
+    """
+
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'search'
+    page_size = 20
+    max_page_size = 100
+
+    def get(self, request):
+        """
+        Handle GET request to search tasks for the `q` query parameter.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "Query parameter q is required"}, status=400)
+
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            page_size = min(max(int(request.query_params.get('page_size', self.page_size)), 1),
+                            self.max_page_size)
+        except ValueError:
+            return Response({"error": "page and page_size must be integers"}, status=400)
+
+        tasks = search_tasks(request.user, query, (page - 1) * page_size, page_size)
+        url = request.build_absolute_uri()
+        previous_url = None
+        if page > 1:
+            previous_url = replace_query_param(url, 'page', page - 1) if page > 2 \
+                else remove_query_param(url, 'page')
+
+        serializer = TaskSerializer(
+            tasks[:page_size], many=True, context={'request': request})
+        return Response({
+            'next': replace_query_param(url, 'page', page + 1) if len(tasks) > page_size else None,
+            'previous': previous_url,
+            'results': serializer.data
+        }, status=status.HTTP_200_OK)
+
+
+class CommentCreateListView(ShardRoutingMixin, IdempotentMixin, generics.ListCreateAPIView):
     """
     List or create comments for a specific task.
 
     Access is restricted to authenticated users who are members
-    of the task's board.
+    of the task's board. Retries sent with the same `Idempotency-Key`
+    create the comment once.
     """
 
 
     permission_classes = [IsAuthenticated, IsCommentBoardMember]
     serializer_class = CommentSerializer
+    throttle_scope = 'comments'
+
+    def get_board_id(self):
+        """
+        Return the board of the task addressed by the URL.
+        """
+        return board_for_task(self.kwargs.get('task_id'))
 
     def get_queryset(self):
         """
         Return all comments for the specified task.
         """
         task_id = self.kwargs['task_id']
-        get_object_or_404(Task, pk=task_id)
+        task_board_id(task_id)
         return Comment.objects.filter(task_id=task_id)
 
+    def post(self, request, *args, **kwargs):
+        """
+        Create the comment, once per idempotency key.
+        """
+        return self.idempotent(super().post, request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """
         Save a new Comment instance with the requesting user as author.
+
+        The notification for the board's members is recorded in the same
+        transaction.
         """
         task_id = self.kwargs['task_id']
         user_id = self.request.user.id
-        serializer.save(
-            author_id=user_id,
-            task_id=task_id,
-            created_at=timezone.now().date()
-        )
+
+        @retry_on_locked(using=active_database())
+        def create():
+            comment = serializer.save(
+                author_id=user_id,
+                task_id=task_id,
+                created_at=timezone.now().date()
+            )
+            record_comment(comment, self.request.user)
+
+        create()
 
 
-class CommentDestroyView(generics.DestroyAPIView):
+class CommentDestroyView(ShardRoutingMixin, generics.DestroyAPIView):
     """
     Delete a specific comment from a task.
 
@@ -189,26 +643,46 @@ class CommentDestroyView(generics.DestroyAPIView):
 
 
     permission_classes = [IsAuthenticated, IsCommentBoardMember]
+    throttle_scope = 'comments'
     lookup_field = 'id'
     lookup_url_kwarg = 'comment_id'
 
+    def get_board_id(self):
+        """
+        Return the board of the task addressed by the URL.
+        """
+        return board_for_task(self.kwargs.get('task_id'))
+
     def get_queryset(self):
         """
         Return the comment queryset filtered by task ID.
         """
         task_id = self.kwargs['task_id']
         return Comment.objects.filter(task_id=task_id)
+
+    def perform_destroy(self, instance):
+        """
+        Delete the Comment instance.
+        """
+        @retry_on_locked(using=active_database())
+        def destroy():
+            instance.delete()
+
+        destroy()
     
 
 class EmailCheckView(APIView):
     """
-    Check if a user exists for the given email.
+    Check if users exist for the given email addresses.
 
-    Returns user data if found; otherwise, returns an error response.
+    Matching is case-insensitive and cached. GET checks a single email
+    and returns the user data or an error response; POST resolves a
+    list of emails in one query.
     """
 
 
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'users'
 
     def get(self, request):
         """
@@ -218,10 +692,61 @@ class EmailCheckView(APIView):
         if not email:
             return Response({"error": "Email parameter is required"}, status=400)
 
-        try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
+        user = lookup_emails([email]).get(normalize_email(email))
+        if user is None:
             return Response({"error": "Email not found"}, status=404)
 
-        serializer = UserAccountSerializer(user)
-        return Response(serializer.data, status=200)
\ No newline at end of file
+        return Response(user, status=200)
+
+    def post(self, request):
+        """
+        Handle POST request to resolve a batch of emails.
+
+        Returns a mapping from every requested email to its user data,
+        or null if no user has that email.
+        """
+        serializer = EmailBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        emails = serializer.validated_data['emails']
+        users = lookup_emails(emails)
+        return Response(
+            {email: users.get(normalize_email(email)) for email in emails},
+            status=200
+        )
+
+
+class BatchView(APIView):
+    """
+    Run several Kanban API calls in one HTTP request.
+
+    The body lists sub-requests (`method`, `path`, optional `body` and
+    `headers`) against the routes of this API. They run in order,
+    in-process, as the requesting user, and their responses are returned
+    together in the same order. With `atomic`, the batch stops at the
+    first failing sub-request and none of its changes are saved.
+    """
+
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'batch'
+
+    def post(self, request):
+        """
+        Handle POST request to run a batch of sub-requests.
+        """
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['requests']
+        metrics.observe('batch.requests', len(items))
+
+        with request_cache():
+            if not serializer.validated_data['atomic']:
+                return Response({'responses': run_batch(request, items)}, status=status.HTTP_200_OK)
+            try:
+                responses = run_atomic_batch(request, items)
+            except BatchFailed as failed:
+                return Response({
+                    "error": f"Sub-request {len(failed.responses) - 1} failed; no changes were saved.",
+                    'responses': failed.responses
+                }, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'responses': responses}, status=status.HTTP_200_OK)
@@ -0,0 +1,146 @@
+"""
+Archiving of old completed tasks.
+
+Tasks that have been done for longer than `TASK_ARCHIVE['AFTER_DAYS']`
+are moved, together with their comments, into the ArchivedTask and
+ArchivedComment tables. Moving happens in batches, each in its own
+transaction, and keeps IDs and field values, so archived tasks can be
+restored unchanged. Since archived rows live in separate tables, task
+queries, counters and the search index no longer see them.
+
+Tasks completed before completion times were recorded are archived by
+their due date instead.
+"""
+
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from core.db import retry_on_locked
+from kanban_app.documents import refresh_task, remove_tasks
+from kanban_app.models import Task, Comment, ArchivedTask, ArchivedComment
+from kanban_app.purge import delete_rows
+from kanban_app.sharding import moving_boards, shards, use_shard
+
+
+ARCHIVE_DEFAULTS = {
+    'AFTER_DAYS': 90,
+    'BATCH_SIZE': 500,
+}
+
+TASK_FIELDS = [
+    'id', 'board_id', 'title', 'description', 'status', 'priority',
+    'assignee_id', 'reviewer_id', 'creator_id', 'due_date', 'completed_at',
+]
+
+COMMENT_FIELDS = ['id', 'task_id', 'author_id', 'content', 'created_at']
+
+
+def archive_settings():
+    """
+    Return the archive settings, filled in with defaults.
+    """
+    return {**ARCHIVE_DEFAULTS, **getattr(settings, 'TASK_ARCHIVE', {})}
+
+
+def archivable_tasks(cutoff):
+    """
+    Return the done tasks completed before `cutoff`.
+    """
+    return Task.objects.filter(status=Task.Status.DONE).filter(
+        Q(completed_at__lt=cutoff) |
+        Q(completed_at__isnull=True, due_date__lt=cutoff.date())
+    )
+
+
+def archive_batch(task_ids, using):
+    """
+    Move the given tasks and their comments into the archive tables
+    and remove them from their board documents. Tasks of boards that
+    are being moved between shards are skipped.
+
+    Returns the number of tasks moved.
+    """
+    @retry_on_locked(using=using)
+    def move():
+        tasks = list(
+            Task.all_objects.using(using)
+            .filter(id__in=task_ids, status=Task.Status.DONE)
+            .exclude(board_id__in=moving_boards()).values(*TASK_FIELDS)
+        )
+        ids = [task['id'] for task in tasks]
+        comments = list(
+            Comment.all_objects.using(using).filter(task_id__in=ids).values(*COMMENT_FIELDS)
+        )
+        archived_at = timezone.now()
+        ArchivedTask.objects.using(using).bulk_create(
+            [ArchivedTask(archived_at=archived_at, **task) for task in tasks])
+        ArchivedComment.objects.using(using).bulk_create(
+            [ArchivedComment(**comment) for comment in comments])
+        delete_rows(Comment, [comment['id'] for comment in comments], using)
+        delete_rows(Task, ids, using)
+        by_board = {}
+        for task in tasks:
+            by_board.setdefault(task['board_id'], []).append(task['id'])
+        for board_id, board_task_ids in by_board.items():
+            remove_tasks(board_id, board_task_ids, using)
+        return len(ids)
+
+    return move()
+
+
+def archive_tasks(after_days=None, batch_size=None, progress=None):
+    """
+    Archive every task done for more than `after_days` days on every shard.
+
+    `progress`, if given, is called with the shard and the number of
+    tasks moved after every batch. Returns the total number archived.
+    """
+    config = archive_settings()
+    after_days = config['AFTER_DAYS'] if after_days is None else after_days
+    batch_size = batch_size or config['BATCH_SIZE']
+    cutoff = timezone.now() - timedelta(days=after_days)
+
+    total = 0
+    for alias in shards():
+        with use_shard(alias):
+            candidates = archivable_tasks(cutoff).using(alias).order_by('id')
+            last_id = 0
+            while ids := list(
+                    candidates.filter(id__gt=last_id).values_list('id', flat=True)[:batch_size]):
+                moved = archive_batch(ids, alias)
+                total += moved
+                last_id = ids[-1]
+                if progress:
+                    progress(alias, moved)
+    return total
+
+
+def restore_task(archived):
+    """
+    Move an archived task and its comments back into the task tables.
+
+    The completion time is reset to now, so the restored task is not
+    archived again by the next run.
+    """
+    using = archived._state.db
+
+    @retry_on_locked(using=using)
+    def move():
+        values = {field: getattr(archived, field) for field in TASK_FIELDS}
+        values['completed_at'] = timezone.now() if archived.status == Task.Status.DONE else None
+        task = Task(**values)
+        Task.all_objects.using(using).bulk_create([task])
+        Comment.all_objects.using(using).bulk_create([
+            Comment(**{field: getattr(comment, field) for field in COMMENT_FIELDS})
+            for comment in archived.comments.all()
+        ])
+        ArchivedComment.objects.using(using).filter(task_id=archived.id).delete()
+        ArchivedTask.objects.using(using).filter(id=archived.id).delete()
+        refresh_task(task.id, using)
+        return task
+
+    return move()
@@ -0,0 +1,305 @@
+"""
+Materialized board detail documents.
+
+Board detail is read far more often than a board changes, so each
+board's `GET /api/boards/<id>/` response is kept rendered in a
+BoardDocument row and served as stored. A document is built on the
+first read and stored in pieces, so a change only re-renders what it
+touched:
+
+- The head holds the response without tasks: board ID, title, owner
+  and members. Membership and board changes re-render it.
+- Every task's entry is a BoardDocumentEntry row. A task change
+  re-reads that one task's row and replaces, inserts or removes its
+  entry; a comment change re-reads the task it belongs to.
+- A user whose name or email changes discards the documents showing
+  them, as a member, assignee or reviewer; they are rebuilt on the
+  next read.
+
+Each change bumps the document's version, which marks the joined
+`body` as out of date. The next read joins the head and the stored
+entries into a new body, without decoding or rendering anything, so
+the cost of a change does not grow with the size of the board.
+
+Changes run in the transaction of the change they reflect. Signal
+handlers in `kanban_app.signals` cover model saves and deletes; code
+that bypasses signals (bulk membership diffs, archiving, restoring,
+soft deletion, purging) calls these functions explicitly.
+
+A discarded document keeps its row with an empty head until it is
+rebuilt, and a rebuild continues its version, so a board's versions
+never repeat. The board detail view sends `"<board_id>-<version>"` as
+its ETag.
+
+Compressed copies of a document are stored as BoardDocumentVariant
+rows tagged with the document version they were made from, so each
+version is compressed at most once per coding.
+
+`check_board_documents` compares stored documents with freshly built ones.
+"""
+
+
+import json
+
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, router
+from django.db.models import F, Q
+
+from core.compression import compress
+from core.db import retry_on_locked
+from core.renderers import FastJSONRenderer, orjson
+from kanban_app.api.rows import USER_COLUMNS, board_detail_data, task_data, task_rows, user_data
+from kanban_app.models import Board, Task, BoardDocument, BoardDocumentEntry, BoardDocumentVariant
+
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def render(data):
+    """
+    Return `data` rendered exactly as the JSON renderer of the API would.
+    """
+    return FastJSONRenderer().render(data)
+
+
+def build_data(board):
+    """
+    Return the document data of a board from the database.
+    """
+    return board_detail_data(board)
+
+
+def render_head(data):
+    """
+    Return the rendered document data without its tasks.
+    """
+    return render({**data, 'tasks': []})
+
+
+def join(head, entries):
+    """
+    Return the document body made of a rendered head and task entries.
+
+    The head ends with an empty task list, `[]}`, which the entries are
+    put between.
+    """
+    return head[:-2] + b','.join(entries) + b']}'
+
+
+def stored_entries(board_id, using):
+    """
+    Return the rendered task entries of a board's document, in task ID order.
+    """
+    return [
+        bytes(body) for body in BoardDocumentEntry.objects.using(using)
+        .filter(document_id=board_id).order_by('task_id').values_list('body', flat=True)
+    ]
+
+
+def get_document(board):
+    """
+    Return the board's document with a current body.
+
+    The document is read from the database the board was read from,
+    which may be a replica. Otherwise the document is taken from the
+    board's write database: a missing one is built and stored, an
+    out-of-date body is joined again from the stored head and entries. Both happen in a write
+    transaction, so a change committed meanwhile makes SQLite report a
+    lock and the work is retried instead of storing stale data.
+    """
+    document = BoardDocument.objects.using(board._state.db or DEFAULT_DB_ALIAS) \
+        .filter(board_id=board.id).first()
+    if document is not None and document.head and document.body_version == document.version:
+        return document
+
+    using = router.db_for_write(BoardDocument, instance=board)
+
+    @retry_on_locked(using=using)
+    def build():
+        current = Board.all_objects.using(using).get(id=board.id)
+        data = build_data(current)
+        head = render_head(data)
+        entries = [render(entry) for entry in data['tasks']]
+        document = BoardDocument.objects.using(using).filter(board_id=board.id).first()
+        if document is None:
+            document = BoardDocument(board_id=board.id, version=0)
+        else:
+            document.entries.all().delete()
+            document.variants.all().delete()
+        document.head = head
+        document.body = join(head, entries)
+        document.version = document.body_version = document.version + 1
+        document.save(using=using)
+        BoardDocumentEntry.objects.using(using).bulk_create([
+            BoardDocumentEntry(document=document, task_id=task['id'], body=body)
+            for task, body in zip(data['tasks'], entries)
+        ])
+        return document
+
+    @retry_on_locked(using=using)
+    def rejoin():
+        document = BoardDocument.objects.using(using).filter(board_id=board.id).first()
+        if document is None or not document.head:
+            return build()
+        if document.body_version != document.version:
+            document.body = join(bytes(document.head), stored_entries(board.id, using))
+            document.body_version = document.version
+            document.save(using=using, update_fields=['body', 'body_version', 'updated_at'])
+        return document
+
+    return rejoin()
+
+
+def touch(board_id, using):
+    """
+    Mark the board's joined document body as out of date.
+    """
+    BoardDocument.objects.using(using).filter(board_id=board_id).update(version=F('version') + 1)
+
+
+def compressed_body(document, encoding):
+    """
+    Return the document body compressed with `encoding`.
+
+    The stored variant is used if it was made from the current version;
+    otherwise the body is compressed and stored for later requests, on
+    the document's write database and only while that still holds the
+    same version.
+    """
+    body = BoardDocumentVariant.objects.using(document._state.db or DEFAULT_DB_ALIAS) \
+        .filter(document_id=document.board_id, encoding=encoding, version=document.version) \
+        .values_list('body', flat=True).first()
+    if body is not None:
+        return bytes(body)
+
+    body = compress(bytes(document.body), encoding)
+    using = router.db_for_write(BoardDocumentVariant, instance=document)
+
+    @retry_on_locked(using=using)
+    def store():
+        if not BoardDocument.objects.using(using) \
+                .filter(board_id=document.board_id, version=document.version).exists():
+            return
+        BoardDocumentVariant.objects.using(using).update_or_create(
+            document_id=document.board_id, encoding=encoding,
+            defaults={'version': document.version, 'body': body})
+
+    store()
+    return body
+
+
+def has_document(board_id, using):
+    """
+    Return True if the board has a built document to keep up to date.
+    """
+    return BoardDocument.objects.using(using).filter(board_id=board_id).exclude(head=b'').exists()
+
+
+def refresh_task(task_id, using=DEFAULT_DB_ALIAS, board_id=None):
+    """
+    Replace, insert or remove one task's entry in its board's document.
+
+    Without `board_id` the board is taken from the task, so a task that
+    no longer exists is only removed when its board is given. Boards
+    without a document are left alone; they are built from scratch on
+    their next read.
+    """
+    entries = task_data(task_rows(Task.objects.using(using).filter(id=task_id)))
+    entry = entries[0] if entries else None
+    if entry is not None:
+        board_id = entry.pop('board')
+    if board_id is None:
+        return
+
+    @retry_on_locked(using=using)
+    def patch():
+        if not has_document(board_id, using):
+            return
+        if entry is None:
+            BoardDocumentEntry.objects.using(using).filter(document_id=board_id, task_id=task_id).delete()
+        else:
+            BoardDocumentEntry.objects.using(using).update_or_create(
+                document_id=board_id, task_id=task_id, defaults={'body': render(entry)})
+        touch(board_id, using)
+
+    patch()
+
+
+def remove_tasks(board_id, task_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Remove the entries of the given tasks from the board's document.
+    """
+    @retry_on_locked(using=using)
+    def patch():
+        if BoardDocumentEntry.objects.using(using) \
+                .filter(document_id=board_id, task_id__in=list(task_ids)).delete()[0]:
+            touch(board_id, using)
+
+    patch()
+
+
+def refresh_head(board_id, using=DEFAULT_DB_ALIAS):
+    """
+    Re-read the title, owner and members in the board's document.
+    """
+    @retry_on_locked(using=using)
+    def patch():
+        board = Board.all_objects.using(using).filter(id=board_id).first()
+        if board is None or not has_document(board_id, using):
+            return
+        data = {
+            'id': board.id,
+            'title': board.title,
+            'owner_id': board.owner_id,
+            'members': [
+                user_data(*row) for row in
+                User.objects.using(using).filter(boards_as_member=board_id).values_list(*USER_COLUMNS)
+            ],
+        }
+        BoardDocument.objects.using(using).filter(board_id=board_id) \
+            .update(head=render_head(data), version=F('version') + 1)
+
+    patch()
+
+
+def discard_documents(board_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Discard the documents of the given boards until their next read.
+
+    The rows are kept with an empty head, so the rebuilt documents
+    continue their versions.
+    """
+    BoardDocumentEntry.objects.using(using).filter(document_id__in=board_ids).delete()
+    BoardDocumentVariant.objects.using(using).filter(document_id__in=board_ids).delete()
+    BoardDocument.objects.using(using).filter(board_id__in=board_ids).update(head=b'', body=b'')
+
+
+def discard_user_documents(user_id, using=DEFAULT_DB_ALIAS):
+    """
+    Discard the documents of every board showing the user, as a member
+    or as the assignee or reviewer of a task.
+    """
+    board_ids = set(
+        Board.members.through.objects.using(using).filter(user_id=user_id).values_list('board_id', flat=True))
+    board_ids.update(
+        Task.all_objects.using(using).filter(Q(assignee_id=user_id) | Q(reviewer_id=user_id))
+        .values_list('board_id', flat=True).distinct()
+    )
+    discard_documents(board_ids, using)
+
+
+def check_document(document):
+    """
+    Return True if the stored document matches the board's current data.
+
+    Both the joined body and the head and entries it is joined from
+    are compared with a freshly built document.
+    """
+    using = document._state.db
+    board = Board.objects.using(using).filter(id=document.board_id).first()
+    if board is None:
+        return False
+    expected = render(build_data(board))
+    if join(bytes(document.head), stored_entries(board.id, using)) != expected:
+        return False
+    return document.body_version != document.version or bytes(document.body) == expected
@@ -0,0 +1,22 @@
+"""
+Custom query expressions for the Kanban application.
+"""
+
+
+from django.db.models import Aggregate, JSONField
+
+
+class JSONGroupArray(Aggregate):
+    """
+    Aggregate the grouped values into a JSON array.
+
+    Uses SQLite's `JSON_GROUP_ARRAY` and PostgreSQL's `JSON_AGG`; the
+    result is decoded into a Python list.
+    """
+
+
+    function = 'JSON_GROUP_ARRAY'
+    output_field = JSONField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function='JSON_AGG', **extra_context)
@@ -0,0 +1,29 @@
+"""
+Background job handlers of the Kanban application.
+
+Registered with the job queue when the app is ready; see `jobs_app`.
+"""
+
+
+from jobs_app.queue import register
+from kanban_app.archive import archive_tasks
+from kanban_app.purge import purge_board
+from kanban_app.sharding import use_shard
+
+
+@register('purge_board')
+def purge_board_job(board_id, shard='default'):
+    """
+    Purge a deleted board and return the number of rows removed.
+    """
+    with use_shard(shard):
+        purge = purge_board(board_id, shard)
+    return {'comments_deleted': purge.comments_deleted, 'tasks_deleted': purge.tasks_deleted}
+
+
+@register('archive_tasks')
+def archive_tasks_job(after_days=None):
+    """
+    Archive old completed tasks and return how many were moved.
+    """
+    return {'archived': archive_tasks(after_days=after_days)}
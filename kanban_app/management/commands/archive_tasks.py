@@ -0,0 +1,40 @@
+"""
+Move old completed tasks and their comments into the archive tables.
+
+Usage:
+    python manage.py archive_tasks
+    python manage.py archive_tasks --after-days 30 --batch-size 200
+
+Meant to run periodically, e.g. nightly from cron.
+"""
+
+
+from django.core.management.base import BaseCommand
+
+from kanban_app.archive import archive_tasks
+
+
+class Command(BaseCommand):
+    """
+    Archive tasks that have been done for longer than the configured age.
+    """
+
+
+    help = "Archive completed tasks older than TASK_ARCHIVE['AFTER_DAYS'] days."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--after-days', type=int, default=None,
+                            help="Archive tasks done for more than this many days.")
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Tasks moved per transaction.")
+
+    def handle(self, *args, **options):
+        """
+        Archive every eligible task and print the progress.
+        """
+        total = archive_tasks(
+            after_days=options['after_days'],
+            batch_size=options['batch_size'],
+            progress=lambda shard, moved: self.stdout.write(f"{shard}: archived {moved} tasks")
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {total} tasks."))
@@ -0,0 +1,96 @@
+"""
+Benchmark the API renderers and parsers on board detail payloads.
+
+Serializes in-memory boards with BoardDetailSerializer once, then times
+rendering the result with DRF's JSONRenderer, FastJSONRenderer and
+MessagePackRenderer, and parsing it back with the matching parsers.
+Every fast JSON rendering is checked to be byte-identical to DRF's.
+
+Usage:
+    python manage.py bench_renderers
+    python manage.py bench_renderers --sizes 1000 10000 --repeat 5
+
+The benchmark runs against a throwaway test database, so it never
+touches application data.
+"""
+
+
+import io
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from core.db import throwaway_database
+from core.parsers import FastJSONParser, MessagePackParser
+from core.renderers import FastJSONRenderer, MessagePackRenderer
+from kanban_app.api.serializers import BoardDetailSerializer
+from kanban_app.management.commands.bench_serializers import build_board, build_members, measure
+
+
+DEFAULT_SIZES = [1000, 10000]
+
+
+def board_payload(size, members):
+    """
+    Return BoardDetailSerializer output for a board with `size` tasks.
+    """
+    request = APIRequestFactory().get('/api/boards/1/')
+    return BoardDetailSerializer(build_board(size, members), context={'request': request}).data
+
+
+def build_cases():
+    """
+    Return (name, render, parse) triples for every format.
+    """
+    return [
+        ('drf-json', JSONRenderer(), JSONParser()),
+        ('fast-json', FastJSONRenderer(), FastJSONParser()),
+        ('msgpack', MessagePackRenderer(), MessagePackParser()),
+    ]
+
+
+class Command(BaseCommand):
+    """
+    Compare render and parse times of the JSON and MessagePack formats.
+    """
+
+
+    help = "Benchmark JSONRenderer against FastJSONRenderer and MessagePackRenderer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                            help="Number of tasks on the rendered board.")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Timed runs per case; the best one is kept.")
+
+    def handle(self, *args, **options):
+        """
+        Run every case on a throwaway test database and print the results.
+        """
+        with throwaway_database():
+            members = build_members()
+            for size in options['sizes']:
+                self.run_size(size, board_payload(size, members), options['repeat'])
+
+    def run_size(self, size, data, repeat):
+        """
+        Measure every format for one payload and print one line per case.
+        """
+        reference = JSONRenderer().render(data)
+        baseline = None
+        for name, renderer, parser in build_cases():
+            body = renderer.render(data)
+            if name.endswith('json') and body != reference:
+                raise CommandError(f"{name} output differs from JSONRenderer for {size} tasks")
+
+            rendered = measure(lambda: renderer.render(data), repeat)
+            parsed = measure(lambda: parser.parse(io.BytesIO(body)), repeat)
+            baseline = baseline or rendered['seconds']
+            self.stdout.write(
+                f"{name:<10} {size:>7} tasks "
+                f"render {rendered['seconds'] * 1000:8.2f} ms (x{baseline / rendered['seconds']:5.1f}) "
+                f"parse {parsed['seconds'] * 1000:8.2f} ms "
+                f"{len(body) / 1024:10.1f} KiB"
+            )
@@ -0,0 +1,262 @@
+"""
+Micro-benchmark for the Kanban API serializers.
+
+Times TaskSerializer, BoardDetailSerializer and CommentSerializer over
+in-memory model instances and records peak memory and allocated blocks
+via `tracemalloc`. Results can be saved as a baseline file and later
+compared against it to catch regressions.
+
+Usage:
+    python manage.py bench_serializers --save
+    python manage.py bench_serializers --compare
+    python manage.py bench_serializers --sizes 1000 --repeat 5
+
+The benchmark runs against a throwaway test database, so it never
+touches application data.
+"""
+
+
+import json
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+
+from core.db import throwaway_database
+from kanban_app.models import Board, Task, Comment
+from kanban_app.api.serializers import TaskSerializer, BoardDetailSerializer, \
+    CommentSerializer
+
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'serializers.json'
+MEMBER_COUNT = 8
+
+
+def cached_queryset(model, objects):
+    """
+    Return a queryset whose results are already evaluated.
+
+    Stored in `_prefetched_objects_cache`, it lets related managers
+    answer `.all()` and `.count()` without touching the database,
+    exactly like a `prefetch_related()` result would.
+    """
+    queryset = model.objects.all()
+    queryset._result_cache = list(objects)
+    queryset._prefetch_done = True
+    return queryset
+
+
+def build_members(count=MEMBER_COUNT):
+    """
+    Create the users referenced by the in-memory boards, tasks and comments.
+
+    Users are saved because CommentSerializer resolves authors through
+    the database.
+    """
+    return [
+        User.objects.create(
+            username=f"Bench User {index}",
+            email=f"bench{index}@example.com"
+        )
+        for index in range(count)
+    ]
+
+
+def build_tasks(count, board, members):
+    """
+    Return `count` unsaved tasks with prefetched, empty comment sets.
+    """
+    statuses = Task.Status.values
+    priorities = Task.Priority.values
+    tasks = []
+    for index in range(count):
+        task = Task(
+            id=index + 1,
+            board=board,
+            title=f"Task {index}",
+            description="Benchmark task description",
+            status=statuses[index % len(statuses)],
+            priority=priorities[index % len(priorities)],
+            assignee=members[index % len(members)],
+            reviewer=members[(index + 1) % len(members)],
+            creator=members[0],
+            due_date=date(2025, 1, 1 + index % 28),
+        )
+        task._prefetched_objects_cache = {'comments': cached_queryset(Comment, [])}
+        tasks.append(task)
+    return tasks
+
+
+def build_board(count, members):
+    """
+    Return an unsaved board holding `count` prefetched tasks.
+    """
+    board = Board(id=1, title="Benchmark board", owner=members[0])
+    board._prefetched_objects_cache = {
+        'members': cached_queryset(User, members),
+        'tasks': cached_queryset(Task, build_tasks(count, board, members)),
+    }
+    return board
+
+
+def build_comments(count, members):
+    """
+    Return `count` unsaved comments authored by the benchmark users.
+    """
+    return [
+        Comment(
+            id=index + 1,
+            author=members[index % len(members)],
+            content="Benchmark comment",
+            created_at=date(2025, 1, 1),
+            task_id=1,
+        )
+        for index in range(count)
+    ]
+
+
+def build_cases(size, members):
+    """
+    Return (name, callable) pairs that serialize `size` instances each.
+    """
+    factory = APIRequestFactory()
+    task_request = factory.get('/api/tasks/assigned-to-me/')
+    board_request = factory.get('/api/boards/1/')
+    comment_request = factory.get('/api/tasks/1/comments/')
+
+    tasks = build_tasks(size, Board(id=1, owner=members[0]), members)
+    board = build_board(size, members)
+    comments = build_comments(size, members)
+
+    return [
+        ('task', lambda: TaskSerializer(
+            tasks, many=True, context={'request': task_request}).data),
+        ('board_detail', lambda: BoardDetailSerializer(
+            board, context={'request': board_request}).data),
+        ('comment', lambda: CommentSerializer(
+            comments, many=True, context={'request': comment_request}).data),
+    ]
+
+
+def measure(func, repeat):
+    """
+    Return timing and allocation figures for a serializer call.
+
+    Time is the best of `repeat` runs without tracing; memory figures
+    come from one additional run under `tracemalloc`.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+
+    blocks = sum(
+        stat.count_diff for stat in after.compare_to(before, 'filename')
+        if stat.count_diff > 0
+    )
+    return {
+        'seconds': min(timings),
+        'peak_kib': round(peak / 1024, 1),
+        'blocks': blocks,
+    }
+
+
+class Command(BaseCommand):
+    """
+    Benchmark the API serializers and optionally compare with a baseline.
+    """
+
+
+    help = "Benchmark TaskSerializer, BoardDetailSerializer and CommentSerializer."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                            help="Number of instances per serializer run.")
+        parser.add_argument('--repeat', type=int, default=3,
+                            help="Timed runs per case; the best one is kept.")
+        parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                            help="Baseline file to write or compare against.")
+        parser.add_argument('--save', action='store_true',
+                            help="Write the results to the baseline file.")
+        parser.add_argument('--compare', action='store_true',
+                            help="Compare the results with the baseline file.")
+        parser.add_argument('--tolerance', type=float, default=0.10,
+                            help="Allowed slowdown before a case counts as a regression.")
+
+    def handle(self, *args, **options):
+        """
+        Run every case on a throwaway test database and report the results.
+        """
+        with throwaway_database():
+            results = self.run_cases(options['sizes'], options['repeat'])
+
+        if options['compare']:
+            self.compare(results, options['baseline'], options['tolerance'])
+        if options['save']:
+            self.save(results, options['baseline'])
+
+    def run_cases(self, sizes, repeat):
+        """
+        Measure every serializer for every size and print one line per case.
+        """
+        members = build_members()
+        results = {}
+        for size in sizes:
+            for name, func in build_cases(size, members):
+                key = f"{name}/{size}"
+                results[key] = measure(func, repeat)
+                figures = results[key]
+                self.stdout.write(
+                    f"{key:<22} {figures['seconds'] * 1000:10.1f} ms "
+                    f"{figures['seconds'] / size * 1e6:8.2f} us/obj "
+                    f"{figures['peak_kib']:12.1f} KiB peak "
+                    f"{figures['blocks']:10d} blocks"
+                )
+        return results
+
+    def save(self, results, path):
+        """
+        Write the results to the baseline file.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'results': results}, indent=2, sort_keys=True) + "\n")
+        self.stdout.write(f"Baseline written to {path}")
+
+    def compare(self, results, path, tolerance):
+        """
+        Compare the results with the baseline and fail on regressions.
+        """
+        if not path.exists():
+            raise CommandError(f"Baseline file {path} does not exist. Run with --save first.")
+        baseline = json.loads(path.read_text())['results']
+
+        regressions = []
+        for key, figures in results.items():
+            reference = baseline.get(key)
+            if reference is None:
+                self.stdout.write(f"{key:<22} no baseline entry")
+                continue
+            ratio = figures['seconds'] / reference['seconds']
+            memory_ratio = figures['peak_kib'] / reference['peak_kib'] if reference['peak_kib'] else 1.0
+            self.stdout.write(f"{key:<22} time x{ratio:.2f}  peak x{memory_ratio:.2f}")
+            if ratio > 1 + tolerance:
+                regressions.append(key)
+
+        if regressions:
+            raise CommandError(f"Serializer regressions: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline."))
@@ -0,0 +1,103 @@
+"""
+Benchmark worker startup for the settings profiles.
+
+Each profile is started several times in a fresh interpreter that
+imports the WSGI application, exactly like a worker does, including
+the warm-up of profiles that enable `WARM_UP_AT_BOOT`. Reported per
+profile are the median boot time, the resident memory after boot, the
+number of loaded modules and the latency of the first and second
+request to the API.
+
+Usage:
+    python manage.py bench_startup
+    python manage.py bench_startup --profiles core.settings core.settings_api --repeat 9
+"""
+
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+DEFAULT_PROFILES = ['core.settings', 'core.settings_production', 'core.settings_api']
+
+PROBE = r'''
+import json, sys, time
+started = time.perf_counter()
+from core.wsgi import application
+boot = time.perf_counter() - started
+
+from django.test import Client
+client = Client(HTTP_HOST='localhost')
+latencies = []
+for _ in range(2):
+    started = time.perf_counter()
+    client.get('/api/boards/')
+    latencies.append(time.perf_counter() - started)
+
+rss_kib = 0
+with open('/proc/self/status') as status:
+    for line in status:
+        if line.startswith('VmRSS:'):
+            rss_kib = int(line.split()[1])
+if not rss_kib:
+    import resource
+    rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+print(json.dumps({
+    'boot': boot,
+    'first_request': latencies[0],
+    'second_request': latencies[1],
+    'rss_kib': rss_kib,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def probe(profile):
+    """
+    Boot the profile in a fresh interpreter and return its figures.
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': profile}
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=settings.BASE_DIR, env=env,
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise CommandError(f"{profile} failed to start:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class Command(BaseCommand):
+    """
+    Compare boot time, memory and first-request latency of settings profiles.
+    """
+
+
+    help = "Measure worker import time and RSS per settings profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=DEFAULT_PROFILES,
+                            help="Settings modules to compare.")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Fresh interpreters per profile; medians are reported.")
+
+    def handle(self, *args, **options):
+        """
+        Probe every profile and print one line per profile.
+        """
+        for profile in options['profiles']:
+            runs = [probe(profile) for _ in range(options['repeat'])]
+            median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            self.stdout.write(
+                f"{profile:<28} boot {median['boot'] * 1000:7.1f} ms "
+                f"rss {median['rss_kib'] / 1024:6.1f} MiB "
+                f"{median['modules']:5.0f} modules "
+                f"first request {median['first_request'] * 1000:6.2f} ms "
+                f"second {median['second_request'] * 1000:5.2f} ms"
+            )
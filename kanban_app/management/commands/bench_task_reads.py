@@ -0,0 +1,115 @@
+"""
+Benchmark the `.values()` fast path for task listings against TaskSerializer.
+
+Creates a board with saved tasks and comments, then times building the
+board detail task list with TaskSerializer (over instances with their
+users selected and comments counted in the same query) and with the
+row-based fast path. Both outputs are checked to render identically.
+
+Usage:
+    python manage.py bench_task_reads
+    python manage.py bench_task_reads --sizes 1000 10000 --repeat 5
+
+The benchmark runs against a throwaway test database, so it never
+touches application data.
+"""
+
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from core.db import throwaway_database
+from kanban_app.api.rows import task_data, task_rows
+from kanban_app.api.serializers import TaskSerializer
+from kanban_app.management.commands.bench_serializers import build_members, measure
+from kanban_app.models import Board, Task, Comment
+
+
+DEFAULT_SIZES = [1000, 10000]
+
+
+def build_saved_board(size, members):
+    """
+    Save a board with `size` tasks, every third one with a comment.
+    """
+    board = Board.objects.create(title=f"Benchmark board {size}", owner=members[0])
+    board.members.add(*members)
+    statuses = Task.Status.values
+    priorities = Task.Priority.values
+    tasks = Task.objects.bulk_create(
+        Task(
+            board=board,
+            title=f"Task {index}",
+            description="Benchmark task description",
+            status=statuses[index % len(statuses)],
+            priority=priorities[index % len(priorities)],
+            assignee=members[index % len(members)],
+            reviewer=members[(index + 1) % len(members)] if index % 5 else None,
+            creator=members[0],
+            due_date=date(2025, 1, 1 + index % 28),
+        )
+        for index in range(size)
+    )
+    Comment.objects.bulk_create(
+        Comment(task=task, author=members[0], content="Benchmark comment", created_at=date(2025, 1, 1))
+        for task in tasks[::3]
+    )
+    return board
+
+
+class Command(BaseCommand):
+    """
+    Compare TaskSerializer with the row-based task listing.
+    """
+
+
+    help = "Benchmark TaskSerializer against the .values() task listing fast path."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES,
+                            help="Number of tasks on the listed board.")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Timed runs per case; the best one is kept.")
+
+    def handle(self, *args, **options):
+        """
+        Run every case on a throwaway test database and print the results.
+        """
+        with throwaway_database():
+            members = build_members()
+            for size in options['sizes']:
+                self.run_size(size, build_saved_board(size, members), options['repeat'])
+
+    def run_size(self, size, board, repeat):
+        """
+        Measure both paths for one board and print one line per case.
+        """
+        request = APIRequestFactory().get(f'/api/boards/{board.id}/')
+        tasks = Task.objects.filter(board=board)
+
+        def serializer():
+            instances = tasks.select_related('assignee', 'reviewer') \
+                .annotate(comments_total=Count('comments')).order_by('id')
+            return TaskSerializer(instances, many=True, context={'request': request}).data
+
+        def rows():
+            return task_data(task_rows(tasks), include_board=False)
+
+        if JSONRenderer().render(rows()) != JSONRenderer().render(serializer()):
+            raise CommandError(f"Fast path output differs from TaskSerializer for {size} tasks")
+
+        baseline = None
+        for name, func in [('serializer', serializer), ('values', rows)]:
+            figures = measure(func, repeat)
+            baseline = baseline or figures['seconds']
+            self.stdout.write(
+                f"{name:<10} {size:>7} tasks "
+                f"{figures['seconds'] * 1000:9.2f} ms "
+                f"{figures['seconds'] / size * 1e6:7.2f} us/task "
+                f"(x{baseline / figures['seconds']:5.1f}) "
+                f"{figures['peak_kib']:10.1f} KiB peak"
+            )
@@ -0,0 +1,104 @@
+"""
+Benchmark the cost of a rate limit check.
+
+Times DRF's cache-based ScopedRateThrottle against SlidingWindowThrottle
+on the same authenticated request, plus the bare WindowStore check the
+latter is built on. Limits are set high enough that every request is
+allowed, so only the check itself is measured. ScopedRateThrottle keeps
+a timestamp per request in the window, so its runs are capped at
+`HISTORY` calls, a realistic per-client history, starting from an empty
+cache.
+
+Usage:
+    python manage.py bench_throttles
+    python manage.py bench_throttles --calls 200000 --repeat 5
+"""
+
+
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.throttling import ScopedRateThrottle
+
+from core.throttling import SlidingWindowThrottle, WindowStore, window_store
+
+
+HISTORY = 600
+
+
+class BenchView:
+    """
+    Stand-in view naming the endpoint group and its rate.
+    """
+
+
+    throttle_scope = 'bench'
+    throttle_rate = '1000000000/min'
+
+
+class BenchScopedRateThrottle(ScopedRateThrottle):
+    """
+    ScopedRateThrottle with the benchmark's rate.
+    """
+
+
+    THROTTLE_RATES = {'bench': BenchView.throttle_rate}
+
+
+def best_per_call(func, calls, repeat, setup=None):
+    """
+    Return the fastest per-call time of `func` over `repeat` runs of `calls` calls.
+    """
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = (time.perf_counter() - started) / calls
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class Command(BaseCommand):
+    """
+    Compare the per-request cost of the throttles.
+    """
+
+
+    help = "Benchmark ScopedRateThrottle against SlidingWindowThrottle."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=100000,
+                            help="Checks per timed run.")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Timed runs per case; the best one is kept.")
+
+    def handle(self, *args, **options):
+        """
+        Time every case and print one line per case.
+        """
+        django_request = APIRequestFactory().get('/api/boards/')
+        force_authenticate(django_request, User(id=1, username="bench"))
+        request = Request(django_request)
+        request.user
+        view = BenchView()
+
+        store = WindowStore()
+        scoped = BenchScopedRateThrottle()
+        sliding = SlidingWindowThrottle()
+        window_store().clear()
+        calls = options['calls']
+        cases = [
+            ('drf-scoped', lambda: scoped.allow_request(request, view), min(calls, HISTORY), cache.clear),
+            ('sliding-window', lambda: sliding.allow_request(request, view), calls, None),
+            ('window-store', lambda: store.hit('bench:user:1', 1000000000, 60), calls, None),
+        ]
+        for name, check, case_calls, setup in cases:
+            seconds = best_per_call(check, case_calls, options['repeat'], setup)
+            self.stdout.write(f"{name:<15} {seconds * 1e6:8.3f} µs per check")
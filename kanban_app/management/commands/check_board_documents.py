@@ -0,0 +1,89 @@
+"""
+Check stored board documents against the database.
+
+Every built BoardDocument is compared byte for byte with a document
+freshly built from the board's current rows. Mismatches, and documents
+of boards that are deleted or missing, are reported and, with `--fix`,
+rebuilt or discarded. `--build` also builds the documents of boards that
+do not have one yet, or whose document was discarded.
+
+Usage:
+    python manage.py check_board_documents
+    python manage.py check_board_documents --fix
+    python manage.py check_board_documents --board 42 --build
+"""
+
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from kanban_app.documents import check_document, discard_documents, get_document
+from kanban_app.models import Board, BoardDocument
+from kanban_app.sharding import shards, use_shard
+
+
+class Command(BaseCommand):
+    """
+    Verify, and optionally repair, the materialized board documents.
+    """
+
+
+    help = "Compare stored board documents with freshly built ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int,
+                            help="Check only this board.")
+        parser.add_argument('--fix', action='store_true',
+                            help="Rebuild mismatching documents and discard orphaned ones.")
+        parser.add_argument('--build', action='store_true',
+                            help="Build missing documents as well.")
+
+    def handle(self, *args, **options):
+        """
+        Check the documents of every shard and report the results.
+        """
+        checked = 0
+        broken = []
+        for alias in shards():
+            with use_shard(alias):
+                documents = BoardDocument.objects.using(alias).exclude(head=b'').order_by('board_id')
+                if options['board']:
+                    documents = documents.filter(board_id=options['board'])
+                for board_id in list(documents.values_list('board_id', flat=True)):
+                    document = BoardDocument.objects.using(alias).get(board_id=board_id)
+                    checked += 1
+                    if not check_document(document):
+                        broken.append(document.board_id)
+                        self.stdout.write(f"Board {document.board_id} ({alias}): document is stale")
+                        if options['fix']:
+                            self.rebuild(document.board_id, alias)
+                if options['build']:
+                    self.build_missing(alias, options['board'])
+
+        self.stdout.write(f"{checked} document(s) checked, {len(broken)} stale.")
+        if broken and not options['fix']:
+            raise CommandError(f"Stale board documents: {', '.join(map(str, broken))}")
+        if broken:
+            self.stdout.write(self.style.SUCCESS(f"{len(broken)} document(s) repaired."))
+
+    def rebuild(self, board_id, alias):
+        """
+        Replace a board's document, or discard it if the board is gone.
+        """
+        discard_documents([board_id], alias)
+        board = Board.objects.using(alias).filter(id=board_id).first()
+        if board is not None:
+            get_document(board)
+
+    def build_missing(self, alias, board_id):
+        """
+        Build the documents of the shard's boards that have none.
+        """
+        boards = Board.objects.using(alias) \
+            .filter(Q(document__isnull=True) | Q(document__head=b'')).order_by('id')
+        if board_id:
+            boards = boards.filter(id=board_id)
+        boards = list(boards.only('id'))
+        for board in boards:
+            get_document(board)
+        self.stdout.write(f"{len(boards)} document(s) built on {alias}.")
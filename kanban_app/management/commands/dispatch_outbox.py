@@ -0,0 +1,55 @@
+"""
+Deliver task and comment notifications from the outbox.
+
+Usage:
+    python manage.py dispatch_outbox                  # poll until stopped
+    python manage.py dispatch_outbox --once           # drain and exit
+    python manage.py dispatch_outbox --batch-size 500
+
+Messages are delivered in batches to the sinks in `OUTBOX['SINKS']`;
+see `kanban_app.outbox`. Run a single dispatcher at a time. Stop with
+Ctrl+C; the current batch is finished first.
+"""
+
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from kanban_app.outbox import drain, load_sinks, outbox_settings
+
+
+class Command(BaseCommand):
+    """
+    Drain the outbox of every shard to the configured sinks.
+    """
+
+
+    help = "Deliver outbox notifications in batches to the configured sinks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Drain the outbox and exit instead of polling.")
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Messages per batch (default OUTBOX['BATCH_SIZE']).")
+        parser.add_argument('--poll', type=float, default=None,
+                            help="Seconds to wait when the outbox is empty.")
+
+    def handle(self, *args, **options):
+        """
+        Deliver messages until stopped, or until the outbox is empty with --once.
+        """
+        poll = outbox_settings()['POLL_SECONDS'] if options['poll'] is None else options['poll']
+        sinks = load_sinks()
+        total = 0
+        try:
+            while True:
+                delivered = drain(sinks, options['batch_size'])
+                total += delivered
+                if options['once']:
+                    break
+                if not delivered:
+                    time.sleep(poll)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f"Delivered {total} outbox messages.")
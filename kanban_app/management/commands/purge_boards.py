@@ -0,0 +1,70 @@
+"""
+Purge deleted boards whose background purge has not finished.
+
+Deleted boards are purged in a background thread right after the
+deletion. This command finishes purges that were interrupted, e.g. by a
+restart, and reports the progress of every batch.
+
+Usage:
+    python manage.py purge_boards
+    python manage.py purge_boards --batch-size 200 --pause 0.05
+    python manage.py purge_boards --status
+"""
+
+
+from django.core.management.base import BaseCommand
+
+from kanban_app.models import BoardPurge
+from kanban_app.purge import purge_board
+from kanban_app.sharding import fan_out, use_shard
+
+
+class Command(BaseCommand):
+    """
+    Finish pending board purges.
+    """
+
+
+    help = "Purge the tasks and comments of deleted boards in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Rows deleted per transaction.")
+        parser.add_argument('--pause', type=float, default=None,
+                            help="Seconds to wait between batches.")
+        parser.add_argument('--status', action='store_true',
+                            help="Only list pending purges and their progress.")
+
+    def handle(self, *args, **options):
+        """
+        Run every unfinished purge on every shard.
+        """
+        pending = fan_out(lambda: [
+            (purge._state.db, purge)
+            for purge in BoardPurge.objects.filter(finished_at__isnull=True).order_by('requested_at')
+        ])
+        if not pending:
+            self.stdout.write("No pending purges.")
+            return
+
+        for shard, purge in pending:
+            self.report(purge, shard)
+            if options['status']:
+                continue
+            with use_shard(shard):
+                purge = purge_board(
+                    purge.board_id, shard,
+                    batch_size=options['batch_size'],
+                    pause=options['pause'],
+                    progress=lambda purge: self.report(purge, shard)
+                )
+            self.stdout.write(self.style.SUCCESS(f"Board {purge.board_id} purged."))
+
+    def report(self, purge, shard):
+        """
+        Print the progress of one purge.
+        """
+        self.stdout.write(
+            f"Board {purge.board_id} ({shard}): {purge.comments_deleted} comments, "
+            f"{purge.tasks_deleted} tasks deleted"
+        )
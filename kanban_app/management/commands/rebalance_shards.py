@@ -0,0 +1,246 @@
+"""
+Rebalance sharded boards across the configured databases.
+
+The command first mirrors all users onto every shard and registers
+boards, tasks and comments that are missing from the shard directory,
+e.g. rows created before sharding was enabled. It then moves every
+board whose directory entry disagrees with the ID-based placement for
+the current `BOARD_SHARDS`, or a single board with `--board/--to`.
+
+A move marks the board as moving in the directory, which makes it
+read-only, and copies the board, its members, tasks and comments, archived
+ones included, its purge progress and its undelivered outbox messages to the target shard, with
+the IDs of boards, tasks and comments unchanged. It then switches the directory entry, which
+makes the board writable on the target, and only then deletes
+the rows from the source shard with raw DELETEs. The board document is not copied: the
+target gets a discarded one with the same version, rebuilt on the next
+read. Soft-deleted boards waiting for their purge are moved like any
+other board.
+
+Usage:
+    python manage.py rebalance_shards --dry-run
+    python manage.py rebalance_shards
+    python manage.py rebalance_shards --board 42 --to shard2
+"""
+
+
+from copy import deepcopy
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+
+from kanban_app.models import Board, Task, Comment, BoardKey, TaskKey, CommentKey, BoardPurge, \
+    OutboxMessage, ArchivedTask, ArchivedComment, BoardDocument, BoardDocumentEntry, BoardDocumentVariant
+from kanban_app.sharding import shards, shard_for_new_board
+
+
+USER_FIELDS = [
+    'password', 'last_login', 'is_superuser', 'username', 'first_name',
+    'last_name', 'email', 'is_staff', 'is_active', 'date_joined',
+]
+
+
+def batched(queryset, batch_size):
+    """
+    Yield lists of at most `batch_size` objects, ordered by primary key.
+    """
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1].pk
+
+
+def copy_of(instance):
+    """
+    Return an unsaved copy of a row whose ID is only unique on its shard.
+    """
+    copy = deepcopy(instance)
+    copy.pk = None
+    copy._state.adding = True
+    return copy
+
+
+class Command(BaseCommand):
+    """
+    Mirror users, fill the shard directory and move boards between shards.
+    """
+
+
+    help = "Move sharded boards onto the shard their ID maps to."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int,
+                            help="Move only this board.")
+        parser.add_argument('--to', dest='target',
+                            help="Target shard for --board.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Rows copied per bulk insert.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report the planned moves.")
+
+    def handle(self, *args, **options):
+        """
+        Run the synchronisation steps and the planned moves.
+        """
+        aliases = shards()
+        if len(aliases) < 2:
+            raise CommandError("Sharding is not enabled; configure BOARD_SHARDS.")
+        if bool(options['board']) != bool(options['target']):
+            raise CommandError("--board and --to must be given together.")
+        if options['target'] and options['target'] not in aliases:
+            raise CommandError(f"Unknown shard '{options['target']}'.")
+
+        self.batch_size = options['batch_size']
+        if not options['dry_run']:
+            self.mirror_users(aliases)
+            self.register(aliases)
+
+        moves = self.plan(options['board'], options['target'])
+        for board_id, source, target in moves:
+            self.stdout.write(f"Board {board_id}: {source} -> {target}")
+            if not options['dry_run']:
+                self.move_board(board_id, source, target)
+        self.stdout.write(self.style.SUCCESS(f"{len(moves)} board(s) to move."))
+
+    def mirror_users(self, aliases):
+        """
+        Insert or update every user on every non-default shard.
+        """
+        for batch in batched(User.objects.using(DEFAULT_DB_ALIAS), self.batch_size):
+            for alias in aliases:
+                if alias == DEFAULT_DB_ALIAS:
+                    continue
+                User.objects.using(alias).bulk_create(
+                    batch, update_conflicts=True, unique_fields=['id'], update_fields=USER_FIELDS
+                )
+
+    def register(self, aliases):
+        """
+        Add directory entries for rows that do not have one yet.
+        """
+        directory = BoardKey.objects.using(DEFAULT_DB_ALIAS)
+        for alias in aliases:
+            for batch in batched(Board.all_objects.using(alias).only('id'), self.batch_size):
+                directory.bulk_create(
+                    [BoardKey(id=board.id, shard=alias) for board in batch], ignore_conflicts=True
+                )
+            for batch in batched(Task.all_objects.using(alias).only('id', 'board_id'), self.batch_size):
+                TaskKey.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+                    [TaskKey(id=task.id, board_id=task.board_id) for task in batch],
+                    ignore_conflicts=True
+                )
+            for batch in batched(Comment.all_objects.using(alias).only('id', 'task_id'), self.batch_size):
+                CommentKey.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+                    [CommentKey(id=comment.id, task_id=comment.task_id) for comment in batch],
+                    ignore_conflicts=True
+                )
+
+    def plan(self, board_id, target):
+        """
+        Return (board_id, source, target) triples for the boards to move.
+        """
+        keys = BoardKey.objects.using(DEFAULT_DB_ALIAS).exclude(shard='')
+        if board_id:
+            key = keys.filter(id=board_id).first()
+            if key is None:
+                raise CommandError(f"Board {board_id} is not in the shard directory.")
+            return [(key.id, key.shard, target)] if key.shard != target else []
+
+        return [
+            (key_id, shard, shard_for_new_board(key_id))
+            for key_id, shard in keys.values_list('id', 'shard').order_by('id')
+            if shard != shard_for_new_board(key_id)
+        ]
+
+    def move_board(self, board_id, source, target):
+        """
+        Copy a board with its members, tasks, comments, archived tasks and
+        comments, purge progress and outbox messages, then remove the original.
+
+        The board is marked as moving first, which makes it read-only, and
+        a write on the source waits for writes that passed the check
+        before. The mark is cleared together with the directory switch,
+        or when the copy fails.
+        """
+        directory = BoardKey.objects.using(DEFAULT_DB_ALIAS).filter(id=board_id)
+        board = Board.all_objects.using(source).filter(id=board_id).first()
+        if board is None:
+            directory.update(shard=target)
+            return
+
+        directory.update(moving=True)
+        try:
+            with transaction.atomic(using=source):
+                Board.all_objects.using(source).filter(id=board_id).update(title=F('title'))
+            board = Board.all_objects.using(source).get(id=board_id)
+            self.copy_board(board, source, target)
+        except BaseException:
+            directory.update(moving=False)
+            raise
+        directory.update(shard=target, moving=False)
+        self.delete_board(board_id, source)
+
+    def copy_board(self, board, source, target):
+        """
+        Insert the board and everything on it into the target shard.
+        """
+        board_id = board.id
+        Membership = Board.members.through
+        purges = BoardPurge.objects.using(source).filter(board_id=board_id)
+        messages = OutboxMessage.objects.using(source).filter(payload__board_id=board_id)
+        versions = BoardDocument.objects.using(source).filter(board_id=board_id).values_list('version', flat=True)
+        with transaction.atomic(using=target):
+            Board.all_objects.using(target).bulk_create([board])
+            Membership.objects.using(target).bulk_create([
+                Membership(board_id=board_id, user_id=user_id)
+                for user_id in Membership.objects.using(source).filter(
+                    board_id=board_id).values_list('user_id', flat=True)
+            ])
+            for batch in batched(Task.all_objects.using(source).filter(board_id=board_id), self.batch_size):
+                Task.all_objects.using(target).bulk_create(batch)
+            comments = Comment.all_objects.using(source).filter(task__board_id=board_id)
+            for batch in batched(comments, self.batch_size):
+                Comment.all_objects.using(target).bulk_create(batch)
+            archived = ArchivedTask.objects.using(source).filter(board_id=board_id)
+            for batch in batched(archived, self.batch_size):
+                ArchivedTask.objects.using(target).bulk_create(batch)
+            archived_comments = ArchivedComment.objects.using(source).filter(task__board_id=board_id)
+            for batch in batched(archived_comments, self.batch_size):
+                ArchivedComment.objects.using(target).bulk_create(batch)
+            BoardPurge.objects.using(target).bulk_create([copy_of(purge) for purge in purges])
+            for batch in batched(messages, self.batch_size):
+                OutboxMessage.objects.using(target).bulk_create([copy_of(message) for message in batch])
+            BoardDocument.objects.using(target).bulk_create([
+                BoardDocument(board_id=board_id, head=b'', body=b'', version=version, body_version=version)
+                for version in versions
+            ])
+
+    def delete_board(self, board_id, source):
+        """
+        Delete the board and everything on it from the source shard.
+
+        The rows are deleted with one raw DELETE per table, dependents
+        first, so neither the cascade collector nor signal handlers run.
+        """
+        Membership = Board.members.through
+        querysets = [
+            Comment.all_objects.using(source).filter(task__board_id=board_id),
+            ArchivedComment.objects.using(source).filter(task__board_id=board_id),
+            Task.all_objects.using(source).filter(board_id=board_id),
+            ArchivedTask.objects.using(source).filter(board_id=board_id),
+            BoardDocumentEntry.objects.using(source).filter(document_id=board_id),
+            BoardDocumentVariant.objects.using(source).filter(document_id=board_id),
+            BoardDocument.objects.using(source).filter(board_id=board_id),
+            Membership.objects.using(source).filter(board_id=board_id),
+            BoardPurge.objects.using(source).filter(board_id=board_id),
+            OutboxMessage.objects.using(source).filter(payload__board_id=board_id),
+            Board.all_objects.using(source).filter(id=board_id),
+        ]
+        with transaction.atomic(using=source):
+            for queryset in querysets:
+                queryset._raw_delete(source)
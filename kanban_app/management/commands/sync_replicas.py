@@ -0,0 +1,50 @@
+"""
+Copy the primary SQLite database onto every configured replica.
+
+Meant for local setups where replicas are plain SQLite files rather
+than replicated servers. Uses SQLite's online backup API, so the
+primary stays available while it is copied.
+
+Usage:
+    python manage.py sync_replicas
+"""
+
+
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    """
+    Refresh every SQLite replica from the primary database.
+    """
+
+
+    help = "Copy the primary SQLite database onto every configured replica."
+
+    def handle(self, *args, **options):
+        """
+        Back up the primary into each replica file.
+        """
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict
+        replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+        if not replicas:
+            raise CommandError("No replicas configured in DATABASE_REPLICAS.")
+
+        for alias in replicas:
+            replica = connections[alias].settings_dict
+            if 'sqlite3' not in replica['ENGINE']:
+                raise CommandError(f"Replica '{alias}' is not an SQLite database.")
+            connections[alias].close()
+
+            source = sqlite3.connect(primary['NAME'])
+            target = sqlite3.connect(replica['NAME'])
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(f"Copied {primary['NAME']} to {replica['NAME']} ({alias})")
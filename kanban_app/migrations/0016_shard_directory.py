@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0015_alter_task_board'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.CharField(blank=True, max_length=63)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CommentKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TaskKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board_id', models.BigIntegerField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Full-text search index over task titles, descriptions and comments.
+
+from django.db import migrations
+
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE kanban_app_search USING fts5(
+        title, description, comment, board, task_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    INSERT INTO kanban_app_search (kanban_app_search, rank) VALUES ('rank', 'bm25(10.0, 5.0, 1.0, 0.0)')
+    """,
+    """
+    CREATE TRIGGER kanban_app_task_search_insert AFTER INSERT ON kanban_app_task BEGIN
+        INSERT INTO kanban_app_search (rowid, title, description, comment, board, task_id)
+        VALUES (new.id * 2, new.title, new.description, '', 'b' || new.board_id, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_app_task_search_update AFTER UPDATE OF title, description ON kanban_app_task BEGIN
+        UPDATE kanban_app_search SET title = new.title, description = new.description
+        WHERE rowid = new.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_app_task_search_delete AFTER DELETE ON kanban_app_task BEGIN
+        DELETE FROM kanban_app_search WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_app_comment_search_insert AFTER INSERT ON kanban_app_comment BEGIN
+        INSERT INTO kanban_app_search (rowid, title, description, comment, board, task_id)
+        VALUES (
+            new.id * 2 + 1, '', '', new.content,
+            (SELECT 'b' || board_id FROM kanban_app_task WHERE id = new.task_id), new.task_id
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_app_comment_search_update AFTER UPDATE OF content, task_id ON kanban_app_comment BEGIN
+        UPDATE kanban_app_search SET
+            comment = new.content,
+            board = (SELECT 'b' || board_id FROM kanban_app_task WHERE id = new.task_id),
+            task_id = new.task_id
+        WHERE rowid = new.id * 2 + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER kanban_app_comment_search_delete AFTER DELETE ON kanban_app_comment BEGIN
+        DELETE FROM kanban_app_search WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+    """
+    INSERT INTO kanban_app_search (rowid, title, description, comment, board, task_id)
+    SELECT id * 2, title, description, '', 'b' || board_id, id FROM kanban_app_task
+    """,
+    """
+    INSERT INTO kanban_app_search (rowid, title, description, comment, board, task_id)
+    SELECT kanban_app_comment.id * 2 + 1, '', '', content, 'b' || board_id, task_id
+    FROM kanban_app_comment
+    LEFT JOIN kanban_app_task ON kanban_app_task.id = kanban_app_comment.task_id
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS kanban_app_task_search_insert",
+    "DROP TRIGGER IF EXISTS kanban_app_task_search_update",
+    "DROP TRIGGER IF EXISTS kanban_app_task_search_delete",
+    "DROP TRIGGER IF EXISTS kanban_app_comment_search_insert",
+    "DROP TRIGGER IF EXISTS kanban_app_comment_search_update",
+    "DROP TRIGGER IF EXISTS kanban_app_comment_search_delete",
+    "DROP TABLE IF EXISTS kanban_app_search",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0016_shard_directory'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_SQL), run(DROP_SQL)),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0021_task_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardDocument',
+            fields=[
+                ('board', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='kanban_app.board')),
+                ('body', models.BinaryField()),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0022_board_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardDocumentVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('encoding', models.CharField(max_length=16)),
+                ('version', models.PositiveIntegerField()),
+                ('body', models.BinaryField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='kanban_app.boarddocument')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('document', 'encoding'), name='board_document_variant_unique')],
+            },
+        ),
+    ]
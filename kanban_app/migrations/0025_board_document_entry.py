@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-19 10:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def discard_documents(apps, schema_editor):
+    """
+    Drop documents stored without task entries; they are rebuilt on the next read.
+    """
+    BoardDocument = apps.get_model('kanban_app', 'BoardDocument')
+    BoardDocument.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0024_outbox_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='boarddocument',
+            name='body_version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='boarddocument',
+            name='head',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.CreateModel(
+            name='BoardDocumentEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('body', models.BinaryField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='kanban_app.boarddocument')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('document', 'task_id'), name='board_document_entry_unique')],
+            },
+        ),
+        migrations.RunPython(discard_documents, migrations.RunPython.noop),
+    ]
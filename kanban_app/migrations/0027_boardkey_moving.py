@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 10:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanban_app', '0026_outbox_next_attempt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='boardkey',
+            name='moving',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -5,6 +5,17 @@ This module defines the core entities:
 - Board: Represents a project board with members and an owner.
 - Task: Represents a task within a board, with status, priority, and assigned users.
 - Comment: Represents a comment on a task, authored by a user.
+- BoardPurge: Tracks the background purge of a deleted board.
+- BoardDocument: The rendered detail response of a board.
+- BoardDocumentEntry: One task's rendered entry in a board document.
+- BoardDocumentVariant: A compressed copy of a board document.
+- ArchivedTask, ArchivedComment: Cold storage for old completed tasks
+  and their comments.
+- OutboxMessage: A notification event waiting to be dispatched.
+
+Deleted boards are only marked as deleted and stay in the database
+until they are purged. The default managers of Board, Task and Comment
+hide them, and everything on them, from every query.
 
 Each model enforces relationships and constraints to maintain
 data integrity within the application.
@@ -14,6 +25,38 @@ data integrity within the application.
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
+from django.utils import timezone
+
+
+class ActiveBoardManager(models.Manager):
+    """
+    Manager excluding boards that are deleted and waiting to be purged.
+    """
+
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class ActiveTaskManager(models.Manager):
+    """
+    Manager excluding tasks on deleted boards.
+    """
+
+
+    def get_queryset(self):
+        return super().get_queryset().filter(board__deleted_at__isnull=True)
+
+
+class ActiveCommentManager(models.Manager):
+    """
+    Manager excluding comments on tasks of deleted boards.
+    """
+
+
+    def get_queryset(self):
+        return super().get_queryset().filter(task__board__deleted_at__isnull=True)
+
 
 class Board(models.Model):
     """
@@ -27,6 +70,10 @@ class Board(models.Model):
     title = models.CharField(max_length=63)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='boards_as_owner')
     members = models.ManyToManyField(User, related_name="boards_as_member")
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveBoardManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return f"Board: {self.id}"
@@ -99,6 +146,19 @@ class Task(models.Model):
     )
 
     due_date = models.DateField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveTaskManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board', 'status'], name='task_board_status_idx'),
+            models.Index(fields=['board', 'priority'], name='task_board_priority_idx'),
+            models.Index(fields=['board', 'due_date'], name='task_board_due_date_idx'),
+            models.Index(fields=['due_date', 'status'], name='task_due_date_status_idx'),
+            models.Index(fields=['status', 'completed_at'], name='task_status_completed_idx'),
+        ]
 
     def __str__(self):
         return f"Task: {self.id}"
@@ -130,10 +190,212 @@ class Comment(models.Model):
         related_name='comments'
     )
 
+    objects = ActiveCommentManager()
+    all_objects = models.Manager()
+
     def clean(self):
         if not self.task:
             raise ValidationError('A comment must be assigned to a task.')
         
     
     def __str__(self):
-        return f"Comment: {self.id}"
\ No newline at end of file
+        return f"Comment: {self.id}"
+
+class BoardKey(models.Model):
+    """
+    Directory entry mapping a board ID to the shard that stores it.
+
+    Inserting a row reserves a globally unique board ID. Only used when
+    boards are sharded; see `kanban_app.sharding`. `moving` is set while
+    the board is copied to another shard and makes it read-only.
+    """
+
+
+    shard = models.CharField(max_length=63, blank=True)
+    moving = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"BoardKey: {self.id} -> {self.shard}"
+
+
+class TaskKey(models.Model):
+    """
+    Directory entry mapping a task ID to its board.
+
+    Inserting a row reserves a globally unique task ID.
+    """
+
+
+    board_id = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"TaskKey: {self.id} -> {self.board_id}"
+
+
+class CommentKey(models.Model):
+    """
+    Reserves globally unique comment IDs across shards.
+    """
+
+
+    task_id = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"CommentKey: {self.id} -> {self.task_id}"
+
+
+class BoardPurge(models.Model):
+    """
+    Progress of the background purge of a deleted board.
+
+    Stored next to the board on its shard, so it is written in the same
+    transactions as the rows it counts.
+    """
+
+
+    board_id = models.BigIntegerField(unique=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    comments_deleted = models.PositiveIntegerField(default=0)
+    tasks_deleted = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"BoardPurge: {self.board_id}"
+
+
+class BoardDocument(models.Model):
+    """
+    The board's detail response, rendered as JSON and served as stored.
+
+    `head` holds the response without tasks, the task entries are kept
+    as BoardDocumentEntry rows. `body` joins both and is current while
+    `body_version` matches `version`. An empty `head` marks a discarded
+    document, rebuilt on the next read with the next version. Stored
+    next to the board on its shard and updated in the same transactions
+    as the changes it reflects; see `kanban_app.documents`.
+    """
+
+
+    board = models.OneToOneField(Board, on_delete=models.CASCADE, primary_key=True, related_name='document')
+    head = models.BinaryField(default=b'')
+    body = models.BinaryField()
+    version = models.PositiveIntegerField(default=1)
+    body_version = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"BoardDocument: {self.board_id} v{self.version}"
+
+
+class BoardDocumentEntry(models.Model):
+    """
+    One task's entry in a board document, rendered as JSON.
+    """
+
+
+    document = models.ForeignKey(BoardDocument, on_delete=models.CASCADE, related_name='entries')
+    task_id = models.BigIntegerField()
+    body = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['document', 'task_id'], name='board_document_entry_unique'),
+        ]
+
+    def __str__(self):
+        return f"BoardDocumentEntry: {self.document_id} task {self.task_id}"
+
+
+class BoardDocumentVariant(models.Model):
+    """
+    A board document compressed with one content coding.
+
+    Valid while `version` matches the document's version, so each
+    version is compressed at most once per coding.
+    """
+
+
+    document = models.ForeignKey(BoardDocument, on_delete=models.CASCADE, related_name='variants')
+    encoding = models.CharField(max_length=16)
+    version = models.PositiveIntegerField()
+    body = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['document', 'encoding'], name='board_document_variant_unique'),
+        ]
+
+    def __str__(self):
+        return f"BoardDocumentVariant: {self.document_id} {self.encoding} v{self.version}"
+
+
+class ArchivedTask(models.Model):
+    """
+    A completed task moved out of the task table.
+
+    Keeps the task's ID and fields, so it can be restored unchanged.
+    Archived tasks are not seen by any query on `Task`.
+    """
+
+
+    id = models.BigIntegerField(primary_key=True)
+    board = models.ForeignKey(Board, on_delete=models.CASCADE, related_name='archived_tasks')
+    title = models.CharField(max_length=63)
+    description = models.CharField(max_length=127)
+    status = models.CharField(max_length=20, choices=Task.Status.choices)
+    priority = models.CharField(max_length=10, choices=Task.Priority.choices)
+    assignee = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    reviewer = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    creator = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    due_date = models.DateField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"ArchivedTask: {self.id}"
+
+
+class ArchivedComment(models.Model):
+    """
+    A comment archived together with its task.
+    """
+
+
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, related_name='comments')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    content = models.CharField(max_length=255)
+    created_at = models.DateField()
+
+    def __str__(self):
+        return f"ArchivedComment: {self.id}"
+
+
+class OutboxMessage(models.Model):
+    """
+    A notification event recorded with the change that caused it.
+
+    Written next to the task on its shard, in the transaction of the
+    change, and deleted once the dispatcher has delivered it; see
+    `kanban_app.outbox`. Recipients are resolved at dispatch time, so
+    an event costs one row however large the board is.
+    """
+
+
+    class Event(models.TextChoices):
+        """
+        Enumeration for notification events.
+        """
+        TASK_ASSIGNED = 'task.assigned', 'Task assigned'
+        REVIEW_REQUESTED = 'task.review_requested', 'Review requested'
+        COMMENT_CREATED = 'comment.created', 'Comment created'
+
+    event = models.CharField(max_length=32, choices=Event.choices)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"OutboxMessage: {self.id} {self.event}"
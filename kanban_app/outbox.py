@@ -0,0 +1,297 @@
+"""
+Transactional outbox for task and comment notifications.
+
+Views record notification events as OutboxMessage rows in the
+transaction of the change itself, so an event exists exactly when its
+change was committed, and a request never waits for anybody to be
+notified. `dispatch_outbox` drains the outbox of every shard in
+batches:
+- Each message is expanded into one notification per recipient:
+  the new assignee or reviewer, or every board member for a comment.
+  The actor is never notified of their own change.
+- The notifications of a batch are handed to every configured sink,
+  then the batch's messages are deleted.
+- If that fails, the batch's messages are sent one by one, so a
+  message that cannot be delivered does not hold up the others. Only
+  the messages failing on their own are kept and retried with
+  exponential backoff. Messages failing `MAX_ATTEMPTS` times are left
+  for inspection.
+
+Delivery is at least once: a batch whose sink succeeded but whose
+messages could not be deleted is sent again. Sinks can drop
+duplicates by the notification `id`, which is unique per message and
+recipient. Run a single dispatcher at a time.
+
+Sinks are configured in `OUTBOX['SINKS']` as a mapping of dotted class
+paths to keyword arguments. Sinks have a `send(notifications)` method;
+`LogSink`, `FileSink` (JSON lines) and `MemorySink` (for tests) are
+provided.
+"""
+
+
+import json
+import logging
+import random
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from core.metrics import metrics
+from kanban_app.models import Board, OutboxMessage
+from kanban_app.sharding import shards
+
+
+OUTBOX_DEFAULTS = {
+    'SINKS': {'kanban_app.outbox.LogSink': {}},
+    'BATCH_SIZE': 100,
+    'POLL_SECONDS': 1.0,
+    'MAX_ATTEMPTS': 10,
+    'BACKOFF_BASE': 2.0,
+    'BACKOFF_MAX': 300.0,
+}
+
+logger = logging.getLogger(__name__)
+
+
+def outbox_settings():
+    """
+    Return the outbox settings, filled in with defaults.
+    """
+    return {**OUTBOX_DEFAULTS, **getattr(settings, 'OUTBOX', {})}
+
+
+def task_payload(task, actor):
+    """
+    Return the payload fields describing a task and who changed it.
+    """
+    return {
+        'task_id': task.id,
+        'board_id': task.board_id,
+        'title': task.title,
+        'actor_id': actor.id,
+    }
+
+
+def record_task_changes(task, actor, previous_assignee_id=None, previous_reviewer_id=None):
+    """
+    Record assignment events for a created or updated task.
+
+    An event is recorded for the assignee and the reviewer if they were
+    set or changed. Call inside the transaction saving the task.
+    """
+    messages = []
+    if task.assignee_id and task.assignee_id != previous_assignee_id:
+        messages.append(OutboxMessage(
+            event=OutboxMessage.Event.TASK_ASSIGNED,
+            payload={**task_payload(task, actor), 'user_id': task.assignee_id}
+        ))
+    if task.reviewer_id and task.reviewer_id != previous_reviewer_id:
+        messages.append(OutboxMessage(
+            event=OutboxMessage.Event.REVIEW_REQUESTED,
+            payload={**task_payload(task, actor), 'user_id': task.reviewer_id}
+        ))
+    if messages:
+        OutboxMessage.objects.using(task._state.db).bulk_create(messages)
+
+
+def record_comment(comment, actor):
+    """
+    Record the event for a new comment. Call inside the transaction saving it.
+    """
+    OutboxMessage.objects.using(comment._state.db).create(
+        event=OutboxMessage.Event.COMMENT_CREATED,
+        payload={**task_payload(comment.task, actor), 'comment_id': comment.id, 'content': comment.content}
+    )
+
+
+def recipients(messages, using):
+    """
+    Return the recipient IDs of each message, by message ID.
+    """
+    comment_boards = {
+        message.payload['board_id'] for message in messages
+        if message.event == OutboxMessage.Event.COMMENT_CREATED
+    }
+    members = {}
+    memberships = Board.members.through.objects.using(using) \
+        .filter(board_id__in=comment_boards).order_by('user_id').values_list('board_id', 'user_id')
+    for board_id, user_id in memberships:
+        members.setdefault(board_id, []).append(user_id)
+
+    result = {}
+    for message in messages:
+        if message.event == OutboxMessage.Event.COMMENT_CREATED:
+            user_ids = members.get(message.payload['board_id'], [])
+        else:
+            user_ids = [message.payload['user_id']]
+        result[message.id] = [user_id for user_id in user_ids if user_id != message.payload['actor_id']]
+    return result
+
+
+def notifications(messages, using):
+    """
+    Expand messages into one notification per recipient.
+    """
+    recipient_ids = recipients(messages, using)
+    users = {
+        user_id: email for user_id, email in User.objects.using(using)
+        .filter(id__in={user_id for ids in recipient_ids.values() for user_id in ids})
+        .values_list('id', 'email')
+    }
+    return [
+        {
+            'id': f"{using}:{message.id}:{user_id}",
+            'event': message.event,
+            'recipient_id': user_id,
+            'recipient_email': users[user_id],
+            'created_at': message.created_at,
+            **message.payload,
+        }
+        for message in messages
+        for user_id in recipient_ids[message.id]
+        if user_id in users
+    ]
+
+
+def load_sinks():
+    """
+    Return instances of the configured sinks.
+    """
+    return [import_string(path)(**options) for path, options in outbox_settings()['SINKS'].items()]
+
+
+def backoff(attempts):
+    """
+    Return the delay in seconds before retrying a message that failed `attempts` times.
+    """
+    config = outbox_settings()
+    delay = min(config['BACKOFF_BASE'] ** attempts, config['BACKOFF_MAX'])
+    return delay * random.uniform(0.5, 1.0)
+
+
+def deliver(messages, using, sinks):
+    """
+    Hand the notifications of `messages` to every sink and return how many there were.
+    """
+    batch = notifications(messages, using)
+    for sink in sinks:
+        sink.send(batch)
+    return len(batch)
+
+
+def record_failure(message, using, error):
+    """
+    Count a failed delivery attempt and schedule the next one.
+    """
+    OutboxMessage.objects.using(using).filter(id=message.id).update(
+        attempts=F('attempts') + 1,
+        last_error=repr(error),
+        next_attempt_at=timezone.now() + timedelta(seconds=backoff(message.attempts + 1))
+    )
+
+
+def dispatch_batch(using, sinks, batch_size=None):
+    """
+    Deliver one batch of a database's due messages.
+
+    Returns the numbers of messages delivered and failed.
+    """
+    config = outbox_settings()
+    messages = list(
+        OutboxMessage.objects.using(using)
+        .filter(attempts__lt=config['MAX_ATTEMPTS'], next_attempt_at__lte=timezone.now())
+        .order_by('id')[:batch_size or config['BATCH_SIZE']]
+    )
+    if not messages:
+        return 0, 0
+
+    delivered = []
+    failed = 0
+    try:
+        sent = deliver(messages, using, sinks)
+        delivered = messages
+    except Exception:
+        logger.exception("Dispatching outbox batch to %s failed, sending messages one by one", using)
+        sent = 0
+        for message in messages:
+            try:
+                sent += deliver([message], using, sinks)
+                delivered.append(message)
+            except Exception as exc:
+                logger.exception("Dispatching outbox message %s of %s failed", message.id, using)
+                record_failure(message, using, exc)
+                failed += 1
+        metrics.increment('outbox.failures', failed)
+
+    OutboxMessage.objects.using(using).filter(id__in=[message.id for message in delivered]).delete()
+    metrics.increment('outbox.messages', len(delivered))
+    metrics.increment('outbox.notifications', sent)
+    return len(delivered), failed
+
+
+def drain(sinks=None, batch_size=None):
+    """
+    Deliver every due message of every shard and return how many were
+    delivered.
+    """
+    sinks = load_sinks() if sinks is None else sinks
+    delivered = 0
+    for alias in shards():
+        while True:
+            count, failed = dispatch_batch(alias, sinks, batch_size)
+            if not count and not failed:
+                break
+            delivered += count
+    return delivered
+
+
+def encode(value):
+    """
+    Encode the dates of a notification for JSON.
+    """
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class LogSink:
+    """
+    Write every notification to the `kanban_app.outbox` logger.
+    """
+
+
+    def send(self, notifications):
+        for notification in notifications:
+            logger.info("Notify %s of %s on task %s", notification['recipient_email'],
+                        notification['event'], notification['task_id'])
+
+
+class FileSink:
+    """
+    Append every notification to a file, one JSON object per line.
+    """
+
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, notifications):
+        with open(self.path, 'a', encoding='utf-8') as file:
+            for notification in notifications:
+                file.write(json.dumps(notification, default=encode) + '\n')
+
+
+class MemorySink:
+    """
+    Keep notifications in `MemorySink.sent`, for tests.
+    """
+
+
+    sent = []
+
+    def send(self, notifications):
+        MemorySink.sent.extend(notifications)
@@ -0,0 +1,188 @@
+"""
+Soft deletion and background purging of boards.
+
+Deleting a board only marks it as deleted, which hides it and
+everything on it from the default managers at once. The rows are then
+removed by a purge that deletes comments and tasks, archived ones
+included, in bounded batches
+of raw DELETE statements, bypassing Django's cascade collector. Each
+batch is its own short transaction, so other writers get the database
+lock in between, and the progress is recorded in `BoardPurge`.
+
+Purges start in a background thread after the deletion commits, or
+are enqueued as `purge_board` jobs with `BOARD_PURGE['USE_JOB_QUEUE']`.
+The `purge_boards` command resumes purges that were interrupted. A
+purge stops with `BoardMoving` while its board is moved to another
+shard, and is resumed there.
+"""
+
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.db import retry_on_locked
+from kanban_app.documents import discard_documents
+from kanban_app.models import Board, Task, Comment, BoardPurge, BoardKey, TaskKey, CommentKey, \
+    ArchivedTask, ArchivedComment
+from kanban_app.sharding import ensure_writable, is_sharded, use_shard
+
+
+PURGE_DEFAULTS = {
+    'BATCH_SIZE': 500,
+    'PAUSE': 0.0,
+    'IN_BACKGROUND': True,
+    'USE_JOB_QUEUE': False,
+}
+
+
+def purge_settings():
+    """
+    Return the purge settings, filled in with defaults.
+    """
+    return {**PURGE_DEFAULTS, **getattr(settings, 'BOARD_PURGE', {})}
+
+
+def soft_delete_board(board):
+    """
+    Mark the board as deleted, drop its document and schedule its purge.
+    """
+    using = board._state.db or DEFAULT_DB_ALIAS
+
+    @retry_on_locked(using=using)
+    def mark():
+        Board.all_objects.using(using).filter(pk=board.pk).update(deleted_at=timezone.now())
+        discard_documents([board.pk], using)
+        BoardPurge.objects.using(using).get_or_create(board_id=board.pk)
+        config = purge_settings()
+        if config['USE_JOB_QUEUE']:
+            transaction.on_commit(lambda: enqueue_purge(board.pk, using), using=using)
+        elif config['IN_BACKGROUND']:
+            transaction.on_commit(lambda: start_purge(board.pk, using), using=using)
+
+    mark()
+
+
+def start_purge(board_id, using):
+    """
+    Purge the board in a background thread.
+    """
+    thread = threading.Thread(
+        target=run_purge, args=(board_id, using), name=f'purge-board-{board_id}', daemon=True)
+    thread.start()
+    return thread
+
+
+def enqueue_purge(board_id, using):
+    """
+    Queue the purge as a low-priority background job.
+    """
+    from jobs_app.queue import enqueue
+
+    return enqueue('purge_board', {'board_id': board_id, 'shard': using},
+                   key=f'purge-board:{board_id}', priority=-10)
+
+
+def run_purge(board_id, using):
+    """
+    Thread target purging one board on its shard.
+    """
+    try:
+        with use_shard(using):
+            purge_board(board_id, using)
+    finally:
+        connections.close_all()
+
+
+DELETE_CHUNK_SIZE = 900
+
+
+def delete_rows(model, ids, using):
+    """
+    Delete rows by primary key without cascades or signals.
+
+    Uses one DELETE statement per `DELETE_CHUNK_SIZE` IDs, which keeps
+    every statement below SQLite's bound parameter limit.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+            chunk = ids[start:start + DELETE_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f'DELETE FROM {table} WHERE id IN ({placeholders})', chunk)
+            deleted += cursor.rowcount
+    return deleted
+
+
+def delete_batch(queryset, model, counter, board_id, using):
+    """
+    Delete up to one batch of the rows selected by `queryset`.
+
+    Returns the IDs deleted, or an empty list when none are left.
+    """
+    @retry_on_locked(using=using)
+    def delete():
+        ensure_writable(board_id, using)
+        ids = list(queryset)
+        if ids:
+            delete_rows(model, ids, using)
+            BoardPurge.objects.using(using).filter(board_id=board_id) \
+                .update(**{counter: F(counter) + len(ids)})
+        return ids
+
+    return delete()
+
+
+def purge_board(board_id, using=DEFAULT_DB_ALIAS, batch_size=None, pause=None, progress=None):
+    """
+    Delete a soft-deleted board's comments, tasks, memberships and the board itself.
+
+    `progress`, if given, is called with the BoardPurge row after every
+    batch. Returns that row once the purge has finished.
+    """
+    config = purge_settings()
+    batch_size = batch_size or config['BATCH_SIZE']
+    pause = config['PAUSE'] if pause is None else pause
+    ensure_writable(board_id, using)
+    purge, _ = BoardPurge.objects.using(using).get_or_create(board_id=board_id)
+    if purge.finished_at is not None:
+        return purge
+
+    steps = [
+        (Comment, 'comments_deleted', CommentKey,
+         Comment.all_objects.using(using).filter(task__board_id=board_id)),
+        (Task, 'tasks_deleted', TaskKey,
+         Task.all_objects.using(using).filter(board_id=board_id)),
+        (ArchivedComment, 'comments_deleted', CommentKey,
+         ArchivedComment.objects.using(using).filter(task__board_id=board_id)),
+        (ArchivedTask, 'tasks_deleted', TaskKey,
+         ArchivedTask.objects.using(using).filter(board_id=board_id)),
+    ]
+    for model, counter, key_model, rows in steps:
+        while ids := delete_batch(
+                rows.values_list('id', flat=True)[:batch_size], model, counter, board_id, using):
+            if is_sharded():
+                key_model.objects.using(DEFAULT_DB_ALIAS).filter(id__in=ids).delete()
+            if progress:
+                progress(BoardPurge.objects.using(using).get(board_id=board_id))
+            if pause:
+                time.sleep(pause)
+
+    @retry_on_locked(using=using)
+    def finish():
+        ensure_writable(board_id, using)
+        Board.members.through.objects.using(using).filter(board_id=board_id).delete()
+        discard_documents([board_id], using)
+        delete_rows(Board, [board_id], using)
+        BoardPurge.objects.using(using).filter(board_id=board_id).update(finished_at=timezone.now())
+
+    finish()
+    if is_sharded():
+        BoardKey.objects.using(DEFAULT_DB_ALIAS).filter(id=board_id).delete()
+    return BoardPurge.objects.using(using).get(board_id=board_id)
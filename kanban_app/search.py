@@ -0,0 +1,95 @@
+"""
+Full-text search over tasks and their comments.
+
+On SQLite the search runs against the `kanban_app_search` FTS5 index,
+which triggers keep in sync with the task and comment tables. Matches
+are ranked by the index's BM25 rank, which weights titles above
+descriptions and comments, and restricted inside the index to boards
+the searching user is a member of. Other database backends fall back to case-insensitive
+substring matching.
+"""
+
+
+import re
+
+from django.db import connections
+from django.db.models import Count, Q
+
+from kanban_app.models import Board, Task
+from kanban_app.sharding import fan_out
+
+
+SEARCH_SQL = """
+    SELECT task_id, MIN(rank) AS score
+    FROM kanban_app_search
+    WHERE kanban_app_search MATCH %s
+    GROUP BY task_id
+    ORDER BY score, task_id
+    LIMIT %s
+"""
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 expression matching every word as a prefix.
+
+    Returns an empty string if the text contains no searchable words.
+    """
+    return ' '.join(f'"{token}"*' for token in TOKEN_PATTERN.findall(query))
+
+
+def scoped_match_expression(query, board_ids):
+    """
+    Restrict the text match to task and comment columns of the given boards.
+
+    Board IDs are indexed as `b<id>` tokens, so the index itself narrows
+    the matches to the user's boards before anything is ranked.
+    """
+    boards = ' OR '.join(f'b{board_id}' for board_id in board_ids)
+    return f'{{title description comment}} : ({match_expression(query)}) AND board : ({boards})'
+
+
+def search_shard(user, query, limit):
+    """
+    Return (score, task_id) pairs for the active shard, best match first.
+    """
+    connection = connections[Task.objects.db]
+    if connection.vendor != 'sqlite':
+        words = TOKEN_PATTERN.findall(query)
+        condition = Q()
+        for word in words:
+            condition &= Q(title__icontains=word) | Q(description__icontains=word) | \
+                Q(comments__content__icontains=word)
+        task_ids = Task.objects.filter(condition, board__members=user) \
+            .order_by('id').values_list('id', flat=True).distinct()[:limit]
+        return [(0.0, task_id) for task_id in task_ids]
+
+    board_ids = list(Board.objects.filter(members=user).values_list('id', flat=True))
+    if not board_ids:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, [scoped_match_expression(query, board_ids), limit])
+        return [(score, task_id) for task_id, score in cursor.fetchall()]
+
+
+def search_tasks(user, query, offset, limit):
+    """
+    Return one page of the user's tasks matching the query, best first.
+
+    Fetches one extra result so callers can tell whether a next page
+    exists. With sharding, every shard is searched and the results are
+    merged by score.
+    """
+    if not match_expression(query):
+        return []
+
+    def search():
+        hits = search_shard(user, query, offset + limit + 1)
+        tasks = Task.objects.select_related('assignee', 'reviewer') \
+            .annotate(comments_total=Count('comments')).in_bulk([task_id for _, task_id in hits])
+        return [(score, task_id, tasks[task_id]) for score, task_id in hits if task_id in tasks]
+
+    hits = sorted(fan_out(search), key=lambda hit: (hit[0], hit[1]))
+    return [task for _, _, task in hits[offset:offset + limit + 1]]
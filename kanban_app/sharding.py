@@ -0,0 +1,335 @@
+"""
+Optional horizontal sharding of boards across several databases.
+
+Each Board lives, together with its tasks and comments, on one of the
+databases listed in `settings.BOARD_SHARDS`. The shard of a new board
+is chosen from its ID. A small directory on the default database maps
+board IDs to shards and task IDs to boards, and hands out globally
+unique IDs for boards, tasks and comments.
+
+Users stay on the default database and are mirrored onto every other
+shard, so foreign keys and membership joins work inside each shard.
+
+While a board is moved to another shard, its directory entry is marked
+as moving and the router refuses writes to it with `BoardMoving`, so
+nothing written during the copy is lost. Writes sent to a shard that no
+longer holds the board are refused the same way.
+
+Without `BOARD_SHARDS`, or with a single shard, everything lives on the
+default database and none of this adds any queries.
+"""
+
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+_current_shard = ContextVar('current_shard', default=None)
+_current_board = ContextVar('current_board', default=None)
+
+
+class BoardMoving(APIException):
+    """
+    Raised for writes to a board that is being moved between shards.
+    """
+
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "The board is being moved, please retry later."
+    default_code = 'board_moving'
+    wait = 5
+
+
+def shards():
+    """
+    Return the configured shard aliases.
+    """
+    return getattr(settings, 'BOARD_SHARDS', None) or [DEFAULT_DB_ALIAS]
+
+
+def is_sharded():
+    """
+    Return True if boards are spread over more than one database.
+    """
+    return len(shards()) > 1
+
+
+def shard_for_new_board(board_id):
+    """
+    Return the shard a board with the given ID is placed on.
+    """
+    aliases = shards()
+    return aliases[board_id % len(aliases)]
+
+
+def shard_for_board(board_id):
+    """
+    Return the shard holding the given board.
+
+    Boards without a directory entry, as well as invalid IDs, resolve
+    to the default database.
+    """
+    from kanban_app.models import BoardKey
+
+    if not is_sharded():
+        return DEFAULT_DB_ALIAS
+    try:
+        board_id = int(board_id)
+    except (TypeError, ValueError):
+        return DEFAULT_DB_ALIAS
+    shard = BoardKey.objects.using(DEFAULT_DB_ALIAS).filter(
+        id=board_id).values_list('shard', flat=True).first()
+    return shard or DEFAULT_DB_ALIAS
+
+
+def board_for_task(task_id):
+    """
+    Return the board ID of the given task from the shard directory.
+
+    Returns None without sharding, and for unknown or invalid IDs.
+    """
+    from kanban_app.models import TaskKey
+
+    if not is_sharded():
+        return None
+    try:
+        task_id = int(task_id)
+    except (TypeError, ValueError):
+        return None
+    return TaskKey.objects.using(DEFAULT_DB_ALIAS).filter(
+        id=task_id).values_list('board_id', flat=True).first()
+
+
+def shard_for_task(task_id):
+    """
+    Return the shard holding the given task.
+    """
+    if not is_sharded():
+        return DEFAULT_DB_ALIAS
+    return shard_for_board(board_for_task(task_id))
+
+
+def moving_boards():
+    """
+    Return the IDs of the boards that are being moved between shards.
+    """
+    from kanban_app.models import BoardKey
+
+    if not is_sharded():
+        return []
+    return list(BoardKey.objects.using(DEFAULT_DB_ALIAS).filter(
+        moving=True).values_list('id', flat=True))
+
+
+def ensure_writable(board_id, using):
+    """
+    Raise `BoardMoving` unless the board may be written on shard `using`.
+
+    Boards being moved are read-only, and so are boards whose directory
+    entry names another shard. Boards without an entry are writable.
+    """
+    from kanban_app.models import BoardKey
+
+    if not is_sharded():
+        return
+    try:
+        board_id = int(board_id)
+    except (TypeError, ValueError):
+        return
+    key = BoardKey.objects.using(DEFAULT_DB_ALIAS).filter(
+        id=board_id).values_list('shard', 'moving').first()
+    if key is None:
+        return
+    shard, moving = key
+    if moving or (shard and shard != using):
+        raise BoardMoving()
+
+
+def place_new_board():
+    """
+    Reserve a board ID and return it together with its shard.
+    """
+    from kanban_app.models import BoardKey
+
+    key = BoardKey.objects.using(DEFAULT_DB_ALIAS).create()
+    key.shard = shard_for_new_board(key.id)
+    key.save(using=DEFAULT_DB_ALIAS, update_fields=['shard'])
+    return key.id, key.shard
+
+
+def current_shard():
+    """
+    Return the shard activated for the current request, if any.
+    """
+    return _current_shard.get()
+
+
+def current_board():
+    """
+    Return the ID of the board the current request works on, if known.
+    """
+    return _current_board.get()
+
+
+def active_database():
+    """
+    Return the database the current request's Kanban writes go to.
+    """
+    return _current_shard.get() or DEFAULT_DB_ALIAS
+
+
+def activate_shard(alias, board_id=None):
+    """
+    Route queries without an explicit database to the given shard.
+
+    `board_id` names the board whose writes the router checks when a
+    write does not reveal its board, e.g. a queryset update.
+    """
+    _current_shard.set(alias)
+    _current_board.set(board_id)
+
+
+@contextmanager
+def use_shard(alias, board_id=None):
+    """
+    Route queries inside the block to the given shard.
+    """
+    token = _current_shard.set(alias)
+    board_token = _current_board.set(board_id)
+    try:
+        yield alias
+    finally:
+        _current_board.reset(board_token)
+        _current_shard.reset(token)
+
+
+def fan_out(func):
+    """
+    Call `func` once per shard with that shard active and concatenate
+    the returned lists.
+    """
+    results = []
+    for alias in shards():
+        with use_shard(alias):
+            results.extend(func())
+    return results
+
+
+def placement_of(instance):
+    """
+    Return the shard of an unsaved Kanban object, derived from its board.
+    """
+    from kanban_app.models import Board, Task, Comment
+
+    if isinstance(instance, Board) and instance.pk is not None:
+        return shard_for_board(instance.pk)
+    if isinstance(instance, Task) and instance.board_id is not None:
+        return shard_for_board(instance.board_id)
+    if isinstance(instance, Comment) and instance.task_id is not None:
+        return shard_for_task(instance.task_id)
+    return None
+
+
+def board_of(instance):
+    """
+    Return the board ID of a Kanban object, or None if it is not known.
+    """
+    from kanban_app.models import Board, Comment
+
+    if isinstance(instance, Board):
+        return instance.pk
+    if isinstance(instance, Comment):
+        return board_for_task(instance.task_id)
+    return getattr(instance, 'board_id', None)
+
+
+class ShardRouter:
+    """
+    Route Kanban models to the shard of their board.
+
+    The shard is taken from the instance hint when Django provides one,
+    otherwise from the shard activated for the current request. Users
+    are read from the shard of a related Kanban object and from the
+    default database otherwise; directory tables live on the default
+    database only.
+
+    Writes to boards that are being moved, or that live on another
+    shard than the one written to, raise `BoardMoving`. The check costs
+    one directory query per write and only runs when boards are sharded.
+    Board documents are exempt: a move does not copy them, and reads
+    keep building them.
+    """
+
+
+    directory_models = {'boardkey', 'taskkey', 'commentkey'}
+    derived_models = {'boarddocument', 'boarddocumententry', 'boarddocumentvariant'}
+
+    def is_kanban(self, model):
+        """
+        Return True for Kanban models stored on the shards.
+        """
+        return model._meta.app_label == 'kanban_app' and \
+            model._meta.model_name not in self.directory_models
+
+    def route(self, model, hints):
+        """
+        Return the shard for the model, or None to use the default database.
+        """
+        if model._meta.model_name in self.directory_models:
+            return DEFAULT_DB_ALIAS
+
+        instance = hints.get('instance')
+        related_to_kanban = instance is not None and self.is_kanban(instance.__class__)
+        if related_to_kanban and instance._state.db:
+            return instance._state.db
+
+        if self.is_kanban(model):
+            if related_to_kanban:
+                placement = placement_of(instance)
+                if placement:
+                    return placement
+            return current_shard()
+        return None
+
+    def db_for_read(self, model, **hints):
+        """
+        Read Kanban models from their shard.
+        """
+        return self.route(model, hints)
+
+    def db_for_write(self, model, **hints):
+        """
+        Write Kanban models to their shard and users to the default database.
+        """
+        if model is User:
+            return DEFAULT_DB_ALIAS
+        alias = self.route(model, hints)
+        if self.is_kanban(model) and model._meta.model_name not in self.derived_models and is_sharded():
+            instance = hints.get('instance')
+            board_id = None
+            if instance is not None and self.is_kanban(instance.__class__):
+                board_id = board_of(instance)
+            ensure_writable(board_id or current_board(), alias or DEFAULT_DB_ALIAS)
+        return alias
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """
+        Allow relations within one shard and between Kanban objects and users.
+        """
+        if obj1._state.db == obj2._state.db:
+            return True
+        return not (self.is_kanban(obj1.__class__) and self.is_kanban(obj2.__class__))
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """
+        Keep the directory on the default database and migrate the rest everywhere.
+        """
+        if app_label == 'kanban_app' and model_name in self.directory_models:
+            return db == DEFAULT_DB_ALIAS
+        return db in shards() or db == DEFAULT_DB_ALIAS
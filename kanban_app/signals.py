@@ -0,0 +1,175 @@
+"""
+Signal handlers for the Kanban application.
+
+When boards are sharded, these handlers reserve globally unique IDs
+for new boards, tasks and comments and mirror users from the default
+database onto every other shard. Tasks are stamped with the time they
+were completed, which decides when they are archived. Task, comment,
+membership, board and user changes are patched into the materialized
+board documents.
+"""
+
+
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import m2m_changed, pre_delete, pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from kanban_app import documents
+from kanban_app.models import Board, Task, Comment, BoardKey, TaskKey, CommentKey
+from kanban_app.sharding import is_sharded, shards
+
+
+@receiver(pre_save, sender=Board)
+@receiver(pre_save, sender=Task)
+@receiver(pre_save, sender=Comment)
+def reserve_sharded_id(sender, instance, raw, using, **kwargs):
+    """
+    Give a new Kanban object an ID from the shard directory.
+    """
+    if raw or instance.pk is not None or not is_sharded():
+        return
+    if sender is Board:
+        key = BoardKey.objects.using(DEFAULT_DB_ALIAS).create(shard=using)
+    elif sender is Task:
+        key = TaskKey.objects.using(DEFAULT_DB_ALIAS).create(board_id=instance.board_id)
+    else:
+        key = CommentKey.objects.using(DEFAULT_DB_ALIAS).create(task_id=instance.task_id)
+    instance.pk = key.pk
+
+
+@receiver(pre_save, sender=Task)
+def stamp_completion(sender, instance, raw, **kwargs):
+    """
+    Record when a task became done, and forget it when it is reopened.
+    """
+    if raw:
+        return
+    if instance.status == Task.Status.DONE:
+        if instance.completed_at is None:
+            instance.completed_at = timezone.now()
+    else:
+        instance.completed_at = None
+
+
+def mirror_user(user, alias):
+    """
+    Copy a user row onto the given shard, inserting or updating it.
+    """
+    values = {field.attname: getattr(user, field.attname) for field in User._meta.concrete_fields}
+    User(**values).save(using=alias)
+
+
+@receiver(post_save, sender=User)
+def mirror_saved_user(sender, instance, raw, using, **kwargs):
+    """
+    Mirror a user saved on the default database onto every other shard.
+    """
+    if raw or using != DEFAULT_DB_ALIAS or not is_sharded():
+        return
+    for alias in shards():
+        if alias != DEFAULT_DB_ALIAS:
+            mirror_user(instance, alias)
+
+
+@receiver(post_delete, sender=User)
+def mirror_deleted_user(sender, instance, using, **kwargs):
+    """
+    Delete a user's mirrors, cascading to their boards and comments on each shard.
+    """
+    if using != DEFAULT_DB_ALIAS or not is_sharded():
+        return
+    for alias in shards():
+        if alias != DEFAULT_DB_ALIAS:
+            User.objects.using(alias).filter(pk=instance.pk).delete()
+
+
+def is_cascade(origin, instance):
+    """
+    Return True if `instance` is deleted as part of deleting a board or task.
+
+    Their own handlers take care of the document, so the cascaded rows
+    need not patch it one by one.
+    """
+    return origin is not instance and isinstance(origin, (Board, Task))
+
+
+@receiver(post_save, sender=Task)
+def patch_saved_task(sender, instance, raw, using, **kwargs):
+    """
+    Refresh the task's entry in its board document.
+    """
+    if not raw:
+        documents.refresh_task(instance.id, using, board_id=instance.board_id)
+
+
+@receiver(post_delete, sender=Task)
+def patch_deleted_task(sender, instance, using, origin=None, **kwargs):
+    """
+    Remove the task's entry from its board document.
+    """
+    if not is_cascade(origin, instance):
+        documents.remove_tasks(instance.board_id, [instance.id], using)
+
+
+@receiver(post_save, sender=Comment)
+def patch_saved_comment(sender, instance, created, raw, using, **kwargs):
+    """
+    Refresh the comment count of a task that got a new comment.
+    """
+    if created and not raw and instance.task_id is not None:
+        documents.refresh_task(instance.task_id, using)
+
+
+@receiver(post_delete, sender=Comment)
+def patch_deleted_comment(sender, instance, using, origin=None, **kwargs):
+    """
+    Refresh the comment count of a task that lost a comment.
+    """
+    if instance.task_id is not None and not is_cascade(origin, instance):
+        documents.refresh_task(instance.task_id, using)
+
+
+@receiver(post_save, sender=Board)
+def patch_saved_board(sender, instance, created, raw, using, **kwargs):
+    """
+    Refresh the title and owner of the board's document.
+    """
+    if not created and not raw:
+        documents.refresh_head(instance.id, using)
+
+
+@receiver(m2m_changed, sender=Board.members.through)
+def patch_members(sender, instance, action, reverse, pk_set, using, **kwargs):
+    """
+    Refresh the member lists of the boards whose members changed.
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        documents.refresh_head(instance.id, using)
+    elif action == 'post_clear':
+        documents.discard_user_documents(instance.id, using)
+    else:
+        for board_id in pk_set or ():
+            documents.refresh_head(board_id, using)
+
+
+@receiver(post_save, sender=User)
+def discard_renamed_user_documents(sender, instance, created, raw, using, update_fields, **kwargs):
+    """
+    Drop the documents showing a user whose name or email may have changed.
+    """
+    if created or raw:
+        return
+    if update_fields is None or {'username', 'email'} & set(update_fields):
+        documents.discard_user_documents(instance.id, using)
+
+
+@receiver(pre_delete, sender=User)
+def discard_deleted_user_documents(sender, instance, using, **kwargs):
+    """
+    Drop the documents of a user's boards before the user disappears from them.
+    """
+    documents.discard_user_documents(instance.id, using)
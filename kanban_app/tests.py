@@ -1,3 +1,1399 @@
-from django.test import TestCase
+"""
+Tests for the Kanban application.
+"""
 
-# Create your tests here.
+
+import base64
+import gzip
+import json
+import os
+import tempfile
+import threading
+from contextlib import ExitStack
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.compression import brotli
+from core.metrics import metrics
+from core.middleware import PIN_COOKIE, LoadSheddingMiddleware, PrimaryPinningMiddleware
+from core.shedding import EndpointLoad
+from core.throttling import WindowStore, reset_window_store
+from core.warmup import WARM_UP_STEPS, warm_up, warm_up_at_boot
+from core.renderers import FastJSONRenderer, msgpack
+from core.routers import ReplicaRouter, is_pinned, unpin
+from kanban_app.models import Board, Task, Comment, BoardDocument, BoardDocumentVariant, BoardPurge, \
+    OutboxMessage, ArchivedTask, ArchivedComment, BoardKey
+from kanban_app.api.rows import task_data, task_rows
+from kanban_app.api.serializers import BoardDetailSerializer, TaskSerializer
+from kanban_app.api.views import BoardViewSet
+from kanban_app.archive import archive_tasks, restore_task
+from kanban_app.documents import build_data, compressed_body, discard_documents, get_document, render
+from kanban_app.outbox import FileSink, MemorySink, drain
+from kanban_app.purge import purge_board, soft_delete_board
+from kanban_app.sharding import BoardMoving, fan_out, is_sharded, shard_for_board, shards, use_shard
+
+
+class ConcurrentWriteStressTest(TransactionTestCase):
+    """
+    Hammer the comment and task endpoints from many threads at once.
+
+    Run with DJANGO_SETTINGS_MODULE=core.settings_production to check
+    that WAL mode, the busy timeout and lock retries keep every write
+    from failing with "database is locked".
+    """
+
+
+    databases = '__all__'
+    threads = 8
+    writes_per_thread = 25
+
+    def setUp(self):
+        if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+            self.skipTest("Requires a file-based SQLite database, e.g. core.settings_production.")
+        self.users = [
+            User.objects.create_user(username=f"user{index}", email=f"user{index}@example.com")
+            for index in range(self.threads)
+        ]
+        self.board = Board.objects.create(title="Stress", owner=self.users[0])
+        self.board.members.set(self.users)
+        self.task = Task.objects.create(
+            board=self.board, title="Stress", description="", due_date=date(2025, 1, 1)
+        )
+
+    def test_journal_mode_is_wal(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+
+    def test_concurrent_comment_and_task_writes(self):
+        failures = []
+        barrier = threading.Barrier(self.threads)
+
+        def worker(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait()
+            try:
+                for index in range(self.writes_per_thread):
+                    response = client.post(
+                        f'/api/tasks/{self.task.id}/comments/', {'content': f"comment {index}"}
+                    )
+                    if response.status_code != 201:
+                        failures.append(response.status_code)
+                    response = client.patch(
+                        f'/api/tasks/{self.task.id}/', {'title': f"{user.username} {index}"}
+                    )
+                    if response.status_code != 200:
+                        failures.append(response.status_code)
+            except Exception as exc:
+                failures.append(repr(exc))
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(user,)) for user in self.users]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(failures, [])
+        self.assertEqual(
+            Comment.objects.filter(task=self.task).count(),
+            self.threads * self.writes_per_thread
+        )
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_ROUTED_APPS=['kanban_app', 'auth'])
+class ReplicaRouterTest(SimpleTestCase):
+    """
+    Check read/write routing and primary pinning of the replica router.
+    """
+
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        unpin()
+
+    def tearDown(self):
+        unpin()
+
+    def test_reads_of_routed_apps_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(Task), 'replica')
+        self.assertEqual(self.router.db_for_read(User), 'replica')
+
+    def test_reads_of_other_apps_go_to_primary(self):
+        self.assertEqual(self.router.db_for_read(Token), 'default')
+
+    def test_write_pins_following_reads_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Task), 'default')
+        self.assertEqual(self.router.db_for_read(Task), 'default')
+
+    def test_unsafe_request_is_pinned_from_the_start(self):
+        seen = []
+        middleware = PrimaryPinningMiddleware(
+            lambda request: seen.append(self.router.db_for_read(Task)) or HttpResponse()
+        )
+        response = middleware(RequestFactory().post('/api/tasks/'))
+        self.assertEqual(seen, ['default'])
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertFalse(is_pinned())
+
+    def test_pin_cookie_keeps_reads_on_primary(self):
+        seen = []
+        middleware = PrimaryPinningMiddleware(
+            lambda request: seen.append(self.router.db_for_read(Task)) or HttpResponse()
+        )
+        middleware(RequestFactory().get('/api/boards/'))
+        request = RequestFactory().get('/api/boards/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        middleware(request)
+        self.assertEqual(seen, ['replica', 'default'])
+
+
+
+class ReplicaPinningTest(TestCase):
+    """
+    Check primary pinning against real primary and replica databases.
+
+    Run with DJANGO_SETTINGS_MODULE=core.settings_replica.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        if not getattr(settings, 'DATABASE_REPLICAS', None):
+            self.skipTest("Requires DATABASE_REPLICAS, e.g. core.settings_replica.")
+        owner = User.objects.create_user(username="Owner", email="owner@example.com")
+        self.board = Board.objects.create(title="Replicated", owner=owner)
+        unpin()
+
+    def tearDown(self):
+        unpin()
+
+    def test_reads_after_a_write_in_the_same_request_go_to_the_primary(self):
+        seen = []
+
+        def view(request):
+            seen.append(Board.objects.get(id=self.board.id)._state.db)
+            Board.objects.filter(id=self.board.id).update(title="Renamed")
+            board = Board.objects.get(id=self.board.id)
+            seen.extend([board._state.db, board.title])
+            return HttpResponse()
+
+        response = PrimaryPinningMiddleware(view)(RequestFactory().get(f'/api/boards/{self.board.id}/'))
+        self.assertEqual(seen, ['replica', 'default', "Renamed"])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertFalse(is_pinned())
+
+class ShardingTest(TransactionTestCase):
+    """
+    Exercise the API with boards spread over several SQLite databases.
+
+    Run with DJANGO_SETTINGS_MODULE=core.settings_sharded.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        if not is_sharded():
+            self.skipTest("Requires BOARD_SHARDS, e.g. core.settings_sharded.")
+        self.user = User.objects.create_user(username="owner", email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_board(self, title):
+        response = self.client.post('/api/boards/', {'title': title, 'members': [self.user.id]})
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def create_task(self, board_id):
+        response = self.client.post('/api/tasks/', {
+            'board': board_id, 'title': "Task", 'description': "Sharded", 'status': 'to-do',
+            'priority': 'high', 'assignee_id': self.user.id, 'due_date': '2025-01-01',
+        })
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def test_boards_tasks_and_comments_live_on_the_board_shard(self):
+        board_ids = [self.create_board(f"Board {index}") for index in range(len(shards()))]
+        self.assertEqual(
+            {shard_for_board(board_id) for board_id in board_ids}, set(shards())
+        )
+
+        task_ids = [self.create_task(board_id) for board_id in board_ids]
+        for board_id, task_id in zip(board_ids, task_ids):
+            shard = shard_for_board(board_id)
+            self.assertTrue(Task.objects.using(shard).filter(id=task_id).exists())
+            response = self.client.post(f'/api/tasks/{task_id}/comments/', {'content': "Hi"})
+            self.assertEqual(response.status_code, 201)
+            self.assertTrue(Comment.objects.using(shard).filter(task_id=task_id).exists())
+            response = self.client.patch(f'/api/tasks/{task_id}/', {'title': "Renamed"})
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(self.client.get('/api/boards/').data), len(board_ids))
+        assigned = self.client.get('/api/tasks/assigned-to-me/').data
+        self.assertEqual(sorted(task['id'] for task in assigned), sorted(task_ids))
+
+    def test_rebalance_moves_a_board_with_its_tasks(self):
+        board_id = self.create_board("Movable")
+        task_id = self.create_task(board_id)
+        source = shard_for_board(board_id)
+        target = next(alias for alias in shards() if alias != source)
+        self.assertEqual(self.client.get(f'/api/boards/{board_id}/')['ETag'], f'"{board_id}-1"')
+
+        call_command('rebalance_shards', board=board_id, target=target, stdout=StringIO())
+
+        self.assertEqual(shard_for_board(board_id), target)
+        self.assertFalse(Board.objects.using(source).filter(id=board_id).exists())
+        self.assertFalse(BoardDocument.objects.using(source).filter(board_id=board_id).exists())
+        response = self.client.get(f'/api/boards/{board_id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], f'"{board_id}-2"')
+        self.assertEqual([task['id'] for task in response.json()['tasks']], [task_id])
+
+    def test_rebalance_moves_archived_tasks(self):
+        board_id = self.create_board("Archived")
+        task_id = self.create_task(board_id)
+        self.client.post(f'/api/tasks/{task_id}/comments/', {'content': "Done"})
+        self.client.patch(f'/api/tasks/{task_id}/', {'status': 'done'})
+        self.assertEqual(archive_tasks(after_days=0), 1)
+        source = shard_for_board(board_id)
+        target = next(alias for alias in shards() if alias != source)
+
+        call_command('rebalance_shards', board=board_id, target=target, stdout=StringIO())
+
+        self.assertFalse(ArchivedTask.objects.using(source).exists())
+        self.assertFalse(ArchivedComment.objects.using(source).exists())
+        archived = self.client.get(f'/api/boards/{board_id}/archive/').json()['results']
+        self.assertEqual([(task['id'], task['comments_count']) for task in archived], [(task_id, 1)])
+        response = self.client.post(f'/api/boards/{board_id}/archive/{task_id}/restore/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Comment.objects.using(target).filter(task_id=task_id).exists())
+
+    def test_writes_to_a_moving_board_are_refused(self):
+        board_id = self.create_board("Moving")
+        task_id = self.create_task(board_id)
+        BoardKey.objects.filter(id=board_id).update(moving=True)
+
+        response = self.client.patch(f'/api/tasks/{task_id}/', {'title': "Lost"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+        self.assertEqual(self.client.post(f'/api/tasks/{task_id}/comments/', {'content': "Hi"}).status_code, 503)
+        self.assertEqual(self.client.delete(f'/api/boards/{board_id}/').status_code, 503)
+        self.assertEqual(self.client.get(f'/api/boards/{board_id}/').status_code, 200)
+        task = Task.objects.using(shard_for_board(board_id)).get(id=task_id)
+        with self.assertRaises(BoardMoving):
+            task.save()
+
+        BoardKey.objects.filter(id=board_id).update(moving=False)
+        self.assertEqual(self.client.patch(f'/api/tasks/{task_id}/', {'title': "Kept"}).status_code, 200)
+        other = next(alias for alias in shards() if alias != shard_for_board(board_id))
+        with use_shard(other, board_id), self.assertRaises(BoardMoving):
+            Task.objects.filter(id=task_id).update(title="Stale")
+
+    def test_rebalance_deletes_the_source_without_signals(self):
+        board_id = self.create_board("Quiet")
+        task_id = self.create_task(board_id)
+        self.client.post(f'/api/tasks/{task_id}/comments/', {'content': "Hi"})
+        source = shard_for_board(board_id)
+        target = next(alias for alias in shards() if alias != source)
+
+        with mock.patch('kanban_app.documents.remove_tasks') as removed, \
+                mock.patch('kanban_app.documents.refresh_task') as refreshed:
+            call_command('rebalance_shards', board=board_id, target=target, stdout=StringIO())
+        removed.assert_not_called()
+        refreshed.assert_not_called()
+        self.assertFalse(BoardKey.objects.get(id=board_id).moving)
+        self.assertFalse(Task.all_objects.using(source).exists())
+        self.assertFalse(Comment.all_objects.using(source).exists())
+        self.assertEqual(Comment.objects.using(target).filter(task_id=task_id).count(), 1)
+
+    def test_task_bodies_that_are_not_objects_are_rejected(self):
+        response = self.client.post('/api/tasks/', [{'board': 1}], format='json')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(BOARD_PURGE={'IN_BACKGROUND': False})
+    def test_rebalance_moves_a_deleted_board_waiting_for_its_purge(self):
+        board_id = self.create_board("Deleted")
+        task_id = self.create_task(board_id)
+        source = shard_for_board(board_id)
+        target = next(alias for alias in shards() if alias != source)
+        self.assertEqual(self.client.delete(f'/api/boards/{board_id}/').status_code, 204)
+
+        call_command('rebalance_shards', board=board_id, target=target, stdout=StringIO())
+
+        self.assertEqual(shard_for_board(board_id), target)
+        self.assertFalse(Board.all_objects.using(source).filter(id=board_id).exists())
+        self.assertFalse(BoardPurge.objects.using(source).filter(board_id=board_id).exists())
+        self.assertFalse(OutboxMessage.objects.using(source).exists())
+        self.assertIsNotNone(Board.all_objects.using(target).get(id=board_id).deleted_at)
+        self.assertTrue(Task.all_objects.using(target).filter(id=task_id).exists())
+        self.assertEqual(
+            list(OutboxMessage.objects.using(target).values_list('payload__task_id', flat=True)), [task_id])
+
+        purge = purge_board(board_id, target)
+        self.assertEqual(purge.tasks_deleted, 1)
+        self.assertFalse(Board.all_objects.using(target).filter(id=board_id).exists())
+
+
+class TaskSearchTest(TestCase):
+    """
+    Search ranks matches, stays on the user's boards and follows task changes.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="Owner", email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.board = Board.objects.create(title="Search", owner=self.owner)
+        self.board.members.add(self.owner)
+        self.in_description = self.create_task(self.board, "Plain", "Fix the deployment pipeline")
+        self.in_title = self.create_task(self.board, "Deployment checklist", "Steps")
+        other = User.objects.create_user(username="Other", email="other@example.com")
+        hidden = Board.objects.create(title="Hidden", owner=other)
+        hidden.members.add(other)
+        self.create_task(hidden, "Deployment secrets", "Not shared")
+
+    def create_task(self, board, title, description):
+        return Task.objects.create(board=board, title=title, description=description,
+                                   assignee=self.owner, due_date=date(2025, 1, 1))
+
+    def search(self, query, **params):
+        response = self.client.get('/api/tasks/search/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_title_matches_rank_first_and_other_boards_are_hidden(self):
+        results = self.search("deploy")['results']
+        self.assertEqual([task['id'] for task in results], [self.in_title.id, self.in_description.id])
+        self.assertEqual(self.client.get('/api/tasks/search/').status_code, 400)
+
+    def test_index_follows_updates_deletes_and_comments(self):
+        self.in_title.title = "Release checklist"
+        self.in_title.save()
+        self.assertEqual([task['id'] for task in self.search("checklist")['results']], [self.in_title.id])
+        self.assertEqual([task['id'] for task in self.search("deployment")['results']],
+                         [self.in_description.id])
+
+        Comment.objects.create(task=self.in_title, author=self.owner, content="Rollback plan",
+                               created_at=date(2025, 1, 1))
+        results = self.search("rollback")['results']
+        self.assertEqual([(task['id'], task['comments_count']) for task in results], [(self.in_title.id, 1)])
+
+        self.in_description.delete()
+        self.assertEqual(self.search("deployment")['results'], [])
+
+    def test_pages_link_to_each_other(self):
+        first = self.search("deploy", page_size=1)
+        self.assertEqual([task['id'] for task in first['results']], [self.in_title.id])
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([task['id'] for task in second['results']], [self.in_description.id])
+        self.assertIsNone(second['next'])
+        self.assertIsNotNone(second['previous'])
+
+    def test_query_count_does_not_grow_with_results(self):
+        def count_queries():
+            with ExitStack() as stack:
+                captured = [stack.enter_context(CaptureQueriesContext(connections[alias]))
+                            for alias in connections]
+                self.search("deploy")
+            return sum(len(queries) for queries in captured)
+
+        few = count_queries()
+        for index in range(5):
+            task = self.create_task(self.board, f"Deployment {index}", "More")
+            Comment.objects.create(task=task, author=self.owner, content="Hi", created_at=date(2025, 1, 1))
+        self.assertEqual(count_queries(), few)
+
+
+class BoardTaskListTest(TestCase):
+    """
+    The board task listing filters and orders in SQL and pages with stable cursors.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="Owner", email="owner@example.com")
+        self.other = User.objects.create_user(username="Other", email="other@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.board = Board.objects.create(title="Listing", owner=self.owner)
+        self.board.members.add(self.owner, self.other)
+        self.url = f'/api/boards/{self.board.id}/tasks/'
+        rows = [
+            ('low', 'to-do', date(2025, 1, 3), self.owner),
+            ('high', 'review', date(2025, 1, 5), self.other),
+            ('medium', 'to-do', date(2025, 1, 1), self.owner),
+            ('high', 'to-do', date(2025, 1, 2), None),
+            ('high', 'done', date(2025, 1, 2), self.owner),
+        ]
+        self.tasks = [
+            Task.objects.create(board=self.board, title=f"Task {index}", description="Listed",
+                                priority=priority, status=status, due_date=due_date, assignee=assignee)
+            for index, (priority, status, due_date, assignee) in enumerate(rows)
+        ]
+
+    def ids(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [task['id'] for task in response.json()['results']]
+
+    def test_default_order_is_priority_then_due_date(self):
+        expected = [self.tasks[index].id for index in (3, 4, 1, 2, 0)]
+        self.assertEqual(self.ids(), expected)
+        self.assertEqual(self.ids(ordering='status,-id'), [self.tasks[index].id for index in (3, 2, 0, 1, 4)])
+        self.assertEqual(self.client.get(self.url, {'ordering': 'title'}).status_code, 400)
+
+    def test_filters_combine(self):
+        self.assertEqual(self.ids(status='to-do', assignee=self.owner.id),
+                         [self.tasks[2].id, self.tasks[0].id])
+        self.assertEqual(self.ids(priority='high', due_from='2025-01-03'), [self.tasks[1].id])
+        self.assertEqual(self.ids(due_from='2025-01-02', due_to='2025-01-02'),
+                         [self.tasks[3].id, self.tasks[4].id])
+        self.assertEqual(self.client.get(self.url, {'due_from': '2025-02-01', 'due_to': '2025-01-01'})
+                         .status_code, 400)
+
+    def test_cursor_pages_cover_every_task_once(self):
+        seen = []
+        url = f'{self.url}?page_size=2'
+        while url:
+            page = self.client.get(url).json()
+            seen.extend(task['id'] for task in page['results'])
+            url = page['next']
+        self.assertEqual(seen, self.ids())
+
+    def test_malformed_cursors_are_not_found(self):
+        def cursor(value):
+            return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+        for bad in ['not base64!', cursor({'id': 1}), cursor([2, 'tomorrow', 1]),
+                    cursor([2, '2025-01-01']), cursor([2, '2025-01-01', None]),
+                    cursor([2, '2025-01-01', 'one']), cursor([[2], '2025-01-01', 1])]:
+            response = self.client.get(self.url, {'cursor': bad})
+            self.assertEqual(response.status_code, 404, bad)
+
+
+class TaskCalendarTest(TestCase):
+    """
+    Calendar and overdue listings group the user's tasks by due date.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="Owner", email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.board = Board.objects.create(title="Calendar", owner=self.owner)
+        self.board.members.add(self.owner)
+        other = User.objects.create_user(username="Other", email="other@example.com")
+        self.hidden = Board.objects.create(title="Hidden", owner=other)
+        self.hidden.members.add(other)
+
+    def create_task(self, due_date, board=None, status='to-do'):
+        return Task.objects.create(board=board or self.board, title="Due", description="Calendar",
+                                   status=status, due_date=due_date).id
+
+    def test_calendar_groups_tasks_by_day(self):
+        first = self.create_task(date(2025, 3, 1))
+        second = self.create_task(date(2025, 3, 1), status='done')
+        third = self.create_task(date(2025, 3, 4))
+        self.create_task(date(2025, 4, 1))
+        self.create_task(date(2025, 3, 1), board=self.hidden)
+
+        response = self.client.get('/api/tasks/calendar/', {'from': '2025-03-01', 'to': '2025-03-31'})
+        self.assertEqual(response.status_code, 200)
+        days = response.json()
+        self.assertEqual([(day['date'], day['count']) for day in days], [('2025-03-01', 2), ('2025-03-04', 1)])
+        self.assertEqual([[task['id'] for task in day['tasks']] for day in days], [[first, second], [third]])
+        self.assertEqual(days[0]['tasks'][0]['board'], self.board.id)
+
+    def test_calendar_range_is_validated(self):
+        for params in [{'from': '2025-03-01'}, {'from': '2025-03-01', 'to': 'soon'},
+                       {'from': '2025-03-02', 'to': '2025-03-01'}, {'from': '2025-01-01', 'to': '2026-01-02'}]:
+            self.assertEqual(self.client.get('/api/tasks/calendar/', params).status_code, 400, params)
+        response = self.client.get('/api/tasks/calendar/', {'from': '2025-01-01', 'to': '2026-01-01'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_overdue_skips_done_future_and_foreign_tasks(self):
+        today = timezone.localdate()
+        oldest = self.create_task(today - timedelta(days=10))
+        recent = self.create_task(today - timedelta(days=1), status='review')
+        self.create_task(today - timedelta(days=1), status='done')
+        self.create_task(today)
+        self.create_task(today - timedelta(days=3), board=self.hidden)
+
+        days = self.client.get('/api/tasks/overdue/').json()
+        self.assertEqual([[task['id'] for task in day['tasks']] for day in days], [[oldest], [recent]])
+        self.assertEqual([day['date'] for day in days],
+                         [(today - timedelta(days=10)).isoformat(), (today - timedelta(days=1)).isoformat()])
+
+
+class BoardMembersTest(TestCase):
+    """
+    Membership changes are applied as diffs whose cost does not grow with the board.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="Owner", email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.board = Board.objects.create(title="Members", owner=self.owner)
+        self.board.members.add(self.owner)
+
+    def add_members(self, count, offset=0):
+        users = User.objects.bulk_create(
+            User(username=f"Member {index}", email=f"member{index}@example.com")
+            for index in range(offset, offset + count)
+        )
+        self.board.members.add(*users)
+
+    def post_new_member(self, index):
+        user = User.objects.create_user(username=f"New {index}", email=f"new{index}@example.com")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                f'/api/boards/{self.board.id}/members/', {'members': [user.email]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_add_cost_is_independent_of_board_size(self):
+        self.add_members(5)
+        small = self.post_new_member(1)
+        self.add_members(500, offset=5)
+        self.assertEqual(self.post_new_member(2), small)
+
+    def test_only_the_change_is_returned(self):
+        member = User.objects.create_user(username="Member", email="Member@Example.com")
+        new = User.objects.create_user(username="New", email="new@example.com")
+        self.board.members.add(member)
+        url = f'/api/boards/{self.board.id}/members/'
+
+        response = self.client.post(url, {'members': [member.id, 'NEW@example.com']}, format='json')
+        self.assertEqual(response.json(), {'added': [{'id': new.id, 'email': new.email, 'fullname': 'New'}]})
+
+        response = self.client.delete(url, {'members': ['member@example.com', new.id]}, format='json')
+        self.assertEqual([user['id'] for user in response.json()['removed']], [member.id, new.id])
+        self.assertEqual(list(self.board.members.values_list('id', flat=True)), [self.owner.id])
+
+    def test_unknown_users_and_owner_removal_are_rejected(self):
+        url = f'/api/boards/{self.board.id}/members/'
+        response = self.client.post(url, {'members': ['nobody@example.com']}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.delete(url, {'members': [self.owner.id]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_ascii_digits_are_not_user_ids(self):
+        url = f'/api/boards/{self.board.id}/members/'
+        arabic_indic = ''.join(chr(0x660 + int(digit)) for digit in str(self.owner.id))
+        for reference in [arabic_indic, '\u00b2']:
+            response = self.client.post(url, {'members': [reference]}, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(reference, str(response.json()))
+
+
+class BoardPurgeTest(TestCase):
+    """
+    Deleting a board hides it at once and leaves the rows to a batched purge.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="Owner", email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.board = Board.objects.create(title="Doomed", owner=self.owner)
+        self.board.members.add(self.owner)
+        tasks = [
+            Task.objects.create(board=self.board, title=f"Task {index}", description="Purged",
+                                assignee=self.owner, due_date=date(2025, 1, 1))
+            for index in range(5)
+        ]
+        for task in tasks:
+            Comment.objects.create(task=task, author=self.owner, content="Bye", created_at=date(2025, 1, 1))
+
+    def test_deleted_board_is_hidden_until_purged(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.delete(f'/api/boards/{self.board.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertEqual(self.client.get('/api/boards/').json(), [])
+        self.assertEqual(self.client.get(f'/api/boards/{self.board.id}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/tasks/assigned-to-me/').json(), [])
+        self.assertEqual(Task.all_objects.filter(board_id=self.board.id).count(), 5)
+
+    def test_purge_deletes_in_batches_and_tracks_progress(self):
+        soft_delete_board(self.board)
+        using = self.board._state.db
+        batches = []
+        purge = purge_board(self.board.id, using, batch_size=2, progress=batches.append)
+
+        self.assertEqual((purge.comments_deleted, purge.tasks_deleted), (5, 5))
+        self.assertIsNotNone(purge.finished_at)
+        self.assertEqual(len(batches), 6)
+        self.assertFalse(Board.all_objects.using(using).filter(id=self.board.id).exists())
+        self.assertFalse(Task.all_objects.using(using).filter(board_id=self.board.id).exists())
+        self.assertFalse(Comment.all_objects.using(using).exists())
+
+
+class TaskArchiveTest(TestCase):
+    """
+    Old done tasks move to the archive tables, stay readable and can be restored.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="Owner", email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.board = Board.objects.create(title="Archive", owner=self.owner)
+        self.board.members.add(self.owner)
+        self.old = Task.objects.create(board=self.board, title="Old", description="Done long ago",
+                                       status='done', due_date=date(2025, 1, 1))
+        Task.objects.filter(id=self.old.id).update(completed_at=timezone.now() - timedelta(days=100))
+        Comment.objects.create(task=self.old, author=self.owner, content="Shipped", created_at=date(2025, 1, 1))
+        self.recent = Task.objects.create(board=self.board, title="Recent", description="Done today",
+                                          status='done', due_date=date(2025, 1, 1))
+        self.open = Task.objects.create(board=self.board, title="Open", description="Still open",
+                                        due_date=date(2025, 1, 1))
+
+    def test_completion_time_follows_status(self):
+        self.assertIsNotNone(self.recent.completed_at)
+        self.assertIsNone(self.open.completed_at)
+        self.recent.status = 'review'
+        self.recent.save()
+        self.assertIsNone(self.recent.completed_at)
+
+    def test_archived_tasks_leave_hot_paths_and_can_be_restored(self):
+        self.assertEqual(archive_tasks(after_days=90), 1)
+        self.assertEqual(list(Task.objects.order_by('id')), [self.recent, self.open])
+        self.assertFalse(Comment.objects.exists())
+        boards = self.client.get('/api/boards/').json()
+        self.assertEqual(boards[0]['ticket_count'], 2)
+
+        url = f'/api/boards/{self.board.id}/archive/'
+        archived = self.client.get(url).json()['results']
+        self.assertEqual([(task['id'], task['comments_count']) for task in archived], [(self.old.id, 1)])
+        detail = self.client.get(f'{url}{self.old.id}/').json()
+        self.assertEqual(detail['comments'][0]['author'], 'Owner')
+
+        response = self.client.post(f'{url}{self.old.id}/restore/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['comments_count'], 1)
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertEqual(self.client.get(url).json()['results'], [])
+        self.assertEqual(archive_tasks(after_days=90), 0)
+
+
+class RendererTest(TestCase):
+    """
+    The fast JSON renderer matches DRF byte for byte; MessagePack carries the same data.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="Ünïcode Owner", email="owner@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.board = Board.objects.create(title="Line\u2028break \u2713", owner=self.owner)
+        self.board.members.add(self.owner)
+        Task.objects.create(board=self.board, title="Task", description="Ä description",
+                            assignee=self.owner, due_date=date(2025, 1, 1))
+
+    def test_fast_json_matches_drf_json(self):
+        response = self.client.get(f'/api/boards/{self.board.id}/')
+        self.assertEqual(response.content, JSONRenderer().render(response.json()))
+        self.assertIn(b'\\u2028', response.content)
+        now = timezone.now()
+        data = {1: now, 'day': now.date(), 'amount': Decimal('1.50'), 'text': 'ÄÖÜ'}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_msgpack_negotiation(self):
+        response = self.client.get(f'/api/boards/{self.board.id}/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        json_response = self.client.get(f'/api/boards/{self.board.id}/')
+        self.assertEqual(msgpack.unpackb(response.content), json_response.json())
+
+        body = msgpack.packb({'title': 'Packed', 'members': [self.owner.id]})
+        response = self.client.post('/api/boards/', body, content_type='application/msgpack')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['member_count'], 1)
+
+
+class TaskRowsTest(TestCase):
+    """
+    The `.values()` fast path renders exactly like TaskSerializer and BoardDetailSerializer.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username=" Owner Ä ", email="owner@example.com")
+        self.other = User.objects.create_user(username="Other", email="")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.board = Board.objects.create(title="Rows", owner=self.owner)
+        self.board.members.add(self.owner, self.other)
+        people = [(self.owner, self.other), (self.other, None), (None, self.owner), (None, None)]
+        for index, (assignee, reviewer) in enumerate(people):
+            task = Task.objects.create(board=self.board, title=f"Task {index}", description="Ü",
+                                       status=Task.Status.values[index], priority='high',
+                                       assignee=assignee, reviewer=reviewer, due_date=date(2025, 2, index + 1))
+            for _ in range(index):
+                Comment.objects.create(task=task, author=self.owner, content="Hi", created_at=date(2025, 1, 1))
+        hidden = Board.objects.create(title="Hidden", owner=self.other)
+        Task.objects.create(board=hidden, title="Hidden", description="Not a member",
+                            assignee=self.owner, reviewer=self.owner, due_date=date(2025, 1, 1))
+
+    def serialized(self, tasks, path):
+        request = APIRequestFactory().get(path)
+        return JSONRenderer().render(TaskSerializer(tasks, many=True, context={'request': request}).data)
+
+    def test_task_data_matches_task_serializer(self):
+        tasks = Task.objects.filter(board=self.board).order_by('id')
+        for path, include_board in [('/api/tasks/assigned-to-me/', True), (f'/api/boards/{self.board.id}/', False)]:
+            fast = task_data(task_rows(tasks), include_board=include_board)
+            self.assertEqual(JSONRenderer().render(fast), self.serialized(tasks, path))
+
+    def test_board_detail_matches_board_detail_serializer(self):
+        url = f'/api/boards/{self.board.id}/'
+        board = Board.objects.prefetch_related(
+            Prefetch('tasks', queryset=Task.objects.order_by('id'))).get(id=self.board.id)
+        expected = BoardDetailSerializer(board, context={'request': APIRequestFactory().get(url)}).data
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+        self.assertEqual([task['comments_count'] for task in response.json()['tasks']], [0, 1, 2, 3])
+
+    def test_assigned_and_reviewing_match_task_serializer(self):
+        for path, lookup in [('/api/tasks/assigned-to-me/', {'assignee': self.owner}),
+                             ('/api/tasks/reviewing/', {'reviewer': self.owner})]:
+            tasks = Task.objects.filter(board__members=self.owner, **lookup).order_by('id')
+            response = self.client.get(path)
+            self.assertEqual(len(response.json()), 1)
+            self.assertEqual(response.content, self.serialized(tasks, path))
+
+
+class BoardDocumentTest(TestCase):
+    """
+    Board detail is served from a stored document that every change updates piece by piece.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="Owner", email="owner@example.com")
+        self.member = User.objects.create_user(username="Member", email="member@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.board = Board.objects.create(title="Documented", owner=self.owner)
+        self.board.members.add(self.owner)
+        self.task = Task.objects.create(board=self.board, title="First", description="Task",
+                                        assignee=self.owner, due_date=date(2025, 1, 1))
+        self.url = f'/api/boards/{self.board.id}/'
+
+    def document(self):
+        return BoardDocument.objects.using(self.board._state.db).get(board_id=self.board.id)
+
+    def assertServedFresh(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        board = Board.objects.using(self.board._state.db).get(id=self.board.id)
+        self.assertEqual(response.content, render(build_data(board)))
+        self.assertEqual(bytes(self.document().body), response.content)
+        return response.json()
+
+    def test_changes_patch_the_stored_document(self):
+        self.assertServedFresh()
+        self.assertEqual(self.document().version, 1)
+
+        response = self.client.post('/api/tasks/', {
+            'board': self.board.id, 'title': "Second", 'description': "New", 'status': 'to-do',
+            'priority': 'high', 'due_date': '2025-02-01'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        second = response.json()['id']
+        self.client.post(f'/api/tasks/{self.task.id}/comments/', {'content': "Hi"}, format='json')
+        self.client.patch(f'/api/tasks/{second}/', {'title': "Renamed"}, format='json')
+        self.client.post(f'{self.url}members/', {'members': [self.member.id]}, format='json')
+        self.client.patch(self.url, {'title': "Retitled"}, format='json')
+        self.assertEqual(self.document().version, 6)
+
+        data = self.assertServedFresh()
+        self.assertEqual(data['title'], "Retitled")
+        self.assertEqual([(task['title'], task['comments_count']) for task in data['tasks']],
+                         [("First", 1), ("Renamed", 0)])
+        self.assertEqual([member['id'] for member in data['members']], [self.owner.id, self.member.id])
+
+        self.client.delete(f'/api/tasks/{second}/')
+        self.assertEqual([task['id'] for task in self.assertServedFresh()['tasks']], [self.task.id])
+
+    def test_changes_render_only_what_they_touch(self):
+        for index in range(20):
+            Task.objects.create(board=self.board, title=f"Task {index}", description="Bulk",
+                                due_date=date(2025, 1, 1))
+        self.assertServedFresh()
+        served = bytes(self.document().body)
+        with mock.patch('kanban_app.documents.render', side_effect=render) as rendered:
+            self.client.patch(f'/api/tasks/{self.task.id}/', {'title': "Changed"}, format='json')
+            self.assertEqual(rendered.call_count, 1)
+            self.assertEqual(bytes(self.document().body), served)
+            data = self.assertServedFresh()
+            self.assertEqual(rendered.call_count, 1)
+        self.assertEqual(data['tasks'][0]['title'], "Changed")
+
+    def test_renaming_a_former_member_refreshes_their_tasks(self):
+        self.board.members.add(self.member)
+        self.task.reviewer = self.member
+        self.task.save()
+        self.client.delete(f'{self.url}members/', {'members': [self.member.id]}, format='json')
+        self.assertServedFresh()
+
+        self.member.username = "Renamed Reviewer"
+        self.member.save()
+        data = self.assertServedFresh()
+        self.assertEqual(data['tasks'][0]['reviewer']['fullname'], "Renamed Reviewer")
+
+    def test_archive_restore_and_deletion_update_the_document(self):
+        self.assertServedFresh()
+        Task.objects.filter(id=self.task.id).update(
+            status='done', completed_at=timezone.now() - timedelta(days=100))
+        archive_tasks(after_days=90)
+        self.assertEqual(self.assertServedFresh()['tasks'], [])
+
+        restore_task(self.board.archived_tasks.get())
+        self.assertEqual(len(self.assertServedFresh()['tasks']), 1)
+
+        soft_delete_board(self.board)
+        self.assertEqual(bytes(self.document().head), b'')
+        self.assertFalse(self.document().entries.exists())
+
+    def test_checker_reports_and_repairs_stale_documents(self):
+        self.assertServedFresh()
+        BoardDocument.objects.using(self.board._state.db).update(body=b'{}')
+        with self.assertRaises(CommandError):
+            call_command('check_board_documents', stdout=StringIO())
+        call_command('check_board_documents', '--fix', stdout=StringIO())
+        call_command('check_board_documents', stdout=StringIO())
+        self.assertServedFresh()
+
+    def test_reads_from_a_replica_store_documents_on_the_primary(self):
+        if not getattr(settings, 'DATABASE_REPLICAS', None):
+            self.skipTest("Requires DATABASE_REPLICAS, e.g. core.settings_replica.")
+        self.addCleanup(unpin)
+        unpin()
+        board = Board.objects.get(id=self.board.id)
+        self.assertEqual(board._state.db, 'replica')
+
+        document = get_document(board)
+        self.assertEqual(document._state.db, 'default')
+        self.assertTrue(is_pinned())
+        unpin()
+        self.assertEqual(get_document(Board.objects.get(id=self.board.id))._state.db, 'replica')
+
+
+class CompressionTest(TestCase):
+    """
+    Large responses are compressed; board documents are compressed once per version.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        metrics.reset()
+        self.owner = User.objects.create_user(username="Owner", email="owner@example.com", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.board = Board.objects.create(title="Compressed", owner=self.owner)
+        self.board.members.add(self.owner)
+        self.tasks = [
+            Task.objects.create(board=self.board, title=f"Task {index}", description="Compressible",
+                                assignee=self.owner, due_date=date(2025, 1, 1))
+            for index in range(30)
+        ]
+        self.url = f'/api/boards/{self.board.id}/'
+
+    def get(self, url, encoding):
+        return self.client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+
+    def test_board_document_is_compressed_once_per_version(self):
+        plain = self.client.get(self.url)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+        response = self.get(self.url, 'br;q=0, gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.get(self.url, 'gzip')
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['distributions']['compression.gzip.cpu_seconds']['count'], 1)
+        self.assertEqual(snapshot['counters']['compression.gzip.responses'], 2)
+
+        self.tasks[0].title = "Changed"
+        self.tasks[0].save()
+        response = self.get(self.url, 'gzip')
+        self.assertIn(b'"Changed"', gzip.decompress(response.content))
+        self.assertEqual(metrics.snapshot()['distributions']['compression.gzip.cpu_seconds']['count'], 2)
+
+    def test_board_detail_is_revalidated_by_version(self):
+        response = self.client.get(self.url)
+        etag = f'"{self.board.id}-1"'
+        self.assertEqual(response['ETag'], etag)
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual((not_modified.content, not_modified['ETag']), (b'', etag))
+        compressed = self.get(self.url, 'gzip')
+        self.assertEqual(compressed['ETag'], f'W/{etag}')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=compressed['ETag']).status_code, 304)
+        indented = self.client.get(self.url, HTTP_ACCEPT='application/json; indent=2')
+        self.assertEqual(indented['ETag'], etag)
+
+        self.tasks[0].title = "Changed"
+        self.tasks[0].save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['ETag']), (200, f'"{self.board.id}-2"'))
+
+        discard_documents([self.board.id], self.board._state.db)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        self.assertEqual(self.client.get(self.url)['ETag'], f'"{self.board.id}-3"')
+
+    def test_variants_of_replica_reads_are_stored_on_the_primary(self):
+        if not getattr(settings, 'DATABASE_REPLICAS', None):
+            self.skipTest("Requires DATABASE_REPLICAS, e.g. core.settings_replica.")
+        self.addCleanup(unpin)
+        get_document(self.board)
+        unpin()
+        document = BoardDocument.objects.get(board_id=self.board.id)
+        self.assertEqual(document._state.db, 'replica')
+
+        body = compressed_body(document, 'gzip')
+        self.assertTrue(is_pinned())
+        variant = BoardDocumentVariant.objects.using('default').get(document_id=self.board.id)
+        self.assertEqual((variant.version, bytes(variant.body)), (document.version, body))
+
+    @skipUnless(brotli, "brotli is not installed")
+    def test_brotli_is_preferred(self):
+        response = self.get(self.url, 'gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.client.get(self.url).content)
+
+    def test_middleware_compresses_large_responses_only(self):
+        response = self.get('/api/tasks/assigned-to-me/', 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(gzip.decompress(response.content)), len(self.client.get('/api/tasks/assigned-to-me/').content))
+        self.assertFalse(self.get('/api/tasks/reviewing/', 'gzip').has_header('Content-Encoding'))
+
+        ratio = self.client.get('/api/metrics/').json()['distributions']['compression.gzip.ratio']
+        self.assertGreater(ratio['min'], 1)
+        self.client.force_authenticate(User.objects.create_user(username="Plain", email="plain@example.com"))
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+
+class ApiProfileTest(TestCase):
+    """
+    The API-only URL configuration serves the API alone, and warm-up runs cleanly.
+    """
+
+
+    databases = '__all__'
+
+    @override_settings(ROOT_URLCONF='core.urls_api')
+    def test_api_urls_leave_out_admin_and_login_views(self):
+        self.assertEqual(resolve('/api/boards/').url_name, 'board-list')
+        for url in ['/admin/', '/api-auth/login/']:
+            with self.assertRaises(Resolver404):
+                resolve(url)
+
+    def test_warm_up_runs_every_step(self):
+        with self.assertNoLogs('core.warmup'):
+            timings = warm_up()
+        self.assertEqual(list(timings), [step.__name__ for step in WARM_UP_STEPS])
+
+    @override_settings(WARM_UP_AT_BOOT=True)
+    def test_warm_up_at_boot_closes_its_connections(self):
+        with mock.patch('core.warmup.warm_up') as warmed, \
+                mock.patch.object(connections, 'close_all') as closed:
+            warm_up_at_boot()
+        warmed.assert_called_once()
+        closed.assert_called_once()
+
+
+class BatchRequestTest(TestCase):
+    """
+    Batch requests run API calls in-process with shared authentication and lookups.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="Batcher", email="batch@example.com")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+        self.board = Board.objects.create(title="Batched", owner=self.user)
+        self.board.members.add(self.user)
+        self.tasks = [
+            Task.objects.create(board=self.board, title=f"Task {index}", description="Task",
+                                due_date=date(2025, 1, 1))
+            for index in range(3)
+        ]
+
+    def batch(self, *requests, atomic=False):
+        return self.client.post('/api/batch/', {'requests': list(requests), 'atomic': atomic}, format='json')
+
+    def test_responses_match_individual_calls(self):
+        paths = [f'/api/boards/{self.board.id}/', '/api/tasks/calendar/?from=2025-01-01&to=2025-01-31'] + \
+            [f'/api/tasks/{task.id}/comments/' for task in self.tasks]
+        response = self.batch(*[{'method': 'GET', 'path': path} for path in paths])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['responses']
+        self.assertEqual([result['status'] for result in results], [200] * len(paths))
+        self.assertEqual([result['body'] for result in results],
+                         [self.client.get(path).json() for path in paths])
+
+    def test_membership_is_checked_once_per_board(self):
+        with CaptureQueriesContext(connection) as queries, \
+                CaptureQueriesContext(connections[self.board._state.db]) as shard_queries:
+            self.batch(*[{'method': 'GET', 'path': f'/api/tasks/{task.id}/comments/'} for task in self.tasks])
+        membership = [query for query in shard_queries if 'kanban_app_board_members' in query['sql']]
+        token_lookups = [query for query in queries if 'authtoken_token' in query['sql']]
+        self.assertEqual((len(membership), len(token_lookups)), (1, 1))
+
+    def test_writes_are_seen_by_later_sub_requests(self):
+        path = f'/api/tasks/{self.tasks[0].id}/comments/'
+        results = self.batch(
+            {'method': 'POST', 'path': path, 'body': {'content': "Batched"}},
+            {'method': 'GET', 'path': path},
+        ).json()['responses']
+        self.assertEqual(results[0]['status'], 201)
+        self.assertEqual([comment['content'] for comment in results[1]['body']], ["Batched"])
+
+    def test_atomic_batch_is_rolled_back_on_failure(self):
+        create = {'method': 'POST', 'path': '/api/tasks/', 'body': {
+            'board': self.board.id, 'title': "Batched", 'description': "New", 'status': 'to-do',
+            'priority': 'high', 'due_date': '2025-02-01'}}
+        failing = {'method': 'POST', 'path': '/api/tasks/999999/comments/', 'body': {'content': "Lost"}}
+
+        response = self.batch(create, failing, create, atomic=True)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result['status'] for result in response.json()['responses']], [201, 404])
+        self.assertFalse(Task.objects.filter(title="Batched").exists())
+
+        response = self.batch(create, failing, atomic=False)
+        self.assertEqual([result['status'] for result in response.json()['responses']], [201, 404])
+        self.assertTrue(Task.objects.filter(title="Batched").exists())
+
+    def test_a_raising_sub_request_fails_alone(self):
+        path = f'/api/tasks/{self.tasks[0].id}/comments/'
+        with mock.patch('kanban_app.api.views.CommentCreateListView.get_queryset',
+                        side_effect=RuntimeError("broken")), \
+                self.assertLogs('kanban_app.api.batch', 'ERROR'):
+            response = self.batch(
+                {'method': 'GET', 'path': path},
+                {'method': 'GET', 'path': f'/api/boards/{self.board.id}/'},
+            )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['responses']
+        self.assertEqual([result['status'] for result in results], [500, 200])
+        self.assertNotIn("broken", str(results[0]['body']))
+
+    def test_invalid_batches_are_rejected(self):
+        results = self.batch(
+            {'method': 'GET', 'path': '/api/registration/'},
+            {'method': 'GET', 'path': '/api/batch/'},
+        ).json()['responses']
+        self.assertEqual([result['status'] for result in results], [404, 400])
+        self.assertEqual(self.batch().status_code, 400)
+        too_many = [{'method': 'GET', 'path': '/api/tasks/reviewing/'}] * 51
+        self.assertEqual(self.batch(*too_many).status_code, 400)
+        self.client.credentials()
+        self.assertEqual(self.batch({'method': 'GET', 'path': '/api/tasks/reviewing/'}).status_code, 401)
+
+
+class LoadSheddingTest(SimpleTestCase):
+    """
+    Overloaded endpoint classes shed unprotected requests and report it in the metrics.
+    """
+
+
+    def setUp(self):
+        metrics.reset()
+        self.factory = RequestFactory()
+        self.middleware = LoadSheddingMiddleware(lambda request: HttpResponse("ok"))
+
+    def saturate(self, name):
+        load = self.middleware.shedder.classes[name]
+        load.limit = load.min_in_flight
+        load.in_flight = load.min_in_flight
+        return load
+
+    def test_limit_adapts_to_latency(self):
+        load = EndpointLoad('test', max_in_flight=10, min_in_flight=2, target_latency=0.1)
+        for _ in range(50):
+            self.assertTrue(load.enter())
+            load.leave(1.0)
+        self.assertEqual(load.limit, 2)
+        for _ in range(200):
+            load.enter()
+            load.leave(0.0)
+        self.assertEqual(load.limit, 10)
+
+    def test_saturated_class_sheds_with_retry_after(self):
+        self.saturate('reads')
+        response = self.middleware(self.factory.get('/api/boards/'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self.middleware(self.factory.post('/api/tasks/')).status_code, 200)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['counters']['shedding.reads.shed'], 1)
+        self.assertEqual(snapshot['gauges']['shedding.reads.shedding'], 1)
+        self.assertEqual(snapshot['gauges']['shedding.writes.shedding'], 0)
+
+    def test_protected_requests_pass_until_hard_limit(self):
+        writes = self.saturate('writes')
+        self.assertEqual(self.middleware(self.factory.post('/api/tasks/')).status_code, 503)
+        self.assertEqual(self.middleware(self.factory.patch('/api/tasks/1/')).status_code, 200)
+        auth = self.saturate('auth')
+        self.assertEqual(self.middleware(self.factory.post('/api/registration/')).status_code, 503)
+        self.assertEqual(self.middleware(self.factory.post('/api/login/')).status_code, 200)
+
+        writes.in_flight = auth.in_flight = 100
+        self.assertEqual(self.middleware(self.factory.patch('/api/tasks/1/')).status_code, 503)
+        self.assertEqual(self.middleware(self.factory.post('/api/login/')).status_code, 503)
+
+    def test_in_flight_is_released_on_errors(self):
+        def fail(request):
+            raise RuntimeError("boom")
+
+        middleware = LoadSheddingMiddleware(fail)
+        with self.assertRaises(RuntimeError):
+            middleware(self.factory.get('/api/boards/'))
+        self.assertEqual(middleware.shedder.classes['reads'].in_flight, 0)
+
+    @override_settings(LOAD_SHEDDING={'ENABLED': False})
+    def test_can_be_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            LoadSheddingMiddleware(lambda request: HttpResponse())
+
+
+class ThrottlingTest(TestCase):
+    """
+    Clients are limited per endpoint group with sliding windows, optionally shared.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        reset_window_store()
+        self.user = User.objects.create_user(username="Poller", email="poller@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        reset_window_store()
+
+    def test_sliding_window_weights_previous_window(self):
+        store = WindowStore()
+        self.assertEqual([store.hit('key', 3, 60, now=600) for _ in range(3)], [None] * 3)
+        self.assertEqual(store.hit('key', 3, 60, now=610), 50)
+        allowed = [store.hit('key', 3, 60, now=690) is None for _ in range(3)]
+        self.assertEqual(allowed, [True, True, False])
+        self.assertEqual([store.hit('key', 3, 60, now=900) for _ in range(3)], [None] * 3)
+
+    def test_counters_of_idle_clients_are_swept(self):
+        store = WindowStore(sweep_seconds=30)
+        store.hit('idle', 3, 60, now=600)
+        store.hit('busy', 3, 60, now=600)
+        store.hit('busy', 3, 60, now=700)
+        self.assertEqual(set(store.entries), {'idle', 'busy'})
+        store.hit('new', 3, 60, now=730)
+        self.assertEqual(set(store.entries), {'busy', 'new'})
+
+    def test_shared_store_enforces_limit_across_processes(self):
+        cache.clear()
+        first = WindowStore(cache, sync_seconds=0)
+        second = WindowStore(cache, sync_seconds=0)
+        self.assertEqual([first.hit('key', 3, 60, now=600) for _ in range(3)], [None] * 3)
+        self.assertIsNotNone(first.hit('key', 3, 60, now=601))
+        self.assertIsNotNone(second.hit('key', 3, 60, now=602))
+        self.assertIsNone(second.hit('other', 3, 60, now=602))
+
+    def test_view_group_is_limited_per_client(self):
+        with mock.patch.object(BoardViewSet, 'throttle_rate', '2/min', create=True):
+            statuses = [self.client.get('/api/boards/').status_code for _ in range(3)]
+            self.assertEqual(statuses, [200, 200, 429])
+            self.assertIn('Retry-After', self.client.get('/api/boards/'))
+            self.assertEqual(self.client.get('/api/tasks/assigned-to-me/').status_code, 200)
+
+            other = APIClient()
+            other.force_authenticate(User.objects.create_user(username="Quiet", email="quiet@example.com"))
+            self.assertEqual(other.get('/api/boards/').status_code, 200)
+
+
+class FailingSink:
+    """
+    Sink failing every delivery.
+    """
+
+
+    def send(self, notifications):
+        raise ConnectionError("sink is down")
+
+
+class PickySink(MemorySink):
+    """
+    Sink failing every batch that contains a notification titled "Poison".
+    """
+
+
+    def send(self, notifications):
+        if any(notification['title'] == "Poison" for notification in notifications):
+            raise ValueError("cannot deliver")
+        super().send(notifications)
+
+
+@override_settings(OUTBOX={'SINKS': {'kanban_app.outbox.MemorySink': {}}, 'MAX_ATTEMPTS': 2})
+class OutboxTest(TestCase):
+    """
+    Assignment and comment notifications are recorded with their change and dispatched in batches.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        MemorySink.sent.clear()
+        self.owner, self.assignee, self.reviewer = [
+            User.objects.create_user(username=name, email=f"{name.lower()}@example.com")
+            for name in ("Owner", "Assignee", "Reviewer")
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        response = self.client.post('/api/boards/', {
+            'title': "Notified", 'members': [self.owner.id, self.assignee.id, self.reviewer.id]
+        }, format='json')
+        self.board_id = response.json()['id']
+
+    def messages(self):
+        return fan_out(lambda: list(OutboxMessage.objects.order_by('id').values_list('event', flat=True)))
+
+    def create_task(self, **fields):
+        response = self.client.post('/api/tasks/', {
+            'board': self.board_id, 'title': "Task", 'description': "Notify", 'status': 'to-do',
+            'priority': 'high', 'due_date': '2025-02-01', **fields}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def test_assignment_changes_are_recorded(self):
+        task_id = self.create_task(assignee_id=self.assignee.id, reviewer_id=self.reviewer.id)
+        self.assertEqual(self.messages(), ['task.assigned', 'task.review_requested'])
+
+        self.client.patch(f'/api/tasks/{task_id}/', {'title': "Renamed"}, format='json')
+        self.assertEqual(len(self.messages()), 2)
+        self.client.patch(f'/api/tasks/{task_id}/', {'assignee_id': self.reviewer.id}, format='json')
+        self.assertEqual(self.messages(), ['task.assigned', 'task.review_requested', 'task.assigned'])
+
+    def test_dispatch_expands_recipients_and_empties_outbox(self):
+        task_id = self.create_task(assignee_id=self.assignee.id)
+        self.client.post(f'/api/tasks/{task_id}/comments/', {'content': "Hello"}, format='json')
+        out = StringIO()
+        call_command('dispatch_outbox', '--once', stdout=out)
+
+        self.assertIn("Delivered 2", out.getvalue())
+        self.assertEqual(
+            [(sent['event'], sent['recipient_email']) for sent in MemorySink.sent],
+            [('task.assigned', 'assignee@example.com'),
+             ('comment.created', 'assignee@example.com'),
+             ('comment.created', 'reviewer@example.com')]
+        )
+        self.assertEqual(MemorySink.sent[1]['content'], "Hello")
+        self.assertEqual(self.messages(), [])
+
+    def test_failed_messages_back_off_then_are_left(self):
+        self.create_task(assignee_id=self.assignee.id)
+        with self.assertLogs('kanban_app.outbox', 'ERROR'):
+            self.assertEqual(drain([FailingSink()]), 0)
+        message = fan_out(lambda: list(OutboxMessage.objects.all()))[0]
+        self.assertEqual(message.attempts, 1)
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        self.assertIn("sink is down", message.last_error)
+
+        self.assertEqual(drain([FailingSink()]), 0)
+        self.assertEqual(fan_out(lambda: list(OutboxMessage.objects.values_list('attempts', flat=True))), [1])
+        later = timezone.now() + timedelta(seconds=10)
+        with mock.patch('django.utils.timezone.now', return_value=later), \
+                self.assertLogs('kanban_app.outbox', 'ERROR'):
+            self.assertEqual(drain([FailingSink()]), 0)
+        later += timedelta(seconds=10)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            self.assertEqual(drain([MemorySink()]), 0)
+        self.assertEqual(fan_out(lambda: list(OutboxMessage.objects.values_list('attempts', flat=True))), [2])
+
+    def test_one_failing_message_does_not_hold_back_the_batch(self):
+        self.create_task(title="Poison", assignee_id=self.assignee.id)
+        self.create_task(title="Fine", assignee_id=self.assignee.id)
+        with self.assertLogs('kanban_app.outbox', 'ERROR'):
+            self.assertEqual(drain([PickySink()]), 1)
+        self.assertEqual([sent['title'] for sent in MemorySink.sent], ["Fine"])
+        remaining = fan_out(lambda: list(OutboxMessage.objects.all()))
+        self.assertEqual([(message.payload['title'], message.attempts) for message in remaining], [("Poison", 1)])
+
+    def test_rolled_back_change_records_nothing(self):
+        response = self.client.post('/api/batch/', {'atomic': True, 'requests': [
+            {'method': 'POST', 'path': '/api/tasks/', 'body': {
+                'board': self.board_id, 'title': "Lost", 'description': "Lost", 'status': 'to-do',
+                'priority': 'high', 'due_date': '2025-02-01', 'assignee_id': self.assignee.id}},
+            {'method': 'POST', 'path': '/api/tasks/999999/comments/', 'body': {'content': "Lost"}},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.messages(), [])
+
+    def test_file_sink_writes_json_lines(self):
+        self.create_task(reviewer_id=self.reviewer.id)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notifications.jsonl')
+            drain([FileSink(path)])
+            with open(path, encoding='utf-8') as file:
+                lines = [json.loads(line) for line in file]
+        self.assertEqual([(line['event'], line['recipient_id']) for line in lines],
+                         [('task.review_requested', self.reviewer.id)])
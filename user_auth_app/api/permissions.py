@@ -3,6 +3,9 @@ Custom permission classes for the Kanban application.
 
 These permissions restrict access to boards, tasks, and comments
 based on user roles, board membership, and ownership.
+
+Board and membership lookups go through the request-scoped cache, so
+the sub-requests of a batch request check each board once.
 """
 
 
@@ -10,7 +13,41 @@ from django.contrib.auth.models import User
 from rest_framework.permissions import BasePermission
 from rest_framework.generics import get_object_or_404
 from rest_framework.exceptions import NotFound
+from core.request_cache import cached
 from kanban_app.models import Board, Task
+from kanban_app.sharding import current_shard
+
+
+def task_board_id(task_id):
+    """
+    Return the board ID of a task, raising Http404 if there is no such task.
+    """
+    return cached(
+        ('task_board', current_shard(), task_id),
+        lambda: get_object_or_404(Task.objects.only('board_id'), pk=task_id).board_id
+    )
+
+
+def board_exists(board_id):
+    """
+    Return True if the board exists and is not deleted.
+    """
+    return cached(
+        ('board_exists', current_shard(), board_id),
+        lambda: Board.objects.filter(id=board_id).exists()
+    )
+
+
+def board_member_ids(board_id):
+    """
+    Return the IDs of the board's members.
+    """
+    return cached(
+        ('board_members', current_shard(), board_id),
+        lambda: frozenset(
+            Board.members.through.objects.filter(board_id=board_id).values_list('user_id', flat=True))
+    )
+
 
 class IsBoardMemberOrOwner(BasePermission):
     """
@@ -44,11 +81,11 @@ class IsTaskBoardMember(BasePermission):
         Raise a NotFound error if the board does not exist.
         """
         if request.method != 'PATCH':
-            board_id = request.data.get("board")
+            board_id = request.data.get("board") if isinstance(request.data, dict) else None
         else:
             task_id = view.kwargs.get('pk')
             try:
-                board_id = Task.objects.get(id=task_id).board_id
+                board_id = task_board_id(task_id)
             except:
                 raise NotFound("Board not found.")
 
@@ -56,12 +93,10 @@ class IsTaskBoardMember(BasePermission):
                 raise NotFound("Board ID not provided.")
 
 
-        try:
-            board = Board.objects.get(id=board_id)
-        except Board.DoesNotExist:
+        if not board_exists(board_id):
             raise NotFound("Board not found.")
         
-        return board.members.filter(pk=request.user.pk).exists()
+        return request.user.pk in board_member_ids(board_id)
     
 
 class IsTaskBoardOwner(BasePermission):
@@ -136,7 +171,5 @@ class IsCommentBoardMember(BasePermission):
         Raise a 404 error if the task does not exist.
         """
         user = request.user
-        task_id = view.kwargs['task_id']
-        task = get_object_or_404(Task, pk=task_id)
-        board = task.board
-        return user.id in board.members.values_list('id', flat=True)
\ No newline at end of file
+        board_id = task_board_id(view.kwargs['task_id'])
+        return user.id in board_member_ids(board_id)
\ No newline at end of file
@@ -5,11 +5,15 @@ This module provides serializers for:
 - Viewing basic user account data.
 - Registering new users with password confirmation.
 - Authenticating users via email and password.
+- Validating batches of email addresses to look up.
+- Validating batches of accounts to provision at once.
 """
 
 
 from django.contrib.auth.models import User
 from rest_framework import serializers
+from user_auth_app.hashing import check_user_password, hash_password
+from user_auth_app.provisioning import BATCH_SIZE, find_conflicts
 
 class UserAccountSerializer(serializers.ModelSerializer):
     """
@@ -77,20 +81,25 @@ class RegistrationSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Create a new user instance after validating matching passwords.
+
+        The password is hashed in the bounded hashing pool, unless the
+        caller already passed its hash as `password_hash` to `save()`.
         """
         fullname = validated_data.pop('fullname')
         email = validated_data.pop('email')
         password = validated_data.pop('password')
         repeated_password = validated_data.pop('repeated_password')
+        password_hash = validated_data.pop('password_hash', None)
 
         if password != repeated_password:
             raise serializers.ValidationError("Passwords do not match")
-        
-        user = User.objects.create_user(
-            username=fullname,
-            email=email,
-            password=password
+
+        user = User(
+            username=User.normalize_username(fullname),
+            email=User.objects.normalize_email(email),
+            password=password_hash or hash_password(password)
         )
+        user.save()
         return user
     
 
@@ -111,6 +120,9 @@ class LoginSerializer(serializers.Serializer):
         - Email or password is missing.
         - User does not exist.
         - Password does not match.
+
+        With `defer_password_check` in the context only the user is
+        looked up, leaving the password check to an async caller.
         """
         email = attrs.get('email')
         password = attrs.get('password')
@@ -123,8 +135,54 @@ class LoginSerializer(serializers.Serializer):
         except User.DoesNotExist:
             raise serializers.ValidationError('Invalid email or password')
 
-        if not user.check_password(password):
+        if not self.context.get('defer_password_check') and \
+                not check_user_password(user, password):
             raise serializers.ValidationError('Invalid email or password')
 
         attrs['user'] = user
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class EmailBatchSerializer(serializers.Serializer):
+    """
+    Serializer for a batch of email addresses to resolve to users.
+    """
+
+
+    emails = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=500
+    )
+
+
+class ProvisionedAccountSerializer(serializers.Serializer):
+    """
+    Serializer for one account in a bulk provisioning request.
+    """
+
+
+    fullname = serializers.CharField(max_length=150)
+    email = serializers.EmailField()
+    password = serializers.CharField(write_only=True)
+
+
+class BulkProvisioningSerializer(serializers.Serializer):
+    """
+    Serializer for a batch of accounts to create at once.
+
+    Emails and full names of the whole batch are checked for conflicts
+    in two queries instead of two per account.
+    """
+
+
+    users = ProvisionedAccountSerializer(many=True, allow_empty=False, max_length=BATCH_SIZE)
+
+    def validate_users(self, value):
+        """
+        Reject the batch if any account conflicts with an existing or earlier one.
+        """
+        errors = find_conflicts(value)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return value
@@ -1,7 +1,18 @@
+from django.conf import settings
 from django.urls import path
-from .views import RegistrationView, CustomLoginView
+from .views import (
+    RegistrationView, CustomLoginView, UserSearchView,
+    AsyncRegistrationView, AsyncLoginView, BulkProvisioningView
+)
+
+if getattr(settings, 'AUTH_VIEWS_ASYNC', False):
+    registration_view, login_view = AsyncRegistrationView, AsyncLoginView
+else:
+    registration_view, login_view = RegistrationView, CustomLoginView
 
 urlpatterns = [
-    path('registration/', RegistrationView.as_view(), name='registration'),
-    path('login/', CustomLoginView.as_view(), name='login')
-]
\ No newline at end of file
+    path('registration/', registration_view.as_view(), name='registration'),
+    path('login/', login_view.as_view(), name='login'),
+    path('users/search/', UserSearchView.as_view(), name='user-search'),
+    path('users/bulk/', BulkProvisioningView.as_view(), name='user-bulk')
+]
@@ -4,23 +4,43 @@ API views for user registration and authentication.
 This module provides:
 - RegistrationView: Allows new users to register and receive an auth token.
 - CustomLoginView: Authenticates existing users and returns an auth token.
+- AsyncRegistrationView, AsyncLoginView: Async versions of the two views
+  above that await password hashing instead of blocking a worker.
+- UserSearchView: Finds users by username or email prefix.
+- BulkProvisioningView: Lets admins create many accounts at once.
 """
 
 
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import User
-from .serializers import RegistrationSerializer, LoginSerializer
+from django.db.models import Count, Q
+from core.db import retry_on_locked
+from idempotency_app.idempotency import IdempotentMixin
+from kanban_app.models import Board
+from kanban_app.sharding import fan_out
+from user_auth_app.hashing import acheck_user_password, ahash_password
+from user_auth_app.provisioning import provision_users
+from user_auth_app.user_index import user_index
+from .serializers import RegistrationSerializer, LoginSerializer, BulkProvisioningSerializer
 
 
-class RegistrationView(APIView):
+class RegistrationView(IdempotentMixin, APIView):
     """
     API view for registering a new user.
 
     Accepts user details, creates the account, and returns an authentication token.
+    Retries sent with the same `Idempotency-Key` create the account once.
     """
 
 
@@ -29,7 +49,27 @@ class RegistrationView(APIView):
 
     def post(self, request):
         """
-        Handle POST request to register a new user.
+        Handle POST request to register a new user, once per idempotency key.
+        """
+        return self.idempotent(self.register, request)
+
+    def stored_data(self, response):
+        """
+        Store only the new user's ID, never the auth token.
+        """
+        return {'user_id': response.data['user_id']}
+
+    def replayed_data(self, data):
+        """
+        Rebuild the registration response with the user's current token.
+        """
+        user = User.objects.get(id=data['user_id'])
+        token, created = retry_on_locked(Token.objects.get_or_create)(user=user)
+        return account_data(user, token)
+
+    def register(self, request):
+        """
+        Register a new user.
 
         Returns:
             - Auth token
@@ -41,15 +81,8 @@ class RegistrationView(APIView):
         serializer = RegistrationSerializer(data=request.data)
         
         if serializer.is_valid():
-            save_account = serializer.save()
-            token, created = Token.objects.get_or_create(user=save_account)
-            data = {
-                'token': token.key,
-                'fullname': save_account.username,
-                'email': save_account.email,
-                'user_id': save_account.id
-            }
-            return Response(data)
+            save_account, token = create_account(serializer)
+            return Response(account_data(save_account, token))
         else:
             data = serializer.errors
 
@@ -78,11 +111,234 @@ class CustomLoginView(APIView):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data['user']
-        token, created = Token.objects.get_or_create(user=user)
-
-        return Response({
-            'token': token.key,
-            'fullname': user.username,
-            'email': user.email,
-            'user_id': user.id
-        })
\ No newline at end of file
+        token, created = retry_on_locked(Token.objects.get_or_create)(user=user)
+
+        return Response(account_data(user, token))
+
+
+@retry_on_locked
+def create_account(serializer, **kwargs):
+    """
+    Create the user and its auth token in a single transaction.
+    """
+    account = serializer.save(**kwargs)
+    token, created = Token.objects.get_or_create(user=account)
+    return account, token
+
+
+def account_data(user, token):
+    """
+    Return the response body of a successful registration or login.
+    """
+    return {
+        'token': token.key,
+        'fullname': user.username,
+        'email': user.email,
+        'user_id': user.id
+    }
+
+
+class AsyncAuthView(View):
+    """
+    Base class for async authentication views.
+
+    DRF views cannot be async, so these are plain Django views that
+    reuse DRF's parsers, renderer and serializers to produce the same
+    responses as their sync counterparts. Only the password hashing is
+    awaited; database work runs in the thread pool of `sync_to_async`.
+    """
+
+
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    renderer_class = api_settings.DEFAULT_RENDERER_CLASSES[0]
+    http_method_names = ['post', 'options']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        """
+        Return the view exempt from CSRF checks, like DRF's views.
+        """
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        """
+        Return `data` rendered as JSON.
+        """
+        return HttpResponse(
+            self.renderer_class().render(data),
+            status=status_code,
+            content_type=self.renderer_class.media_type
+        )
+
+    def parse(self, request):
+        """
+        Return the parsed request body.
+        """
+        return Request(request, parsers=[parser() for parser in self.parser_classes]).data
+
+    async def post(self, request):
+        """
+        Parse the request body and pass it to `handle`.
+        """
+        try:
+            data = self.parse(request)
+        except ParseError as exc:
+            return self.render({'detail': exc.detail}, status.HTTP_400_BAD_REQUEST)
+        return await self.handle(data)
+
+    async def handle(self, data):
+        """
+        Return the response for the parsed request body.
+        """
+        raise NotImplementedError
+
+
+class AsyncRegistrationView(AsyncAuthView):
+    """
+    Async version of RegistrationView.
+    """
+
+
+    async def handle(self, data):
+        """
+        Validate the registration, hash the password and create the account.
+        """
+        serializer = RegistrationSerializer(data=data)
+        if not await sync_to_async(serializer.is_valid)():
+            return self.render(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        password = serializer.validated_data['password']
+        if password != serializer.validated_data['repeated_password']:
+            return self.render(["Passwords do not match"], status.HTTP_400_BAD_REQUEST)
+
+        password_hash = await ahash_password(password)
+        account, token = await sync_to_async(create_account)(
+            serializer, password_hash=password_hash)
+        return self.render(account_data(account, token))
+
+
+class AsyncLoginView(AsyncAuthView):
+    """
+    Async version of CustomLoginView.
+    """
+
+
+    async def handle(self, data):
+        """
+        Look up the user, await the password check and return a token.
+        """
+        serializer = LoginSerializer(data=data, context={'defer_password_check': True})
+        if not await sync_to_async(serializer.is_valid)():
+            return self.render(serializer.errors, status.HTTP_400_BAD_REQUEST)
+
+        user = serializer.validated_data['user']
+        if not await acheck_user_password(user, serializer.validated_data['password']):
+            return self.render(
+                {'non_field_errors': ['Invalid email or password']},
+                status.HTTP_400_BAD_REQUEST
+            )
+
+        token, created = await sync_to_async(retry_on_locked(Token.objects.get_or_create))(user=user)
+        return self.render(account_data(user, token))
+
+
+def co_members_matching(user, prefix):
+    """
+    Return the users sharing a board with `user` whose username or email
+    starts with `prefix`.
+
+    Returns a dict mapping their IDs to (username, email, shared) with
+    the number of boards they share. Deleted boards are not counted.
+    """
+    Membership = Board.members.through
+
+    def counts():
+        my_boards = Membership.objects.filter(
+            user_id=user.id, board__deleted_at__isnull=True).values('board_id')
+        return list(
+            Membership.objects.filter(board_id__in=my_boards)
+            .filter(Q(user__username__istartswith=prefix) | Q(user__email__istartswith=prefix))
+            .exclude(user_id=user.id)
+            .values('user_id', 'user__username', 'user__email').annotate(shared=Count('board_id'))
+            .values_list('user_id', 'user__username', 'user__email', 'shared')
+        )
+
+    members = {}
+    for user_id, username, email, count in fan_out(counts):
+        shared = members[user_id][2] if user_id in members else 0
+        members[user_id] = (username, email, shared + count)
+    return members
+
+
+class UserSearchView(APIView):
+    """
+    API view for finding users to add to a board.
+
+    Prefix-matches usernames and emails. Users sharing boards with the
+    requesting user come first, most shared boards first; the remaining
+    places are filled from the in-memory user index.
+    """
+
+
+    permission_classes = [IsAuthenticated]
+    throttle_scope = 'users'
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request):
+        """
+        Handle GET request to search users by the `q` prefix.
+
+        Returns a list of users, each with id, email, full name and the
+        number of shared boards.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "Query parameter q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', self.default_limit)), 1), self.max_limit)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        members = co_members_matching(request.user, query)
+        ranked = sorted(members.items(), key=lambda item: (-item[1][2], item[1][0].lower(), item[0]))
+        results = [
+            {'id': user_id, 'email': email, 'fullname': username.strip(), 'shared_boards': shared}
+            for user_id, (username, email, shared) in ranked[:limit]
+        ]
+        for user_id in user_index.search(query, limit + len(members) + 1):
+            if len(results) == limit:
+                break
+            entry = user_index.get(user_id)
+            if user_id == request.user.id or user_id in members or entry is None:
+                continue
+            username, email = entry
+            results.append({'id': user_id, 'email': email, 'fullname': username.strip(), 'shared_boards': 0})
+        return Response(results)
+
+
+class BulkProvisioningView(APIView):
+    """
+    API view for creating many user accounts in one request.
+
+    The whole batch is validated first; if any account conflicts,
+    nothing is created.
+    """
+
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        """
+        Handle POST request with a `users` list of full name, email and password.
+
+        Returns the token, full name, email and user ID of every created
+        account, in request order.
+        """
+        serializer = BulkProvisioningSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        accounts = provision_users(serializer.validated_data['users'])
+        return Response(
+            [account_data(user, token) for user, token in accounts],
+            status=status.HTTP_201_CREATED
+        )
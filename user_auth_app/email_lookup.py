@@ -0,0 +1,72 @@
+"""
+Cached, case-insensitive lookup of users by email address.
+
+Lookups match `LOWER(email)`, which is backed by an expression index,
+and resolve any number of addresses in one query. Results, including
+addresses that match no user, are kept in the Django cache for
+`CACHE_TIMEOUT` seconds and invalidated whenever a user is saved or
+deleted. Invalidation only reaches the cache of the saving process
+unless the cache is shared, so other processes may serve a stale user
+or a stale miss until the entry expires.
+"""
+
+
+import hashlib
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.functions import Lower
+
+from user_auth_app.api.serializers import UserAccountSerializer
+
+
+CACHE_PREFIX = 'email-check:'
+CACHE_TIMEOUT = 300
+NOT_FOUND = 0
+
+
+def normalize_email(email):
+    """
+    Return the form of an email address used for matching.
+    """
+    return email.strip().lower()
+
+
+def cache_key(email):
+    """
+    Return the cache key for a normalized email address.
+    """
+    return CACHE_PREFIX + hashlib.sha1(email.encode()).hexdigest()
+
+
+def lookup_emails(emails):
+    """
+    Return a dict mapping each normalized email to user data, or None.
+
+    Cached results are used where available; the remaining addresses
+    are resolved in a single query and cached, found or not.
+    """
+    normalized = {normalize_email(email) for email in emails if email}
+    keys = {cache_key(email): email for email in normalized}
+    results = {keys[key]: value or None for key, value in cache.get_many(keys).items()}
+
+    missing = normalized - results.keys()
+    if missing:
+        users = User.objects.annotate(email_lower=Lower('email')) \
+            .filter(email_lower__in=missing).order_by('id')
+        found = {}
+        for user in users:
+            found.setdefault(user.email_lower, dict(UserAccountSerializer(user).data))
+        cache.set_many(
+            {cache_key(email): found.get(email, NOT_FOUND) for email in missing},
+            CACHE_TIMEOUT
+        )
+        results.update({email: found.get(email) for email in missing})
+    return results
+
+
+def invalidate_emails(*emails):
+    """
+    Drop cached lookups for the given email addresses.
+    """
+    cache.delete_many([cache_key(normalize_email(email)) for email in emails if email])
@@ -0,0 +1,143 @@
+"""
+Password hashing in a bounded worker pool.
+
+PBKDF2 is deliberately slow. Running it inline lets a burst of logins
+or registrations occupy every request-serving thread, so hashing is
+submitted to a dedicated thread pool instead. `hashlib` releases the
+GIL while hashing, and the pool size (`PASSWORD_HASHING_WORKERS`)
+caps how many CPU cores hashing can take at any time.
+
+Sync callers block on the result; async callers await it without
+holding the event loop. Logins transparently rehash passwords whose
+hasher or hasher parameters have changed.
+
+Bulk provisioning hashes whole batches on a separate process pool
+(`PASSWORD_HASHING_PROCESSES`), which spreads the work over every core.
+"""
+
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_process_pool = None
+
+
+def get_executor():
+    """
+    Return the shared hashing pool, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', 2),
+                    thread_name_prefix='password-hashing'
+                )
+    return _executor
+
+
+def reset_executor():
+    """
+    Shut down the hashing pool so the next call creates one with the
+    current settings.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
+
+
+def hash_password(password):
+    """
+    Return the encoded hash of `password`, computed in the pool.
+    """
+    return get_executor().submit(make_password, password).result()
+
+
+async def ahash_password(password):
+    """
+    Async version of `hash_password`.
+    """
+    return await asyncio.wrap_future(get_executor().submit(make_password, password))
+
+
+def check_user_password(user, password):
+    """
+    Return True if `password` matches the user's password.
+
+    Verification runs in the pool. If the stored hash uses an outdated
+    hasher or parameters, the password is rehashed and saved.
+    """
+    is_correct, must_update = get_executor().submit(
+        verify_password, password, user.password).result()
+    if is_correct and must_update:
+        user.password = hash_password(password)
+        user.save(update_fields=['password'])
+    return is_correct
+
+
+async def acheck_user_password(user, password):
+    """
+    Async version of `check_user_password`.
+    """
+    is_correct, must_update = await asyncio.wrap_future(
+        get_executor().submit(verify_password, password, user.password))
+    if is_correct and must_update:
+        user.password = await ahash_password(password)
+        await user.asave(update_fields=['password'])
+    return is_correct
+
+
+def setup_hashing_process():
+    """
+    Configure Django in a freshly spawned hashing process.
+    """
+    import django
+    django.setup()
+
+
+def hashing_processes():
+    """
+    Return the size of the bulk hashing process pool.
+    """
+    return getattr(settings, 'PASSWORD_HASHING_PROCESSES', None) or os.cpu_count() or 1
+
+
+def get_process_pool():
+    """
+    Return the shared bulk hashing process pool, creating it on first use.
+
+    Workers are spawned rather than forked, so they never inherit the
+    parent's threads or database connections.
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _executor_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=hashing_processes(),
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=setup_hashing_process
+                )
+    return _process_pool
+
+
+def hash_passwords(passwords):
+    """
+    Return the encoded hashes of `passwords`, in order, computed in
+    parallel on the process pool.
+    """
+    pool = get_process_pool()
+    chunksize = max(1, len(passwords) // (hashing_processes() * 4))
+    return list(pool.map(make_password, passwords, chunksize=chunksize))
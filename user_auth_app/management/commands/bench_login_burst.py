@@ -0,0 +1,175 @@
+"""
+Benchmark read latency while a burst of logins is in progress.
+
+A reader thread repeatedly fetches GET /api/boards/ while a number of
+client threads log in as fast as they can. The run is repeated with
+password hashing limited to `PASSWORD_HASHING_WORKERS` threads and with
+one hashing thread per login client, which is what hashing inline in
+the request threads amounts to.
+
+Usage:
+    python manage.py bench_login_burst
+    python manage.py bench_login_burst --burst 16 --requests 200
+
+The benchmark runs against a throwaway test database, so it never
+touches application data.
+"""
+
+
+import threading
+import time
+from datetime import date
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from rest_framework.authtoken.models import Token
+
+from core.db import throwaway_database
+from kanban_app.models import Board, Task
+from user_auth_app.hashing import reset_executor
+
+
+PASSWORD = 'bench-password'
+
+
+def percentile(values, fraction):
+    """
+    Return the value below which `fraction` of the sorted values fall.
+    """
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def build_data(logins, tasks):
+    """
+    Create the login users, a reader with one board of tasks, and
+    return the reader's token.
+    """
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(username=f"Login User {index}", email=f"login{index}@example.com",
+             password=password)
+        for index in range(logins)
+    )
+    reader = User.objects.create(username="Reader", email="reader@example.com")
+    board = Board.objects.create(title="Benchmark board", owner=reader)
+    board.members.add(reader)
+    Task.objects.bulk_create(
+        Task(board=board, title=f"Task {index}", description="Benchmark task",
+             due_date=date(2025, 1, 1 + index % 28),
+             creator=reader, assignee=reader)
+        for index in range(tasks)
+    )
+    return Token.objects.create(user=reader).key
+
+
+def read_latencies(token, count):
+    """
+    Return the latency in seconds of `count` board list requests.
+    """
+    client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+    latencies = []
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            client.get('/api/boards/')
+            latencies.append(time.perf_counter() - started)
+    finally:
+        connections.close_all()
+    return latencies
+
+
+def log_in_until(stop, index, counter):
+    """
+    Log in as one of the benchmark users until `stop` is set.
+    """
+    client = Client()
+    body = {'email': f'login{index}@example.com', 'password': PASSWORD}
+    try:
+        while not stop.is_set():
+            client.post('/api/login/', body, content_type='application/json')
+            with counter['lock']:
+                counter['logins'] += 1
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    """
+    Compare read latency during login bursts with and without a bounded hashing pool.
+    """
+
+
+    help = "Measure GET /api/boards/ latency during a burst of logins."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', type=int, default=8,
+                            help="Number of concurrent login clients.")
+        parser.add_argument('--requests', type=int, default=100,
+                            help="Board list requests timed per phase.")
+        parser.add_argument('--tasks', type=int, default=200,
+                            help="Tasks on the reader's board.")
+
+    def handle(self, *args, **options):
+        """
+        Run the idle and burst phases for both pool sizes and print the results.
+        """
+        setup_test_environment()
+        try:
+            with throwaway_database():
+                token = build_data(options['burst'], options['tasks'])
+                idle = read_latencies(token, options['requests'])
+                self.report("idle", idle, None)
+                for label, workers in (
+                    (f"bounded ({settings.PASSWORD_HASHING_WORKERS} workers)",
+                     settings.PASSWORD_HASHING_WORKERS),
+                    (f"unbounded ({options['burst']} workers)", options['burst']),
+                ):
+                    with override_settings(PASSWORD_HASHING_WORKERS=workers):
+                        reset_executor()
+                        latencies, rate = self.burst(token, options['burst'], options['requests'])
+                    reset_executor()
+                    self.report(label, latencies, rate)
+        finally:
+            teardown_test_environment()
+
+    def burst(self, token, clients, requests):
+        """
+        Time board list requests while `clients` threads keep logging in.
+
+        Returns the latencies and the login throughput per second.
+        """
+        stop = threading.Event()
+        counter = {'lock': threading.Lock(), 'logins': 0}
+        threads = [
+            threading.Thread(target=log_in_until, args=(stop, index, counter))
+            for index in range(clients)
+        ]
+        for thread in threads:
+            thread.start()
+        started = time.perf_counter()
+        try:
+            latencies = read_latencies(token, requests)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        return latencies, counter['logins'] / (time.perf_counter() - started)
+
+    def report(self, label, latencies, rate):
+        """
+        Print the latency percentiles of one phase.
+        """
+        line = (
+            f"{label:<26} p50 {percentile(latencies, 0.50) * 1000:8.1f} ms "
+            f"p95 {percentile(latencies, 0.95) * 1000:8.1f} ms "
+            f"max {max(latencies) * 1000:8.1f} ms"
+        )
+        if rate is not None:
+            line += f"  {rate:8.1f} logins/s"
+        self.stdout.write(line)
@@ -0,0 +1,103 @@
+"""
+Create user accounts in bulk from a CSV file.
+
+The file needs a header row with `fullname`, `email` and `password`
+columns. Accounts are created in batches; rows whose email or full
+name already exists, or repeats an earlier row, are reported and
+skipped. Throughput is reported as seconds per thousand users.
+
+Usage:
+    python manage.py provision_users accounts.csv
+    python manage.py provision_users accounts.csv --batch-size 500 --tokens tokens.csv
+"""
+
+
+import csv
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from user_auth_app.provisioning import BATCH_SIZE, find_conflicts, provision_users
+
+
+COLUMNS = ('fullname', 'email', 'password')
+
+
+def read_batches(rows, batch_size):
+    """
+    Yield lists of at most `batch_size` rows.
+    """
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    """
+    Provision users and auth tokens from a CSV file.
+    """
+
+
+    help = "Create users and auth tokens in bulk from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file with fullname, email and password columns.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help="Accounts checked, hashed and inserted together.")
+        parser.add_argument('--tokens', help="Write email and token of each created user to this CSV file.")
+
+    def handle(self, *args, **options):
+        """
+        Provision every batch and print the throughput.
+        """
+        try:
+            source = open(options['path'], newline='')
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+
+        created = []
+        started = time.perf_counter()
+        with source:
+            reader = csv.DictReader(source)
+            missing = set(COLUMNS) - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"Missing columns: {', '.join(sorted(missing))}")
+            for number, batch in enumerate(read_batches(reader, options['batch_size']), 1):
+                created.extend(self.provision(number, batch))
+        elapsed = time.perf_counter() - started
+
+        if options['tokens']:
+            with open(options['tokens'], 'w', newline='') as target:
+                writer = csv.writer(target)
+                writer.writerow(['email', 'token'])
+                writer.writerows((user.email, token.key) for user, token in created)
+
+        per_thousand = elapsed / len(created) * 1000 if created else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Provisioned {len(created)} users in {elapsed:.1f} s "
+            f"({per_thousand:.1f} s per 1000 users)"
+        ))
+
+    def provision(self, number, rows):
+        """
+        Create the conflict-free accounts of one batch and return them.
+        """
+        accounts = [{column: row[column] for column in COLUMNS} for row in rows]
+        valid = []
+        for account, error in zip(accounts, find_conflicts(accounts)):
+            if error:
+                messages = '; '.join(message for errors in error.values() for message in errors)
+                self.stderr.write(f"Skipping {account['email']}: {messages}")
+            else:
+                valid.append(account)
+
+        started = time.perf_counter()
+        created = provision_users(valid)
+        elapsed = time.perf_counter() - started
+        if created:
+            self.stdout.write(
+                f"Batch {number}: {len(created)} users in {elapsed:.1f} s "
+                f"({elapsed / len(created) * 1000:.1f} s per 1000 users)"
+            )
+        return created
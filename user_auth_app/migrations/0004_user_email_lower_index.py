@@ -0,0 +1,18 @@
+# Case-insensitive index for email lookups on the built-in user table.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_auth_app', '0003_delete_useraccount'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS auth_user_email_lower_idx ON auth_user (LOWER(email))',
+            reverse_sql='DROP INDEX IF EXISTS auth_user_email_lower_idx',
+        ),
+    ]
@@ -0,0 +1,118 @@
+"""
+Bulk user provisioning.
+
+Creates many accounts at once with a fixed number of queries per
+batch: one query each to check emails and usernames for conflicts, and
+one bulk insert each for users and tokens. Passwords are hashed in
+parallel on the bulk hashing process pool.
+
+`bulk_create` sends no save signals, so the email lookup cache, the
+user prefix index and the shard mirrors are updated here explicitly.
+"""
+
+
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.functions import Lower
+from rest_framework.authtoken.models import Token
+
+from core.db import retry_on_locked
+from kanban_app.sharding import is_sharded, shards
+from user_auth_app.hashing import hash_passwords
+from user_auth_app.user_index import user_index
+
+
+BATCH_SIZE = 1000
+
+
+def find_conflicts(accounts):
+    """
+    Return one error dict per account, empty for accounts that can be created.
+
+    An email or full name conflicts if it already exists or appears
+    earlier in the same batch. Emails are compared case-insensitively,
+    like the email lookup does.
+    """
+    from user_auth_app.email_lookup import normalize_email
+
+    emails = {normalize_email(account['email']) for account in accounts}
+    names = {account['fullname'] for account in accounts}
+    taken_emails = set(
+        User.objects.annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=emails).values_list('email_lower', flat=True)
+    )
+    taken_names = set(User.objects.filter(username__in=names).values_list('username', flat=True))
+
+    seen_emails = set()
+    seen_names = set()
+    errors = []
+    for account in accounts:
+        error = {}
+        email = normalize_email(account['email'])
+        name = account['fullname']
+        if email in taken_emails:
+            error['email'] = ['Email already exists']
+        elif email in seen_emails:
+            error['email'] = ['Email is repeated in this batch']
+        if name in taken_names:
+            error['fullname'] = ['User name already exists']
+        elif name in seen_names:
+            error['fullname'] = ['User name is repeated in this batch']
+        seen_emails.add(email)
+        seen_names.add(name)
+        errors.append(error)
+    return errors
+
+
+@retry_on_locked
+def insert_accounts(users):
+    """
+    Insert the users and one auth token each in a single transaction.
+    """
+    User.objects.bulk_create(users)
+    return Token.objects.bulk_create(
+        [Token(key=Token.generate_key(), user=user) for user in users]
+    )
+
+
+def announce(users):
+    """
+    Do what the user save signals would have done for bulk-created users.
+    """
+    from user_auth_app.email_lookup import invalidate_emails
+
+    invalidate_emails(*(user.email for user in users))
+    for user in users:
+        user_index.add(user.id, user.username, user.email)
+    if is_sharded():
+        fields = User._meta.concrete_fields
+        for alias in shards():
+            if alias != DEFAULT_DB_ALIAS:
+                User.objects.using(alias).bulk_create(
+                    [User(**{field.attname: getattr(user, field.attname) for field in fields})
+                     for user in users],
+                    ignore_conflicts=True
+                )
+
+
+def provision_users(accounts):
+    """
+    Create users and auth tokens for conflict-free accounts.
+
+    Each account is a dict with `fullname`, `email` and `password`.
+    Returns (user, token) pairs in the order of `accounts`.
+    """
+    if not accounts:
+        return []
+    hashes = hash_passwords([account['password'] for account in accounts])
+    users = [
+        User(
+            username=User.normalize_username(account['fullname']),
+            email=User.objects.normalize_email(account['email']),
+            password=password_hash
+        )
+        for account, password_hash in zip(accounts, hashes)
+    ]
+    tokens = insert_accounts(users)
+    announce(users)
+    return list(zip(users, tokens))
@@ -0,0 +1,62 @@
+"""
+Signal handlers for user authentication and account management.
+
+Keep the email lookup cache and the in-memory user prefix index
+consistent with the user table.
+"""
+
+
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from user_auth_app.email_lookup import invalidate_emails
+from user_auth_app.user_index import user_index
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_email(sender, instance, raw, using, update_fields=None, **kwargs):
+    """
+    Store the email a user had before this save, if it may change.
+    """
+    instance._previous_email = None
+    if update_fields is not None and 'email' not in update_fields:
+        return
+    if instance.pk is not None and not raw:
+        instance._previous_email = User.objects.using(using).filter(
+            pk=instance.pk).values_list('email', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_saved_user_email(sender, instance, **kwargs):
+    """
+    Drop cached lookups for the user's old and new email.
+    """
+    invalidate_emails(instance.email, getattr(instance, '_previous_email', None))
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_email(sender, instance, **kwargs):
+    """
+    Drop the cached lookup for a deleted user's email.
+    """
+    invalidate_emails(instance.email)
+
+
+@receiver(post_save, sender=User)
+def index_saved_user(sender, instance, using, **kwargs):
+    """
+    Add or update the user in the prefix index.
+    """
+    if using == DEFAULT_DB_ALIAS:
+        user_index.add(instance.id, instance.username, instance.email)
+
+
+@receiver(post_delete, sender=User)
+def unindex_deleted_user(sender, instance, using, **kwargs):
+    """
+    Remove the user from the prefix index.
+    """
+    if using == DEFAULT_DB_ALIAS:
+        user_index.remove(instance.id)
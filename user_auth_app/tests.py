@@ -1,3 +1,250 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from kanban_app.models import Board
+from user_auth_app.api.views import AsyncLoginView, AsyncRegistrationView, UserSearchView
+from user_auth_app.email_lookup import invalidate_emails, lookup_emails
+from user_auth_app.user_index import user_index
+from user_auth_app.provisioning import find_conflicts
+
+
+class CheapPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 with fewer iterations, standing in for outdated parameters.
+    """
+
+
+    iterations = 1000
+
+
+class AsyncAuthViewTest(TestCase):
+    """
+    The async login and registration views answer exactly like the sync ones.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="Async User", email="async@example.com", password="secret-password")
+        self.factory = RequestFactory()
+
+    async def post(self, view, body):
+        request = self.factory.post('/', json.dumps(body), content_type='application/json')
+        response = await view.as_view()(request)
+        return response.status_code, json.loads(response.content)
+
+    async def test_login_matches_sync_view(self):
+        body = {'email': 'async@example.com', 'password': 'secret-password'}
+        sync_response = await self.async_client.post('/api/login/', body, content_type='application/json')
+        status_code, data = await self.post(AsyncLoginView, body)
+        self.assertEqual((status_code, data), (sync_response.status_code, sync_response.json()))
+
+    async def test_failed_login_matches_sync_view(self):
+        for body in ({'email': 'async@example.com', 'password': 'wrong'}, {'email': 'async@example.com'}):
+            sync_response = await self.async_client.post('/api/login/', body, content_type='application/json')
+            status_code, data = await self.post(AsyncLoginView, body)
+            self.assertEqual((status_code, data), (sync_response.status_code, sync_response.json()))
+
+    async def test_registration_creates_usable_account(self):
+        body = {
+            'fullname': 'New User', 'email': 'new@example.com',
+            'password': 'pw-one', 'repeated_password': 'pw-two'
+        }
+        status_code, data = await self.post(AsyncRegistrationView, body)
+        self.assertEqual((status_code, data), (400, ["Passwords do not match"]))
+
+        body['repeated_password'] = 'pw-one'
+        status_code, data = await self.post(AsyncRegistrationView, body)
+        self.assertEqual(status_code, 200)
+        user = await User.objects.aget(id=data['user_id'])
+        self.assertTrue(user.check_password('pw-one'))
+
+
+class PasswordRehashTest(TestCase):
+    """
+    Logging in upgrades hashes made with outdated hasher parameters.
+    """
+
+
+    databases = '__all__'
+
+    @override_settings(PASSWORD_HASHERS=['user_auth_app.tests.CheapPBKDF2PasswordHasher'])
+    def make_outdated_user(self):
+        return User.objects.create(
+            username="Old Hash", email="old@example.com",
+            password=make_password('secret-password'))
+
+    def test_login_rehashes_outdated_password(self):
+        user = self.make_outdated_user()
+        self.assertIn('$1000$', user.password)
+
+        response = APIClient().post(
+            '/api/login/', {'email': 'old@example.com', 'password': 'secret-password'}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertNotIn('$1000$', user.password)
+        self.assertTrue(user.check_password('secret-password'))
+
+
+class EmailLookupTest(TestCase):
+    """
+    Email checks match case-insensitively and are invalidated by user changes.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="Known", email="Known@Example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_lookup_ignores_case_and_whitespace(self):
+        response = self.client.get('/api/email-check/', {'email': ' KNOWN@example.COM '})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], self.user.id)
+        self.assertEqual(self.client.get('/api/email-check/', {'email': 'nobody@example.com'}).status_code, 404)
+        self.assertEqual(self.client.get('/api/email-check/').status_code, 400)
+
+    def test_batch_resolves_every_address_in_one_query(self):
+        emails = ['known@example.com', 'Nobody@example.com', 'KNOWN@EXAMPLE.COM']
+        with self.assertNumQueries(1):
+            users = lookup_emails(emails)
+        self.assertEqual(users, {'known@example.com': users['known@example.com'], 'nobody@example.com': None})
+
+        response = self.client.post('/api/email-check/', {'emails': emails}, format='json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['KNOWN@EXAMPLE.COM']['id'], self.user.id)
+        self.assertIsNone(data['Nobody@example.com'])
+
+    def test_registration_and_email_changes_are_seen(self):
+        self.assertIsNone(lookup_emails(['new@example.com'])['new@example.com'])
+        response = APIClient().post('/api/registration/', {
+            'fullname': 'New User', 'email': 'New@example.com',
+            'password': 'pw-one', 'repeated_password': 'pw-one'
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lookup_emails(['new@example.com'])['new@example.com']['id'], response.json()['user_id'])
+
+        lookup_emails(['known@example.com'])
+        self.user.email = 'renamed@example.com'
+        self.user.save()
+        self.assertIsNone(lookup_emails(['known@example.com'])['known@example.com'])
+
+    def test_misses_are_cached_until_invalidated(self):
+        self.assertIsNone(lookup_emails(['quiet@example.com'])['quiet@example.com'])
+        User.objects.bulk_create([User(username="Quiet", email="quiet@example.com")])
+        with self.assertNumQueries(0):
+            self.assertIsNone(lookup_emails(['quiet@example.com'])['quiet@example.com'])
+        invalidate_emails('Quiet@example.com')
+        self.assertIsNotNone(lookup_emails(['quiet@example.com'])['quiet@example.com'])
+
+
+class UserSearchTest(TestCase):
+    """
+    User search ranks the requesting user's co-members first, however many users match.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="Searcher", email="searcher@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        User.objects.bulk_create(
+            User(username=f"Alex {index:03}", email=f"alex{index:03}@example.com") for index in range(250))
+        self.close = User.objects.create_user(username="Alex Zimmer", email="zimmer@example.com")
+        self.known = User.objects.create_user(username="Other", email="alexis@example.com")
+        self.former = User.objects.create_user(username="Alexa", email="alexa@example.com")
+        for title, members in [("One", [self.close, self.known]), ("Two", [self.close]), ("Gone", [self.former])]:
+            board = Board.objects.create(title=title, owner=self.user)
+            board.members.add(self.user, *members)
+        Board.objects.filter(title="Gone").update(deleted_at=timezone.now())
+        user_index.load()
+        self.addCleanup(setattr, user_index, 'built_at', None)
+
+    def search(self, query, limit=3):
+        response = self.client.get('/api/users/search/', {'q': query, 'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        return [(user['fullname'], user['shared_boards']) for user in response.json()]
+
+    def test_co_members_rank_first_beyond_the_alphabetical_matches(self):
+        self.assertEqual(self.search("alex"), [("Alex Zimmer", 2), ("Other", 1), ("Alex 000", 0)])
+        self.assertEqual(self.search("ALEX Z", limit=10), [("Alex Zimmer", 2)])
+
+    def test_deleted_boards_and_the_searcher_are_left_out(self):
+        self.assertEqual(self.search("alexa"), [("Alexa", 0)])
+        self.assertEqual(self.search("searcher"), [])
+        self.assertEqual(self.client.get('/api/users/search/').status_code, 400)
+        self.assertEqual(UserSearchView.throttle_scope, 'users')
+
+
+class BulkProvisioningTest(TestCase):
+    """
+    Bulk provisioning checks the whole batch up front and creates users with tokens.
+    """
+
+
+    databases = '__all__'
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username="Admin", email="admin@example.com", password="secret-password", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def accounts(self, count):
+        return [
+            {'fullname': f'Bulk {index}', 'email': f'bulk{index}@example.com', 'password': 'pw'}
+            for index in range(count)
+        ]
+
+    def test_conflicts_are_checked_in_two_queries(self):
+        accounts = self.accounts(50) + [{'fullname': 'Admin', 'email': 'bulk0@example.com', 'password': 'pw'}]
+        with self.assertNumQueries(2):
+            errors = find_conflicts(accounts)
+        self.assertEqual(errors[-1], {
+            'email': ['Email is repeated in this batch'],
+            'fullname': ['User name already exists']
+        })
+        self.assertFalse(any(errors[:-1]))
+
+    def test_conflicting_batch_creates_nothing(self):
+        users = self.accounts(2) + [{'fullname': 'Other', 'email': 'admin@example.com', 'password': 'pw'}]
+        response = self.client.post('/api/users/bulk/', {'users': users}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['users'][2], {'email': ['Email already exists']})
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_emails_conflict_regardless_of_case(self):
+        accounts = [
+            {'fullname': 'Upper', 'email': 'ADMIN@Example.com', 'password': 'pw'},
+            {'fullname': 'First', 'email': 'bob@example.com', 'password': 'pw'},
+            {'fullname': 'Second', 'email': 'Bob@Example.com', 'password': 'pw'},
+        ]
+        self.assertEqual(find_conflicts(accounts), [
+            {'email': ['Email already exists']}, {}, {'email': ['Email is repeated in this batch']}
+        ])
+
+    def test_batch_creates_users_and_tokens(self):
+        response = self.client.post('/api/users/bulk/', {'users': self.accounts(3)}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([account['email'] for account in response.json()],
+                         [f'bulk{index}@example.com' for index in range(3)])
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {response.json()[0]['token']}")
+        self.assertEqual(client.get('/api/boards/').status_code, 200)
+        self.assertTrue(User.objects.get(email='bulk2@example.com').check_password('pw'))
@@ -0,0 +1,121 @@
+"""
+In-memory prefix index over usernames and email addresses.
+
+The index keeps two sorted lists of (lowercased key, user ID) pairs, so
+a prefix lookup is a binary search followed by a short scan. It is
+built lazily on first use, kept current by User save/delete signals in
+this process and rebuilt periodically to pick up changes made by other
+processes.
+"""
+
+
+import threading
+import time
+from bisect import bisect_left, insort
+
+
+REBUILD_SECONDS = 300
+
+
+class UserPrefixIndex:
+    """
+    Sorted prefix index mapping username and email prefixes to users.
+    """
+
+
+    def __init__(self, rebuild_seconds=REBUILD_SECONDS):
+        self.rebuild_seconds = rebuild_seconds
+        self.lock = threading.RLock()
+        self.built_at = None
+        self.users = {}
+        self.usernames = []
+        self.emails = []
+
+    def load(self):
+        """
+        Rebuild the index from the user table.
+        """
+        from django.contrib.auth.models import User
+
+        rows = list(User.objects.values_list('id', 'username', 'email'))
+        with self.lock:
+            self.users = {user_id: (username, email) for user_id, username, email in rows}
+            self.usernames = sorted((username.lower(), user_id) for user_id, username, _ in rows)
+            self.emails = sorted((email.lower(), user_id) for user_id, _, email in rows if email)
+            self.built_at = time.monotonic()
+
+    def ensure_loaded(self):
+        """
+        Build the index if it is missing or older than `rebuild_seconds`.
+        """
+        if self.built_at is None or time.monotonic() - self.built_at > self.rebuild_seconds:
+            self.load()
+
+    def add(self, user_id, username, email):
+        """
+        Insert or update a user's entries.
+        """
+        with self.lock:
+            if self.built_at is None:
+                return
+            self.remove(user_id)
+            self.users[user_id] = (username, email)
+            insort(self.usernames, (username.lower(), user_id))
+            if email:
+                insort(self.emails, (email.lower(), user_id))
+
+    def remove(self, user_id):
+        """
+        Delete a user's entries, if present.
+        """
+        with self.lock:
+            entry = self.users.pop(user_id, None)
+            if entry is None:
+                return
+            username, email = entry
+            self._discard(self.usernames, (username.lower(), user_id))
+            if email:
+                self._discard(self.emails, (email.lower(), user_id))
+
+    def _discard(self, keys, item):
+        """
+        Remove `item` from the sorted list `keys`, if present.
+        """
+        position = bisect_left(keys, item)
+        if position < len(keys) and keys[position] == item:
+            del keys[position]
+
+    def _scan(self, keys, prefix, limit, found):
+        """
+        Add the IDs of keys starting with `prefix` to `found`, up to `limit`.
+        """
+        position = bisect_left(keys, (prefix,))
+        while position < len(keys) and len(found) < limit:
+            key, user_id = keys[position]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(user_id, None)
+            position += 1
+
+    def search(self, prefix, limit):
+        """
+        Return up to `limit` user IDs whose username or email starts with `prefix`.
+
+        Username matches come first, each group in alphabetical order.
+        """
+        self.ensure_loaded()
+        prefix = prefix.lower()
+        found = {}
+        with self.lock:
+            self._scan(self.usernames, prefix, limit, found)
+            self._scan(self.emails, prefix, limit, found)
+        return list(found)
+
+    def get(self, user_id):
+        """
+        Return the (username, email) pair of an indexed user.
+        """
+        return self.users.get(user_id)
+
+
+user_index = UserPrefixIndex()